@@ -0,0 +1,346 @@
+import argparse
+import gc
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import attributions
+import drift_monitor
+import inference
+import metrics
+import model_registry
+import prefork
+import similar_wines
+
+logger = logging.getLogger("wine.app")
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+# Seconds a request waits for its batch; past that the batcher is stuck or dead and the reply is a 503
+REQUEST_TIMEOUT = 30.0
+
+
+class MicroBatcher:
+    # Groups concurrent single-row requests into one scaler.transform/predict_proba call.
+    # With a model_registry.ModelRegistry, every batch runs on the registry's live version
+    # (its prepare hook supplies the explainer) and model/scaler/explainer are ignored
+
+    def __init__(self, model, scaler, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS, monitor=None, explainer=None, registry=None):
+        self.model = model
+        self.scaler = scaler
+        self.monitor = monitor
+        self.explainer = explainer
+        self.registry = registry
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, row, explain=False):
+        # Validate on the caller's thread so one bad request can't fail a whole batch
+        rows = inference.as_feature_matrix(row)
+        if len(rows) != 1:
+            raise ValueError("Expected a single row of features")
+        # json.loads accepts NaN and Infinity; either would fail every request batched with this one
+        if not np.isfinite(rows).all():
+            raise ValueError("Features must be finite numbers")
+        if explain and self.serving()[2] is None:
+            raise ValueError("Explanations aren't available for this model")
+        row = rows[0]
+        future = Future()
+        self._queue.put((row, future, explain))
+        return future
+
+    def predict(self, row, timeout=None, explain=False):
+        # (label, proba), plus contributions toward the label when explain is set
+        return self.submit(row, explain).result(timeout)
+
+    def serving(self):
+        # (model, scaler, explainer) for the next batch, read together so a swap can't split them
+        if self.registry is None:
+            return self.model, self.scaler, self.explainer
+        active = self.registry.current()
+        if active is None:
+            raise RuntimeError("No model version loaded yet")
+        return active.model, active.scaler, active.extra
+
+    def _collect(self):
+        # Block for the first request, then wait at most max_wait for the batch to fill
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._score(batch)
+            except Exception as e:
+                # Fail whichever requests haven't had a reply and keep the thread alive for the next batch
+                logger.warning("Batch of %d requests failed: %s", len(batch), e)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _score(self, batch):
+        rows = np.stack([row for row, _, _ in batch])
+        # batched_requests / batches is the mean batch size
+        metrics.inc("batches")
+        metrics.inc("batched_requests", len(batch))
+        explained = any(explain for _, _, explain in batch)
+        model, scaler, explainer = self.serving()
+        # One forest walk either way; attributions come from the same leaves
+        if explained:
+            labels, proba, contributions = attributions.predict_explain(explainer, scaler, rows)
+        else:
+            labels, proba = inference.predict_with_proba(model, scaler, rows)
+        for i, (_, future, explain) in enumerate(batch):
+            # What the reply was scored with; the live model may have moved on by the time it's read
+            future.model, future.explainer = model, explainer
+            result = (labels[i], proba[i])
+            future.set_result(result + (contributions[i],) if explain else result)
+        # After the replies, so drift tracking never adds to request latency
+        if self.monitor is not None:
+            with metrics.timer("drift"):
+                self.monitor.update(rows)
+
+
+def parse_features(payload):
+    # Either {"features": [11 values in input_data order]} or {"<feature name>": value, ...};
+    # both may add "explain": true
+    if isinstance(payload, dict) and "features" in payload:
+        return payload["features"]
+    if isinstance(payload, dict):
+        missing = [name for name in inference.FEATURE_NAMES if name not in payload]
+        if missing:
+            raise ValueError(f"Missing features: {', '.join(missing)}")
+        return [payload[name] for name in inference.FEATURE_NAMES]
+    return payload
+
+
+def format_prediction(classes, label, proba, contributions=None, bias=None):
+    body = {
+        "quality": int(label),
+        "probabilities": {str(int(cls)): float(p) for cls, p in zip(classes, proba)},
+    }
+    if contributions is not None:
+        # baseline + sum(contributions) == probabilities[quality]
+        body["baseline"] = float(bias[np.searchsorted(classes, label)])
+        body["contributions"] = {name: float(c) for name, c in zip(inference.FEATURE_NAMES, contributions)}
+    return body
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    # Set on the server by make_server()
+    batcher = None
+    similar = None
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            data = metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        elif self.path == "/version" and self.batcher.registry is not None:
+            self._send_json(200, self.batcher.registry.status())
+        elif self.path == "/drift" and self.batcher.monitor is not None:
+            self._send_json(200, self.batcher.monitor.report())
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path == "/similar" and self.similar is not None:
+            self._similar()
+            return
+        if self.path != "/predict":
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            payload = self._read_json()
+            explain = isinstance(payload, dict) and bool(payload.get("explain"))
+            future = self.batcher.submit(parse_features(payload), explain=explain)
+            result = future.result(REQUEST_TIMEOUT)
+        except (ValueError, TypeError) as e:
+            metrics.inc("bad_requests")
+            self._send_json(400, {"error": str(e)})
+            return
+        except TimeoutError:
+            metrics.inc("request_timeouts")
+            self._send_json(503, {"error": "Prediction timed out; the service is overloaded or unhealthy"})
+            return
+        except Exception as e:
+            metrics.inc("server_errors")
+            self._send_json(500, {"error": f"Error during prediction: {e}"})
+            return
+        with metrics.timer("render"):
+            bias = future.explainer.bias if explain else None
+            self._send_json(200, format_prediction(future.model.classes_, *result, bias=bias))
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def _similar(self):
+        # Same body as /predict plus an optional "k"; the index is loaded by the first request
+        try:
+            payload = self._read_json()
+            k = similar_wines.DEFAULT_K
+            if isinstance(payload, dict):
+                k = int(payload.get("k", k))
+            if k < 1:
+                raise ValueError("k must be at least 1")
+            index = self.similar.get()
+            rows, distances = index.query(inference.as_feature_matrix(parse_features(payload))[0], k)
+        except (ValueError, TypeError) as e:
+            metrics.inc("bad_requests")
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            metrics.inc("server_errors")
+            self._send_json(500, {"error": f"Error during lookup: {e}"})
+            return
+        self._send_json(200, {"similar": [
+            {"id": int(index.ids[row]), "quality": int(index.labels[row]), "distance": float(d)}
+            for row, d in zip(rows, distances)
+        ]})
+
+    def log_message(self, format, *args):
+        # Keep the hot path quiet; errors still surface through the JSON body
+        pass
+
+
+def build_explainer(model, scaler=None):
+    # Also the registry's prepare hook, so each version's explainer is built before it goes live
+    try:
+        return attributions.PathExplainer(model)
+    except ValueError:
+        return None
+
+
+def make_server(batcher, host="127.0.0.1", port=8000, similar=None):
+    # similar is a similar_wines.LazyIndex; without one /similar answers 404
+    handler = type("BoundPredictionHandler", (PredictionHandler,),
+                   {"batcher": batcher, "similar": similar})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON wine quality prediction service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="largest number of requests scored in one forest call")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="how long the first request in a batch waits for company")
+    parser.add_argument("--model", default=inference.MODEL_PATH)
+    parser.add_argument("--scaler", default=inference.SCALER_PATH)
+    parser.add_argument("--engine", choices=inference.ENGINES, default=inference.DEFAULT_ENGINE,
+                        help="forest implementation used for scoring")
+    parser.add_argument("--drift-snapshot", default=drift_monitor.SNAPSHOT_PATH,
+                        help="training statistics for /drift (built from WineQT.csv if missing)")
+    parser.add_argument("--no-drift", action="store_true", help="don't track input drift")
+    parser.add_argument("--no-similar", action="store_true", help="don't serve /similar")
+    parser.add_argument("--registry", nargs="?", const=inference.VERSIONS_PATH, metavar="DIR",
+                        help="serve the live version of a model_versions directory and follow it "
+                             f"as it changes (default {inference.VERSIONS_PATH}) instead of --model/--scaler")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes forked after loading, sharing the model's memory (Linux/macOS); "
+                             "metrics and drift are then per worker")
+    args = parser.parse_args(argv)
+
+    if args.workers > 1:
+        # No collections while loading; prefork freezes what's loaded so workers share it
+        gc.disable()
+
+    registry = None
+    if args.registry:
+        try:
+            # Watcher threads start in the serving process(es), below
+            registry = model_registry.ModelRegistry(args.registry, args.engine, prepare=build_explainer)
+            registry.refresh()
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        if registry.current() is None:
+            print(f"❌ No loadable model version in {args.registry}; add one with model_registry.py register",
+                  file=sys.stderr)
+            return 1
+        # Batches read the registry; this scaler only seeds the /similar index
+        model, scaler, explainer = None, registry.current().scaler, None
+        print(f"✅ Serving model {registry.current().version}, watching {args.registry} for new versions")
+    else:
+        try:
+            model, scaler = inference.load_model_and_scaler(args.model, args.scaler, args.engine)
+        except FileNotFoundError as e:
+            print(f"❌ Model files not found: {e}", file=sys.stderr)
+            return 1
+        explainer = build_explainer(model)
+        if explainer is None:
+            print(f"⚠️ Explanations disabled: the {args.engine} engine can't explain predictions",
+                  file=sys.stderr)
+
+    snapshot = None if args.no_drift else drift_monitor.load_snapshot(args.drift_snapshot)
+
+    def start_serving():
+        # Everything that owns a thread, created in the process that will serve
+        if registry is not None:
+            registry.start()
+        monitor = None if snapshot is None else drift_monitor.DriftMonitor(snapshot)
+        return MicroBatcher(model, scaler, args.max_batch_size, args.max_wait_ms, monitor, explainer,
+                            registry)
+
+    # The index is read (or built) by the first /similar request, not at startup;
+    # the fused engine has no scaler, so the index then reads scaler.pkl itself
+    similar = None if args.no_similar else similar_wines.LazyIndex(scaler)
+    if args.workers > 1:
+        server = make_server(None, args.host, args.port, similar)
+
+        def start_worker():
+            server.RequestHandlerClass.batcher = start_serving()
+
+        print(f"🍷 Serving predictions on http://{args.host}:{args.port}/predict with {args.workers} workers")
+        prefork.serve_forever(server, start_worker, args.workers)
+        return 0
+
+    server = make_server(start_serving(), args.host, args.port, similar)
+    print(f"🍷 Serving predictions on http://{args.host}:{args.port}/predict")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
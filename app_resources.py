@@ -0,0 +1,72 @@
+import streamlit as st
+
+import cold_start
+import inference
+import metrics
+import model_registry
+from prediction_cache import PredictionCache
+
+# Process-wide resources shared by the Streamlit apps. Kept free of sklearn and pandas
+# imports so the first page doesn't wait for them
+
+
+# Load the trained model and scaler
+# version is only part of the cache key: a replaced artifact on disk means a fresh load
+@st.cache_resource(max_entries=len(inference.ENGINES))
+def load_model_and_scaler(engine=inference.DEFAULT_ENGINE, version=None):
+    try:
+        with cold_start.step("model"):
+            return inference.load_model_and_scaler(engine=engine)
+    except FileNotFoundError:
+        st.error("Model files not found. Please ensure RF_model.pkl and scaler.pkl (or RF_model_fused.pkl / RF_model_compact.pkl for the fused / compact engines) are in the current directory.")
+        return None, None
+
+# One watcher per engine for the whole process; None for engines the registry can't serve
+@st.cache_resource(max_entries=len(inference.ENGINES))
+def get_model_registry(engine=inference.DEFAULT_ENGINE):
+    if engine not in model_registry.REGISTRY_ENGINES:
+        return None
+    with cold_start.step("registry"):
+        return model_registry.ModelRegistry(engine=engine).start()
+
+# One summary log line per interval for the whole process
+@st.cache_resource
+def start_metrics_reporter():
+    return metrics.start_log_reporter()
+
+# One per engine, shared by every session in this process
+@st.cache_resource
+def get_prediction_cache(engine=inference.DEFAULT_ENGINE):
+    return PredictionCache()
+
+# Leaf attribution table, built on the first prediction for each loaded model; None when the engine can't explain
+@st.cache_resource(max_entries=len(inference.ENGINES))
+def get_explainer(_model, engine=inference.DEFAULT_ENGINE, version=None):
+    import attributions
+    try:
+        with cold_start.step("explainer"):
+            return attributions.PathExplainer(_model)
+    except ValueError:
+        return None
+
+# Nearest reference wines; read (or built) on the first prediction, then shared by every session
+@st.cache_resource(max_entries=1)
+def get_similar_wines(_scaler, version=None):
+    import similar_wines
+    try:
+        with cold_start.step("similar_index"):
+            return similar_wines.load_index(_scaler)
+    except FileNotFoundError:
+        return None
+
+def current_model(engine=inference.DEFAULT_ENGINE):
+    # The live (model, scaler, version): the registry's pair when it serves this engine, else the
+    # artifacts on disk. Fragments call this on each of their own reruns, because the arguments
+    # they were given are from the last full run and would keep a swapped-out model in use
+    registry = get_model_registry(engine)
+    active = registry.current() if registry is not None else None
+    if active is not None:
+        return active.model, active.scaler, active.version
+    version = inference.artifact_version()
+    model, scaler = load_model_and_scaler(engine, version)
+    return model, scaler, version
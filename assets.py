@@ -0,0 +1,21 @@
+import functools
+import os
+import re
+
+# Served by Streamlit at app/static/<name> (server.enableStaticServing in .streamlit/config.toml)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    return re.sub(r":\s+", ":", css).strip()
+
+
+@functools.lru_cache(maxsize=None)
+def style_tag(name):
+    # Read and minify a stylesheet from static/ once per process; every rerun reuses the string.
+    # Images are referenced by URL from the CSS, so the browser fetches and caches them once.
+    with open(os.path.join(STATIC_DIR, name)) as f:
+        return f"<style>{minify_css(f.read())}</style>"
@@ -0,0 +1,167 @@
+import argparse
+import sys
+import time
+import warnings
+
+import numpy as np
+
+import inference
+import metrics
+from forest_engine import CompactForest, PackedForest
+
+# Rows per block; bounds the (rows, trees, features) float32 gather to a few MB
+BLOCK_ROWS = 1024
+# From this many rows sklearn's compiled apply() beats walking the packed arrays in NumPy
+SKLEARN_APPLY_ROWS = 128
+
+
+class PathExplainer:
+    """Per-feature contributions of each prediction, read off the decision paths (Saabas).
+
+    Walking a tree from root to leaf, every split moves the class distribution from
+    the node's to the child's; that change is credited to the split feature. Summed
+    over the path and averaged over trees, the credits plus the forest's root average
+    (the bias) add up to predict_proba exactly.
+
+    The sums are precomputed once per leaf as a (leaves, classes, features) float32
+    table, about 9 MB for the shipped forest, so predict_explain() gets labels,
+    probabilities and contributions out of a single forest walk plus one gather.
+    """
+
+    def __init__(self, model):
+        if isinstance(model, CompactForest):
+            raise ValueError("Compact forests drop the inner-node distributions attributions need")
+        packed = model if isinstance(model, PackedForest) else PackedForest.from_sklearn(model)
+        # Kept for its compiled apply(); packed node ids are sklearn's plus each tree's root offset
+        self._sklearn = None if packed is model else model
+        self.forest = packed
+        self.classes_ = packed.classes_
+        self.bias = packed.value[packed.roots].mean(axis=0)
+        self.leaf_row, self.table = self._leaf_contributions(packed)
+
+    @staticmethod
+    def _leaf_contributions(packed):
+        n_nodes = len(packed.feature)
+        n_features = len(inference.FEATURE_NAMES)
+        n_classes = packed.value.shape[1]
+        nodes = np.arange(n_nodes)
+        is_leaf = packed.left == nodes
+
+        # Path sums for every node, filled one depth level at a time from the roots down
+        path = np.zeros((n_nodes, n_classes, n_features), dtype=np.float32)
+        frontier = np.asarray(packed.roots)
+        while frontier.size:
+            parents = frontier[~is_leaf[frontier]]
+            for children in (packed.left[parents], packed.right[parents]):
+                path[children] = path[parents]
+                path[children, :, packed.feature[parents]] += packed.value[children] - packed.value[parents]
+            frontier = np.concatenate([packed.left[parents], packed.right[parents]])
+
+        leaves = np.flatnonzero(is_leaf)
+        leaf_row = np.full(n_nodes, -1, dtype=np.int32)
+        leaf_row[leaves] = np.arange(len(leaves))
+        return leaf_row, path[leaves]
+
+    def apply(self, X):
+        if self._sklearn is not None and len(X) >= SKLEARN_APPLY_ROWS:
+            return self._sklearn.apply(X) + self.forest.roots
+        return self.forest.apply(X)
+
+    def predict_explain(self, X):
+        """Labels, probabilities and each row's contributions toward its own label.
+
+        X is in the forest's input space (scaled unless fused). Contributions are
+        (rows, features); use contributions() for every class.
+        """
+        X = np.asarray(X)
+        n_trees = self.forest.n_trees
+        n_classes, n_features = self.table.shape[1:]
+        # (leaf, class) pairs as rows of one flat table: np.take gathers much faster than 2-D fancy indexing
+        flat = self.table.reshape(-1, n_features)
+        labels = np.empty(len(X), dtype=self.classes_.dtype)
+        proba = np.empty((len(X), n_classes))
+        contributions = np.empty((len(X), n_features))
+        for start in range(0, len(X), BLOCK_ROWS):
+            block = slice(start, start + BLOCK_ROWS)
+            leaves = self.apply(X[block])
+            proba[block] = np.take(self.forest.value, leaves, axis=0).mean(axis=1)
+            columns = np.argmax(proba[block], axis=1)
+            labels[block] = self.classes_.take(columns)
+            picked = np.take(flat, self.leaf_row[leaves] * n_classes + columns[:, None], axis=0)
+            # float32 sum over at most a few hundred trees is accurate to ~1e-6, plenty for display
+            contributions[block] = picked.sum(axis=1) / n_trees
+        return labels, proba, contributions
+
+    def contributions(self, X):
+        # (rows, features, classes): every class, for inputs in the forest's own space
+        X = np.asarray(X)
+        out = np.empty((len(X), self.table.shape[2], self.table.shape[1]))
+        for start in range(0, len(X), BLOCK_ROWS):
+            leaves = self.apply(X[start:start + BLOCK_ROWS])
+            summed = self.table[self.leaf_row[leaves]].sum(axis=1, dtype=np.float64)
+            out[start:start + BLOCK_ROWS] = summed.transpose(0, 2, 1) / self.forest.n_trees
+        return out
+
+
+def predict_explain(explainer, scaler, features):
+    """predict_with_proba plus attributions, for raw feature rows.
+
+    Returns (label, proba, contributions) for one row or arrays for a batch, where
+    contributions are per feature toward the predicted class and
+    explainer.bias[class] + contributions.sum() equals that class's probability.
+    """
+    single = np.ndim(features) == 1
+    try:
+        X = inference.as_feature_matrix(features)
+        if scaler is not None:
+            with metrics.timer("scale"):
+                X = scaler.transform(X)
+        with metrics.timer("explain"):
+            labels, proba, contributions = explainer.predict_explain(X)
+    except Exception:
+        metrics.inc("prediction_errors")
+        raise
+    metrics.inc("rows_scored", len(X))
+    if single:
+        return labels[0], proba[0], contributions[0]
+    return labels, proba, contributions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure what path attributions add to prediction latency."
+    )
+    parser.add_argument("--engine", choices=inference.ENGINES, default=inference.DEFAULT_ENGINE)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    import benchmark
+    warnings.filterwarnings("ignore", category=UserWarning)
+    try:
+        model, scaler = inference.load_model_and_scaler(engine=args.engine)
+    except FileNotFoundError as e:
+        print(f"❌ Model files not found: {e}", file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    try:
+        explainer = PathExplainer(model)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    build_ms = (time.perf_counter() - start) * 1e3
+
+    rows = benchmark.synthetic_rows(4096)
+    print(f"Explainer built in {build_ms:.0f} ms ({explainer.table.nbytes / 2**20:.1f} MiB leaf table)")
+    # Both columns are end to end from raw rows; the second also returns contributions
+    print(f"{'batch':>6}{'predict ms':>12}{'explained ms':>13}{'overhead':>10}")
+    for batch in (1, 64, 4096):
+        X = rows[:batch] if batch > 1 else rows[0]
+        repeats = args.runs if batch < 4096 else 5
+        predict = np.median(benchmark.time_call(lambda: inference.predict_with_proba(model, scaler, X), repeats))
+        explained = np.median(benchmark.time_call(lambda: predict_explain(explainer, scaler, X), repeats))
+        print(f"{batch:>6}{predict * 1e3:>12.3f}{explained * 1e3:>13.3f}{explained / predict - 1:>+10.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
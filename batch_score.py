@@ -0,0 +1,141 @@
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+import attributions
+import inference
+import similar_wines
+
+DEFAULT_CHUNKSIZE = 50_000
+
+# Columns copied through from the input so predictions can be joined back
+PASSTHROUGH_COLUMNS = ["Id"]
+
+# Per-feature contributions toward predicted_quality, written when an explainer is given
+CONTRIBUTION_COLUMNS = [f"contrib_{name.replace(' ', '_')}" for name in inference.FEATURE_NAMES]
+
+
+def check_columns(columns):
+    missing = [name for name in inference.FEATURE_NAMES if name not in columns]
+    if missing:
+        raise ValueError(f"Input is missing required columns: {', '.join(missing)}")
+
+
+def score_frame(model, scaler, frame, monitor=None, explainer=None, similar=None,
+                similar_k=similar_wines.DEFAULT_K):
+    # Score one chunk as a whole and return the prediction frame for it
+    X = frame[inference.FEATURE_NAMES].to_numpy(dtype="float64")
+    contributions = None
+    if explainer is not None:
+        labels, proba, contributions = attributions.predict_explain(explainer, scaler, X)
+    else:
+        labels, proba = inference.predict_with_proba(model, scaler, X)
+    if monitor is not None:
+        monitor.update(X)
+    out = pd.DataFrame(index=frame.index)
+    for name in PASSTHROUGH_COLUMNS:
+        if name in frame.columns:
+            out[name] = frame[name].to_numpy()
+    out["predicted_quality"] = labels
+    for i, cls in enumerate(model.classes_):
+        out[f"proba_{cls}"] = proba[:, i]
+    if contributions is not None:
+        for i, name in enumerate(CONTRIBUTION_COLUMNS):
+            out[name] = contributions[:, i]
+    if similar is not None:
+        # The whole chunk is one batched index query
+        rows, distances = similar.query(X, similar_k)
+        for j in range(rows.shape[1]):
+            out[f"similar_{j + 1}_id"] = similar.ids[rows[:, j]]
+            out[f"similar_{j + 1}_quality"] = similar.labels[rows[:, j]]
+            out[f"similar_{j + 1}_distance"] = distances[:, j]
+    return out
+
+
+def iter_scored_chunks(model, scaler, source, chunksize=DEFAULT_CHUNKSIZE, monitor=None,
+                       explainer=None, similar=None, similar_k=similar_wines.DEFAULT_K):
+    # Only one chunk of input and output is alive at a time
+    reader = pd.read_csv(source, chunksize=chunksize)
+    for chunk in reader:
+        check_columns(chunk.columns)
+        yield score_frame(model, scaler, chunk, monitor, explainer, similar, similar_k)
+
+
+def score_csv(model, scaler, source, destination, chunksize=DEFAULT_CHUNKSIZE, monitor=None,
+              explainer=None, similar=None, similar_k=similar_wines.DEFAULT_K):
+    rows = 0
+    header = True
+    for scored in iter_scored_chunks(model, scaler, source, chunksize, monitor, explainer,
+                                     similar, similar_k):
+        scored.to_csv(destination, mode="w" if header else "a", header=header, index=False)
+        header = False
+        rows += len(scored)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a wine CSV (WineQT.csv layout) in chunks.")
+    parser.add_argument("input", help="CSV file with the 11 physicochemical feature columns")
+    parser.add_argument("output", help="CSV file to write predictions and class probabilities to")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"rows per chunk (default {DEFAULT_CHUNKSIZE})")
+    parser.add_argument("--model", default=inference.MODEL_PATH)
+    parser.add_argument("--scaler", default=inference.SCALER_PATH)
+    parser.add_argument("--engine", choices=inference.ENGINES, default=inference.DEFAULT_ENGINE,
+                        help="forest implementation used for scoring")
+    parser.add_argument("--explain", action="store_true",
+                        help="add per-feature contributions toward each predicted quality")
+    parser.add_argument("--similar", type=int, metavar="K", default=0,
+                        help="add the K most similar reference wines (Id, quality, distance) per row")
+    parser.add_argument("--drift", action="store_true",
+                        help="compare the input's feature distribution with the training data")
+    args = parser.parse_args(argv)
+
+    try:
+        model, scaler = inference.load_model_and_scaler(args.model, args.scaler, args.engine)
+    except FileNotFoundError as e:
+        print(f"❌ Model files not found: {e}", file=sys.stderr)
+        return 1
+
+    explainer = None
+    if args.explain:
+        try:
+            explainer = attributions.PathExplainer(model)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+
+    similar = None
+    if args.similar:
+        similar = similar_wines.load_index(scaler)
+
+    monitor = None
+    if args.drift:
+        import drift_monitor
+        monitor = drift_monitor.DriftMonitor(drift_monitor.load_snapshot())
+
+    start = time.perf_counter()
+    try:
+        rows = score_csv(model, scaler, args.input, args.output, args.chunksize, monitor, explainer,
+                         similar, args.similar)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    rate = rows / elapsed if elapsed > 0 else float("inf")
+    print(f"✅ Scored {rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/s) -> {args.output}")
+    if monitor is not None:
+        drifted = [f"{name} (PSI {f['psi']:.2f})"
+                   for name, f in monitor.report()["features"].items() if f["drifted"]]
+        if drifted:
+            print(f"⚠️ Input drift against the training data: {', '.join(drifted)}")
+        else:
+            print("✅ No input drift against the training data")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
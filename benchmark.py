@@ -0,0 +1,168 @@
+import argparse
+import datetime
+import json
+import pickle
+import platform
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+import inference
+
+BENCH_PATH = "bench_results.json"
+DEFAULT_BATCH_SIZES = (1, 64, 4096, 1_000_000)
+
+# Repeats per batch size; big batches are slow enough that a few runs give stable percentiles
+REPEATS = {1: 200, 64: 100, 4096: 20, 1_000_000: 3}
+WARMUP = 3
+
+
+def synthetic_rows(n, data_path="WineQT.csv", seed=0):
+    # Draw from a normal fitted to WineQT.csv's feature means/covariance, clipped to the observed range
+    x = pd.read_csv(data_path)[inference.FEATURE_NAMES].to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    rows = rng.multivariate_normal(x.mean(axis=0), np.cov(x, rowvar=False), size=n)
+    return np.clip(rows, x.min(axis=0), x.max(axis=0))
+
+
+def time_call(fn, repeats, warmup=WARMUP):
+    for _ in range(warmup):
+        fn()
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings[i] = time.perf_counter() - start
+    return timings
+
+
+def summarize(name, engine, batch, timings):
+    ms = timings * 1e3
+    return {
+        "name": name,
+        "engine": engine,
+        "batch": batch,
+        "runs": len(timings),
+        "mean_ms": float(ms.mean()),
+        "min_ms": float(ms.min()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "rows_per_s": float(batch / np.median(timings)) if batch else None,
+    }
+
+
+def bench_load(engine, repeats):
+    if engine == "sklearn":
+        # The raw cost of unpickling RF_model.pkl, separate from the scaler
+        def load():
+            with open(inference.MODEL_PATH, "rb") as f:
+                pickle.load(f)
+    else:
+        def load():
+            inference.load_model_and_scaler(engine=engine)
+    return summarize("load", engine, 0, time_call(load, repeats, warmup=1))
+
+
+def bench_engine(engine, batch_sizes, rows, load_repeats):
+    results = [bench_load(engine, load_repeats)]
+    model, scaler = inference.load_model_and_scaler(engine=engine)
+    for batch in batch_sizes:
+        X = rows[:batch]
+        repeats = REPEATS.get(batch, 10)
+        if scaler is not None:
+            results.append(summarize("transform", engine, batch,
+                                     time_call(lambda: scaler.transform(X), repeats)))
+            X_scaled = scaler.transform(X)
+        else:
+            X_scaled = X
+        results.append(summarize("predict_proba", engine, batch,
+                                 time_call(lambda: model.predict_proba(X_scaled), repeats)))
+        results.append(summarize("predict_with_proba", engine, batch,
+                                 time_call(lambda: inference.predict_with_proba(model, scaler, X), repeats)))
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def result_key(r):
+    return (r["name"], r["engine"], r["batch"])
+
+
+def compare(baseline, current, tolerance):
+    # Regressions are p50 slowdowns beyond tolerance (0.2 = 20%) against a previous run
+    base = {result_key(r): r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        old = base.get(result_key(r))
+        if old and old["p50_ms"] > 0 and r["p50_ms"] > old["p50_ms"] * (1 + tolerance):
+            regressions.append((r, old))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark model load, scaling and prediction latency.")
+    parser.add_argument("--engines", nargs="+", choices=inference.ENGINES, default=list(inference.ENGINES))
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=list(DEFAULT_BATCH_SIZES))
+    parser.add_argument("--load-repeats", type=int, default=5)
+    parser.add_argument("--output", default=BENCH_PATH, help="where to write the JSON results")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON from an earlier run to check against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed p50 slowdown against the baseline (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore", category=UserWarning)
+    rows = synthetic_rows(max(args.batch_sizes))
+
+    results = []
+    for engine in args.engines:
+        try:
+            results.extend(bench_engine(engine, args.batch_sizes, rows, args.load_repeats))
+        except FileNotFoundError as e:
+            print(f"⚠️ Skipping {engine}: {e}", file=sys.stderr)
+
+    report = {"environment": environment(), "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'stage':<20}{'engine':<9}{'batch':>9}{'p50 ms':>11}{'p99 ms':>11}{'rows/s':>14}")
+    for r in results:
+        rate = f"{r['rows_per_s']:,.0f}" if r["rows_per_s"] else "-"
+        print(f"{r['name']:<20}{r['engine']:<9}{r['batch']:>9}{r['p50_ms']:>11.3f}{r['p99_ms']:>11.3f}{rate:>14}")
+    print(f"✅ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.tolerance)
+        for r, old in regressions:
+            print(f"❌ {r['name']} [{r['engine']}, batch {r['batch']}]: "
+                  f"p50 {old['p50_ms']:.3f} -> {r['p50_ms']:.3f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"✅ No p50 regressions beyond {args.tolerance:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+import argparse
+import importlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("wine.cold_start")
+
+COLD_START_PATH = "cold_start_results.json"
+# One JSON line per benchmark run, so the numbers can be followed from commit to commit
+HISTORY_PATH = "cold_start_history.jsonl"
+APPS = ("wine_quality_ui.py", "simple_wine_app.py")
+# Imported on a background thread once the first page is out, while the user is still choosing
+# values: the first result needs them (st.bar_chart draws with altair)
+WARM_IMPORTS = ("pandas", "altair")
+# Imports below this share of the first page are folded into one "other imports" line
+MIN_IMPORT_SHARE = 0.01
+
+# Set for profiled runs: step boundaries are written to stderr between python -X importtime's
+# lines, so imports can be charged to the step that triggered them
+MARKS = os.environ.get("WINE_COLD_START_MARKS") == "1"
+
+# Stdlib only, and imported ahead of the apps' own modules, so those count towards startup
+_started = time.perf_counter()
+# First duration of each step in this process; later reruns hit st.cache_resource and aren't startup
+_steps = {}
+_reported = False
+_warm_thread = None
+
+
+@contextmanager
+def step(name):
+    # Times a startup step (an artifact load, an index build) the first time it runs in this process
+    if name in _steps:
+        yield
+        return
+    mark(f"step {name}")
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _steps.setdefault(name, time.perf_counter() - start)
+        mark("end")
+
+
+def mark(text):
+    if MARKS:
+        sys.stderr.write(f"cold_start: {text}\n")
+        sys.stderr.flush()
+
+
+def steps():
+    return dict(_steps)
+
+
+def rendered(warm=WARM_IMPORTS):
+    # Called at the end of an app's script: the first time, logs the breakdown and starts warming
+    global _reported, _warm_thread
+    if _reported:
+        return
+    _reported = True
+    total = time.perf_counter() - _started
+    logger.info("First page in %.0f ms (%s)", total * 1e3,
+                ", ".join(f"{name} {s * 1e3:.0f} ms" for name, s in _steps.items()) or "no steps")
+    if warm:
+        _warm_thread = threading.Thread(target=_warm, args=(warm,), name="cold-start-warm", daemon=True)
+        _warm_thread.start()
+
+
+def _warm(modules):
+    for name in modules:
+        try:
+            with step(f"warm {name}"):
+                importlib.import_module(name)
+        except ImportError:
+            logger.warning("Could not warm %s", name)
+
+
+def warmed(timeout=None):
+    # Wait for the background imports; True when they are done or were never started
+    if _warm_thread is not None:
+        _warm_thread.join(timeout)
+        return not _warm_thread.is_alive()
+    return True
+
+
+# Runs in a fresh interpreter: the app's first page and first prediction through streamlit's
+# script runner, the way a server's first session would see them
+CHILD = """
+import json, sys, time
+started = time.time()
+from streamlit.testing.v1 import AppTest
+imported = time.time()
+import cold_start
+cold_start.mark("page")
+at = AppTest.from_file(sys.argv[1], default_timeout=300).run()
+page = time.time()
+page_steps = {k: v for k, v in cold_start.steps().items() if not k.startswith("warm ")}
+errors = [str(e.value) for e in at.exception]
+# A user takes longer than the warm-up to pick values and press predict
+cold_start.warmed()
+warm_steps = {k: v for k, v in cold_start.steps().items() if k.startswith("warm ")}
+cold_start.mark("predict")
+clicked = time.time()
+if not errors:
+    [b for b in at.button if "Predict" in b.label][0].click().run()
+    errors = [str(e.value) for e in at.exception]
+predicted = time.time()
+print(json.dumps({"started": started, "streamlit_s": imported - started, "page_s": page - imported,
+                  "predict_s": predicted - clicked, "page_steps": page_steps, "warm_steps": warm_steps,
+                  "predict_steps": {k: v for k, v in cold_start.steps().items()
+                                    if k not in page_steps and k not in warm_steps},
+                  "errors": errors}))
+"""
+
+
+def run_app(app, importtime=False):
+    """Time one cold start of app in a new process.
+
+    Returns seconds for interpreter startup, importing streamlit, the first rendered
+    page and the first prediction after it, plus the steps recorded on the way.
+    With importtime, also the app's own imports from python -X importtime.
+    """
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", CHILD, os.path.abspath(app)]
+    env = {**os.environ, "WINE_COLD_START_MARKS": "1"} if importtime else None
+    launched = time.time()
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=env,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0:
+        raise RuntimeError(f"{app} did not start: {proc.stderr.strip().splitlines()[-1:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if result["errors"]:
+        raise RuntimeError(f"{app} raised: {result['errors'][0]}")
+    result["interpreter_s"] = result.pop("started") - launched
+    result["first_page_s"] = result["interpreter_s"] + result["streamlit_s"] + result["page_s"]
+    if importtime:
+        result.update(parse_importtime(proc.stderr.splitlines()))
+    return result
+
+
+def parse_importtime(lines):
+    """Seconds per top-level import from python -X importtime output with cold_start marks.
+
+    Returns page_imports and predict_imports for the imports made outside any step
+    in each phase, and step_imports with the import time inside each step. Nested
+    imports are already inside their parent's cumulative time.
+    """
+    out = {"page_imports": {}, "predict_imports": {}, "step_imports": {}}
+    phase = step = None
+    for line in lines:
+        if line.startswith("cold_start: "):
+            text = line[len("cold_start: "):]
+            if text in ("page", "predict"):
+                phase = f"{text}_imports"
+            elif text.startswith("step "):
+                step = text[len("step "):]
+            elif text == "end":
+                step = None
+            continue
+        if phase is None or not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # One space before a top-level name, two more per level of nesting; skips the header too
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        seconds = int(cumulative) / 1e6
+        if step is not None:
+            out["step_imports"][step] = out["step_imports"].get(step, 0) + seconds
+        else:
+            out[phase][name.strip()] = out[phase].get(name.strip(), 0) + seconds
+    return out
+
+
+def print_profile(app, r):
+    page = r["first_page_s"]
+    print(f"{app}: first page {page * 1e3:.0f} ms after launch, first prediction {r['predict_s'] * 1e3:.0f} ms later")
+    lines = [("interpreter startup", r["interpreter_s"], ""), ("import streamlit", r["streamlit_s"], "")]
+    lines += breakdown(r["page_imports"], r["page_steps"], r["step_imports"], page)
+    lines.append(("script and rendering", page - sum(s for _, s, _ in lines), ""))
+    for name, s, note in lines:
+        print(f"  {name:<36}{s * 1e3:>9.0f} ms{s / page:>7.0%}{note}")
+    if r["warm_steps"]:
+        print("  warmed in the background after the page:")
+        for name, s in r["warm_steps"].items():
+            print(f"    {name:<34}{s * 1e3:>9.0f} ms")
+    print("  first prediction:")
+    deferred = breakdown(r["predict_imports"], r["predict_steps"], r["step_imports"], page)
+    deferred.append(("prediction and rendering", r["predict_s"] - sum(s for _, s, _ in deferred), ""))
+    for name, s, note in deferred:
+        print(f"    {name:<34}{s * 1e3:>9.0f} ms{note}")
+
+
+def breakdown(imports, steps, step_imports, page):
+    # Biggest imports first, small ones folded together, then the recorded steps in run order
+    imports = sorted(imports.items(), key=lambda item: -item[1])
+    lines = [(f"import {name}", s, "") for name, s in imports if s >= page * MIN_IMPORT_SHARE]
+    other = sum(s for _, s in imports if s < page * MIN_IMPORT_SHARE)
+    if other:
+        lines.append(("other imports", other, ""))
+    for name, s in steps.items():
+        imported = step_imports.get(name, 0)
+        lines.append((f"step {name}", s, f"  ({imported * 1e3:.0f} ms of it imports)" if imported else ""))
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Profile and benchmark the Streamlit apps' time to first rendered page from a cold process."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    profile = sub.add_parser("profile", help="break one cold start down by import and startup step")
+    profile.add_argument("apps", nargs="*", default=list(APPS))
+    bench = sub.add_parser("bench", help="time repeated cold starts and record them")
+    bench.add_argument("apps", nargs="*", default=list(APPS))
+    bench.add_argument("--runs", type=int, default=5)
+    bench.add_argument("--output", default=COLD_START_PATH, help="where to write the JSON results")
+    bench.add_argument("--history", default=HISTORY_PATH, help="JSON lines file each run is appended to")
+    bench.add_argument("--compare", metavar="BASELINE", help="JSON from an earlier run to check against")
+    bench.add_argument("--tolerance", type=float, default=0.2,
+                       help="allowed p50 slowdown against the baseline (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    missing = [app for app in args.apps if not os.path.exists(app)]
+    if missing:
+        print(f"❌ No such app: {', '.join(missing)}", file=sys.stderr)
+        return 1
+
+    try:
+        if args.command == "profile":
+            for app in args.apps:
+                print_profile(app, run_app(app, importtime=True))
+            return 0
+
+        import numpy as np
+        import benchmark
+        results = []
+        for app in args.apps:
+            runs = [run_app(app) for _ in range(args.runs)]
+            for name in ("first_page_s", "predict_s"):
+                results.append(benchmark.summarize(f"{name[:-2]}:{app}", "cold", 0,
+                                                   np.array([r[name] for r in runs])))
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    report = {"environment": benchmark.environment(), "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    with open(args.history, "a") as f:
+        f.write(json.dumps(report) + "\n")
+
+    print(f"{'measure':<36}{'p50 ms':>10}{'min ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['name']:<36}{r['p50_ms']:>10.0f}{r['min_ms']:>10.0f}{r['p99_ms']:>10.0f}")
+    print(f"✅ Results written to {args.output} and appended to {args.history}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = benchmark.compare(baseline, report, args.tolerance)
+        for r, old in regressions:
+            print(f"❌ {r['name']}: p50 {old['p50_ms']:.0f} -> {r['p50_ms']:.0f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"✅ No p50 regressions beyond {args.tolerance:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import argparse
+import pickle
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import benchmark
+import inference
+from forest_engine import CompactForest
+
+
+def leaf_distributions(tree):
+    value = tree.value[:, 0, :]
+    return value / value.sum(axis=1, keepdims=True)
+
+
+def prune_tree(tree):
+    # A split whose two sides end in the same class distribution can't change the outcome, so it
+    # becomes a leaf; working from the highest node id down lets collapses cascade up the tree.
+    # Returns (distribution or None per node); None marks a split that has to stay
+    left, right = tree.children_left, tree.children_right
+    value = leaf_distributions(tree)
+    dist = [None] * tree.node_count
+    for node in range(tree.node_count - 1, -1, -1):
+        if left[node] == -1:
+            dist[node] = value[node]
+            continue
+        a, b = dist[left[node]], dist[right[node]]
+        if a is not None and b is not None and np.array_equal(a, b):
+            dist[node] = a
+    return dist
+
+
+def round_down_float32(threshold):
+    # float32 x <= t  <=>  x <= largest float32 not above t, so this keeps every branch decision
+    t32 = threshold.astype(np.float32)
+    return np.where(t32 > threshold, np.nextafter(t32, np.float32(-np.inf)), t32)
+
+
+def compact(model):
+    features, thresholds, lefts, rights, leaf_dists, roots = [], [], [], [], [], []
+    max_depth = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        dist = prune_tree(tree)
+        roots.append(len(features))
+        # Depth-first re-layout of the kept nodes: (sklearn node, depth, slot in the parent to patch)
+        stack = [(0, 0, None)]
+        while stack:
+            node, depth, patch = stack.pop()
+            index = len(features)
+            if patch is not None:
+                patch[0][patch[1]] = index
+            max_depth = max(max_depth, depth)
+            if dist[node] is not None:
+                features.append(0)
+                thresholds.append(np.inf)
+                lefts.append(index)
+                rights.append(index)
+                leaf_dists.append((index, dist[node]))
+            else:
+                features.append(tree.feature[node])
+                thresholds.append(tree.threshold[node])
+                lefts.append(-1)
+                rights.append(-1)
+                stack.append((tree.children_right[node], depth + 1, (rights, index)))
+                stack.append((tree.children_left[node], depth + 1, (lefts, index)))
+
+    n = len(features)
+    leaf_nodes = np.array([i for i, _ in leaf_dists])
+    table, inverse = np.unique(np.array([d for _, d in leaf_dists], dtype=np.float32),
+                               axis=0, return_inverse=True)
+    index_dtype = next(t for t in (np.uint8, np.uint16, np.uint32) if len(table) <= np.iinfo(t).max + 1)
+    leaf = np.zeros(n, dtype=index_dtype)
+    leaf[leaf_nodes] = inverse.ravel()
+
+    return CompactForest(
+        feature=np.asarray(features, dtype=np.uint8),
+        threshold=round_down_float32(np.asarray(thresholds, dtype=np.float64)),
+        left=np.asarray(lefts, dtype=np.int32),
+        right=np.asarray(rights, dtype=np.int32),
+        leaf=leaf,
+        table=table,
+        roots=np.asarray(roots, dtype=np.int32),
+        classes=np.asarray(model.classes_),
+        max_depth=int(max_depth),
+    )
+
+
+def load_seconds(blob, repeats=5):
+    return float(np.median(benchmark.time_call(lambda: pickle.loads(blob), repeats, warmup=1)))
+
+
+def report(model, compacted, scaler, X, y=None):
+    # Size, load time and prediction drift of the compact forest against the original
+    original_blob, compact_blob = pickle.dumps(model), pickle.dumps(compacted)
+    labels, proba = inference.predict_with_proba(model, scaler, X)
+    compact_labels, compact_proba = inference.predict_with_proba(compacted, scaler, X)
+    result = {
+        "nodes": sum(e.tree_.node_count for e in model.estimators_),
+        "compact_nodes": compacted.n_nodes,
+        "distinct_leaves": len(compacted.table),
+        "bytes": len(original_blob),
+        "compact_bytes": len(compact_blob),
+        "load_ms": load_seconds(original_blob) * 1e3,
+        "compact_load_ms": load_seconds(compact_blob) * 1e3,
+        "label_mismatches": int(np.count_nonzero(labels != compact_labels)),
+        "max_proba_diff": float(np.abs(proba - compact_proba).max()),
+    }
+    if y is not None:
+        result["accuracy"] = float(np.mean(labels[:len(y)] == y))
+        result["compact_accuracy"] = float(np.mean(compact_labels[:len(y)] == y))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Prune and narrow the trained forest into a smaller, faster-loading model."
+    )
+    parser.add_argument("--model", default=inference.MODEL_PATH)
+    parser.add_argument("--scaler", default=inference.SCALER_PATH)
+    parser.add_argument("--data", default="WineQT.csv", help="CSV used to check the compact model")
+    parser.add_argument("--synthetic-rows", type=int, default=20_000,
+                        help="extra synthetic rows to check probabilities on")
+    parser.add_argument("--max-proba-diff", type=float, default=1e-6)
+    parser.add_argument("--output", default=inference.COMPACT_MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore", category=UserWarning)
+    try:
+        model, scaler = inference.load_model_and_scaler(args.model, args.scaler)
+    except FileNotFoundError as e:
+        print(f"❌ Model files not found: {e}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    compacted = compact(model)
+    elapsed = time.perf_counter() - start
+
+    # Full float64 values from the CSV: the float32 dataset cache would hide rounding differences
+    df = pd.read_csv(args.data)
+    X = df[inference.FEATURE_NAMES].to_numpy(dtype=np.float64)
+    if args.synthetic_rows:
+        X = np.vstack([X, benchmark.synthetic_rows(args.synthetic_rows, args.data)])
+    r = report(model, compacted, scaler, X, df["quality"].to_numpy())
+
+    print(f"nodes         {r['nodes']:>10,} -> {r['compact_nodes']:,} "
+          f"({r['distinct_leaves']:,} distinct leaf distributions)")
+    print(f"pickle bytes  {r['bytes']:>10,} -> {r['compact_bytes']:,}")
+    print(f"load ms       {r['load_ms']:>10.2f} -> {r['compact_load_ms']:.2f}")
+    if "accuracy" in r:
+        print(f"accuracy      {r['accuracy']:>10.4f} -> {r['compact_accuracy']:.4f} on {args.data}")
+    print(f"max |Δproba|  {r['max_proba_diff']:>10.2e}, label changes {r['label_mismatches']} "
+          f"of {len(X)} rows; compacted in {elapsed:.2f}s")
+
+    if r["max_proba_diff"] > args.max_proba_diff:
+        print(f"❌ Probabilities moved by more than {args.max_proba_diff:g}; not writing {args.output}",
+              file=sys.stderr)
+        return 1
+    with open(args.output, "wb") as f:
+        pickle.dump(compacted, f)
+    print(f"✅ Compact model saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+import pickle
+import warnings
+
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+import inference
+
+
+@pytest.fixture(scope="session")
+def wine_df():
+    return pd.read_csv("WineQT.csv")
+
+
+@pytest.fixture(scope="session")
+def model_and_scaler(wine_df):
+    # RF_model.pkl is not checked in, so fit a small forest against the saved scaler
+    warnings.filterwarnings("ignore", category=UserWarning)
+    with open(inference.SCALER_PATH, 'rb') as scaler_file:
+        scaler = pickle.load(scaler_file)
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()
+    model = RandomForestClassifier(n_estimators=20, random_state=0)
+    model.fit(scaler.transform(X), wine_df["quality"])
+    return model, scaler
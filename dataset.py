@@ -0,0 +1,193 @@
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import inference
+
+CACHE_DIR = ".dataset_cache"
+MAGIC = b"WINECOL1"
+FORMAT_VERSION = 1
+# Column blocks start on a cache-line boundary
+ALIGN = 64
+
+FEATURE_DTYPE = np.dtype("<f4")
+LABEL_DTYPE = np.dtype("i1")
+LABEL_COLUMN = "quality"
+
+
+class Dataset:
+    """Features and labels of a converted CSV, backed by a memory-mapped file.
+
+    features is an (n_rows, n_features) float32 view whose columns are each
+    contiguous on disk; labels is int8, or None when the CSV had no quality
+    column. Row slices of either are views, so nothing is copied until a
+    caller asks for a different dtype.
+    """
+
+    def __init__(self, features, labels, feature_names, path):
+        self.features = features
+        self.labels = labels
+        self.feature_names = feature_names
+        self.path = path
+
+    def __len__(self):
+        return len(self.features)
+
+    def frame(self):
+        return pd.DataFrame(self.features, columns=self.feature_names, copy=False)
+
+    def label_series(self):
+        return pd.Series(self.labels, name=LABEL_COLUMN)
+
+
+def source_stamp(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def cache_path(csv_path, cache_dir=CACHE_DIR):
+    # Named after the CSV, plus a hash of its full path so same-named files don't collide
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    tag = hashlib.sha256(os.path.abspath(csv_path).encode()).hexdigest()[:8]
+    return os.path.join(cache_dir, f"{stem}-{tag}.cols")
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def convert(csv_path, path):
+    """Parse csv_path once and write it as a typed columnar file at path.
+
+    Layout: MAGIC, a uint32 header length, a JSON header, then the features as
+    one float32 block per column and the labels as int8, each block aligned to
+    ALIGN bytes. The header carries a SHA-256 of both blocks and the CSV's size
+    and mtime, which load() uses to notice the CSV has changed.
+    """
+    df = pd.read_csv(csv_path)
+    missing = [name for name in inference.FEATURE_NAMES if name not in df.columns]
+    if missing:
+        raise ValueError(f"{csv_path} is missing required columns: {', '.join(missing)}")
+
+    # Transposed so each feature is one contiguous run, the order column-wise statistics read it in
+    features = np.ascontiguousarray(df[inference.FEATURE_NAMES].to_numpy(dtype=FEATURE_DTYPE).T)
+    labels = None
+    if LABEL_COLUMN in df.columns:
+        labels = df[LABEL_COLUMN].to_numpy()
+        info = np.iinfo(LABEL_DTYPE)
+        if labels.min() < info.min or labels.max() > info.max:
+            raise ValueError(f"{LABEL_COLUMN} values don't fit in {LABEL_DTYPE}")
+        labels = labels.astype(LABEL_DTYPE)
+
+    digest = hashlib.sha256(features.tobytes())
+    if labels is not None:
+        digest.update(labels.tobytes())
+
+    # Offsets depend on the header length, which depends on the offsets: size it with placeholders first
+    header = {
+        "format_version": FORMAT_VERSION,
+        "rows": len(df),
+        "feature_names": inference.FEATURE_NAMES,
+        "feature_dtype": FEATURE_DTYPE.str,
+        "label_dtype": LABEL_DTYPE.str if labels is not None else None,
+        "features_offset": 0,
+        "labels_offset": 0,
+        "sha256": digest.hexdigest(),
+        "source": source_stamp(csv_path),
+    }
+    prefix = len(MAGIC) + 4 + len(json.dumps(header)) + 32
+    header["features_offset"] = _aligned(prefix)
+    header["labels_offset"] = _aligned(header["features_offset"] + features.nbytes)
+    encoded = json.dumps(header).encode().ljust(header["features_offset"] - len(MAGIC) - 4)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(encoded)) + encoded)
+        f.write(features.tobytes())
+        if labels is not None:
+            f.write(b"\0" * (header["labels_offset"] - f.tell()))
+            f.write(labels.tobytes())
+    os.replace(tmp_path, path)
+    return header
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a columnar dataset file")
+        (length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(length))
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported dataset format {header.get('format_version')!r} in {path}")
+    return header
+
+
+def open_file(path, verify=False):
+    header = read_header(path)
+    n, names = header["rows"], header["feature_names"]
+    columns = np.memmap(path, dtype=header["feature_dtype"], mode="r",
+                        offset=header["features_offset"], shape=(len(names), n))
+    labels = None
+    if header["label_dtype"]:
+        labels = np.memmap(path, dtype=header["label_dtype"], mode="r",
+                           offset=header["labels_offset"], shape=(n,))
+    if verify:
+        digest = hashlib.sha256(columns.tobytes())
+        if labels is not None:
+            digest.update(labels.tobytes())
+        if digest.hexdigest() != header["sha256"]:
+            raise ValueError(f"Checksum mismatch in {path}; delete it to rebuild from the CSV")
+    return Dataset(columns.T, labels, names, path)
+
+
+def is_current(path, csv_path):
+    try:
+        return read_header(path)["source"] == source_stamp(csv_path)
+    except (FileNotFoundError, ValueError):
+        return False
+
+
+def load(csv_path="WineQT.csv", cache_dir=CACHE_DIR, verify=False):
+    # The one entry point tools use: converts on first use or when the CSV changes, then memory-maps
+    path = cache_path(csv_path, cache_dir)
+    if not is_current(path, csv_path):
+        convert(csv_path, path)
+    return open_file(path, verify)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a wine CSV to the memory-mapped columnar cache.")
+    parser.add_argument("csv", nargs="?", default="WineQT.csv")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--verify", action="store_true", help="check the stored checksum")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    parsed = pd.read_csv(args.csv)
+    csv_ms = (time.perf_counter() - start) * 1e3
+    path = cache_path(args.csv, args.cache_dir)
+    header = convert(args.csv, path)
+
+    start = time.perf_counter()
+    try:
+        data = open_file(path, verify=args.verify)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    load_ms = (time.perf_counter() - start) * 1e3
+    print(f"✅ {header['rows']} rows of {args.csv} written to {path} ({os.path.getsize(path):,} bytes)")
+    print(f"read_csv {csv_ms:.2f} ms ({parsed.memory_usage(deep=True).sum():,} bytes in memory), "
+          f"mapped load {load_ms:.2f} ms for {len(data)} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
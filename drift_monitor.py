@@ -0,0 +1,225 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+
+import numpy as np
+
+import dataset
+import inference
+import metrics
+
+logger = logging.getLogger("wine.drift")
+
+SNAPSHOT_PATH = "drift_snapshot.json"
+N_BINS = 16
+# Common rule of thumb: PSI above 0.1 is a moderate shift, above 0.25 a major one
+PSI_THRESHOLD = 0.2
+# Standardized mean shift, |mean - training mean| / training std
+MEAN_SHIFT_THRESHOLD = 1.0
+# Observations needed before a feature's scores are trusted enough to alert on
+MIN_COUNT = 200
+# Added to every bin proportion so empty bins don't make the PSI infinite
+EPSILON = 1e-4
+# Rows between drift checks; scoring every single-row update would cost more than the update
+CHECK_EVERY = 50
+
+
+def build_snapshot(X, n_bins=N_BINS):
+    """Training reference for the monitor: moments and an equal-width histogram per feature.
+
+    Bins span the training min..max; two extra bins catch values below and above
+    that range, which training never saw.
+    """
+    X = np.asarray(X)
+    lo, hi = X.min(axis=0), X.max(axis=0)
+    if X.dtype == np.float32:
+        # Widen by one float32 step so the float64 originals of the extreme rows still land inside
+        lo = np.nextafter(lo, np.float32(-np.inf))
+        hi = np.nextafter(hi, np.float32(np.inf))
+    X = X.astype(np.float64)
+    lo, hi = lo.astype(np.float64), hi.astype(np.float64)
+    counts = np.bincount(bin_index(X, lo, hi, n_bins).ravel(), minlength=X.shape[1] * (n_bins + 2))
+    return {
+        "feature_names": inference.FEATURE_NAMES,
+        "rows": len(X),
+        "mean": X.mean(axis=0).tolist(),
+        "std": X.std(axis=0).tolist(),
+        "low": lo.tolist(),
+        "high": hi.tolist(),
+        "n_bins": n_bins,
+        "proportions": (counts.reshape(X.shape[1], n_bins + 2) / len(X)).tolist(),
+    }
+
+
+def bin_index(X, lo, hi, n_bins):
+    # X must be finite. Flat index into an (n_features, n_bins + 2) histogram: per feature, bin 0 is below lo and
+    # bin n_bins + 1 above hi. Arithmetic lookup rather than searchsorted keeps it a few vector ops
+    width = np.where(hi > lo, (hi - lo) / n_bins, 1.0)
+    idx = np.floor((X - lo) / width)
+    idx += 1
+    np.clip(idx, 0, n_bins + 1, out=idx)
+    # The training maximum belongs in the last regular bin, not the overflow one
+    idx[X == hi] = n_bins
+    return idx.astype(np.intp) + np.arange(X.shape[1]) * (n_bins + 2)
+
+
+def psi(expected, observed):
+    p = expected + EPSILON
+    q = observed + EPSILON
+    return np.sum((q - p) * np.log(q / p), axis=-1)
+
+
+class DriftMonitor:
+    """Streaming per-feature statistics of prediction inputs, compared with a training snapshot.
+
+    update() merges a batch into running counts, means and M2 sums (Chan et al.) and
+    into fixed-bin histograms: a handful of vector operations per call, independent of
+    how much has been seen. Scores are checked every check_every rows; a feature alerts
+    once when its PSI or standardized mean shift crosses the threshold, and re-arms
+    when it falls back below.
+    """
+
+    def __init__(self, snapshot, psi_threshold=PSI_THRESHOLD,
+                 mean_shift_threshold=MEAN_SHIFT_THRESHOLD, min_count=MIN_COUNT,
+                 check_every=CHECK_EVERY):
+        self.snapshot = snapshot
+        self.psi_threshold = psi_threshold
+        self.mean_shift_threshold = mean_shift_threshold
+        self.min_count = min_count
+        self.check_every = check_every
+        self._ref_mean = np.asarray(snapshot["mean"])
+        self._ref_std = np.asarray(snapshot["std"])
+        self._low = np.asarray(snapshot["low"])
+        self._high = np.asarray(snapshot["high"])
+        self._ref_proportions = np.asarray(snapshot["proportions"])
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        n_features, n_bins = self._ref_proportions.shape
+        with self._lock:
+            self.count = 0
+            self.mean = np.zeros(n_features)
+            self.m2 = np.zeros(n_features)
+            self.counts = np.zeros((n_features, n_bins), dtype=np.int64)
+            self.alerting = np.zeros(n_features, dtype=bool)
+            self._next_check = 0
+
+    def update(self, X):
+        # Returns a bool per feature, True for features that started drifting with this batch
+        X = inference.as_feature_matrix(X)
+        # NaN has no histogram bin and would poison the running moments: drop such rows up front
+        finite = np.isfinite(X).all(axis=1)
+        if not finite.all():
+            metrics.inc("drift_rows_skipped", int(len(X) - finite.sum()))
+            X = X[finite]
+        n = len(X)
+        if n == 0:
+            return np.zeros_like(self.alerting)
+        batch_mean = X.sum(axis=0) / n
+        batch_m2 = np.square(X - batch_mean).sum(axis=0)
+        idx = bin_index(X, self._low, self._high, self.snapshot["n_bins"]).ravel()
+        with self._lock:
+            total = self.count + n
+            delta = batch_mean - self.mean
+            self.mean = self.mean + delta * (n / total)
+            self.m2 = self.m2 + batch_m2 + delta ** 2 * (self.count * n / total)
+            self.count = total
+            flat = self.counts.reshape(-1)
+            if n == 1:
+                # One row touches each feature's histogram once, so plain fancy-index add is safe
+                flat[idx] += 1
+            else:
+                flat += np.bincount(idx, minlength=flat.size)
+            if total < self._next_check:
+                return np.zeros_like(self.alerting)
+            self._next_check = total + self.check_every
+            scores = self._scores()
+            drifted = self._drifted(scores)
+            alert = drifted & ~self.alerting
+            self.alerting = drifted
+        if alert.any():
+            names = [inference.FEATURE_NAMES[i] for i in np.flatnonzero(alert)]
+            metrics.inc("drift_alerts", len(names))
+            logger.warning("Input drift on %s after %d rows (PSI %s)", ", ".join(names), total,
+                           ", ".join(f"{scores['psi'][i]:.3f}" for i in np.flatnonzero(alert)))
+        return alert
+
+    def _scores(self):
+        observed = self.counts / max(self.count, 1)
+        ref_std = np.where(self._ref_std > 0, self._ref_std, 1.0)
+        return {
+            "psi": psi(self._ref_proportions, observed),
+            "mean_shift": np.abs(self.mean - self._ref_mean) / ref_std,
+        }
+
+    def _drifted(self, scores):
+        if self.count < self.min_count:
+            return np.zeros_like(self.alerting)
+        return (scores["psi"] > self.psi_threshold) | (scores["mean_shift"] > self.mean_shift_threshold)
+
+    def report(self):
+        # Per-feature view for /drift and the UI
+        with self._lock:
+            scores = self._scores()
+            std = np.sqrt(self.m2 / self.count) if self.count else np.zeros_like(self.m2)
+            return {
+                "count": self.count,
+                "features": {
+                    name: {
+                        "mean": float(self.mean[i]),
+                        "std": float(std[i]),
+                        "training_mean": float(self._ref_mean[i]),
+                        "psi": float(scores["psi"][i]),
+                        "mean_shift": float(scores["mean_shift"][i]),
+                        "drifted": bool(self.alerting[i]),
+                    }
+                    for i, name in enumerate(inference.FEATURE_NAMES)
+                },
+            }
+
+
+def load_snapshot(path=SNAPSHOT_PATH, data_path="WineQT.csv"):
+    # A saved snapshot wins; otherwise build one from the training CSV, which takes milliseconds here
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return build_snapshot(dataset.load(data_path).features)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the drift snapshot or time monitor updates.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    snap = sub.add_parser("snapshot", help="write the training reference statistics")
+    snap.add_argument("--data", default="WineQT.csv")
+    snap.add_argument("--bins", type=int, default=N_BINS)
+    snap.add_argument("--output", default=SNAPSHOT_PATH)
+    bench = sub.add_parser("bench", help="time update() per single row and per batch")
+    bench.add_argument("--snapshot", default=SNAPSHOT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "snapshot":
+        snapshot = build_snapshot(dataset.load(args.data).features, args.bins)
+        with open(args.output, "w") as f:
+            json.dump(snapshot, f, indent=2)
+        print(f"✅ Snapshot of {snapshot['rows']} rows written to {args.output}")
+        return 0
+
+    import benchmark
+    # Thresholds off: a benchmark repeating one row is drift by definition
+    monitor = DriftMonitor(load_snapshot(args.snapshot), psi_threshold=np.inf,
+                           mean_shift_threshold=np.inf)
+    rows = benchmark.synthetic_rows(4096)
+    print(f"{'batch':>6}{'p50 us':>10}{'us/row':>10}")
+    for batch in (1, 64, 4096):
+        timings = benchmark.time_call(lambda: monitor.update(rows[:batch]), 200 if batch < 4096 else 20)
+        p50 = np.percentile(timings, 50) * 1e6
+        print(f"{batch:>6}{p50:>10.1f}{p50 / batch:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
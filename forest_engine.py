@@ -0,0 +1,226 @@
+import argparse
+import sys
+import time
+import warnings
+
+import numpy as np
+
+import inference
+
+# Rows evaluated together; bounds the (rows, trees, classes) leaf-value gather
+BLOCK_ROWS = 4096
+
+
+class PackedForest:
+    """A fitted forest flattened into contiguous node arrays.
+
+    Every tree's nodes live in the same feature/threshold/left/right/value
+    arrays, with roots[t] pointing at tree t's first node. Leaves point back
+    at themselves with an infinite threshold, so a row can be walked for
+    max_depth steps without checking whether it has already arrived.
+    Exposes classes_, predict and predict_proba so it can stand in for the
+    sklearn model anywhere inference.predict_with_proba is used.
+
+    input_dtype is float32 for a forest trained on scaled data (sklearn's own
+    tree precision) and float64 once fold_scaler() has moved the thresholds
+    into raw physicochemical units.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes, max_depth,
+                 input_dtype=np.float32):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = max_depth
+        self.input_dtype = input_dtype
+        self.n_features_in_ = len(inference.FEATURE_NAMES)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            leaf = tree.children_left == -1
+            nodes = np.arange(offset, offset + n)
+
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold))
+            lefts.append(np.where(leaf, nodes, tree.children_left + offset))
+            rights.append(np.where(leaf, nodes, tree.children_right + offset))
+
+            value = tree.value[:, 0, :]
+            values.append(value / value.sum(axis=1, keepdims=True))
+
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.int32),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.int32),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.int32),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=np.asarray(model.classes_),
+            max_depth=int(max_depth),
+        )
+
+    def fold_scaler(self, scaler):
+        # x_scaled <= t  <=>  x <= t * scale + mean, since StandardScaler's scale_ is always positive.
+        # sklearn actually compares float32((x - mean) / scale) <= t, so t * scale + mean is only
+        # the neighbourhood of the true cut; bisect there for the largest raw float64 that still
+        # goes left, which makes the fused forest agree with scaler + forest on every input.
+        n_features = len(inference.FEATURE_NAMES)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+
+        split = ~np.isinf(self.threshold)
+        t = self.threshold[split]
+        s = scale[self.feature[split]]
+        m = mean[self.feature[split]]
+
+        def goes_left(x):
+            return ((x - m) / s).astype(np.float32) <= t
+
+        guess = t * s + m
+        width = (np.abs(t) * 1e-6 + 1e-6) * s + np.abs(guess) * 1e-12
+        lo, hi = guess - width, guess + width
+        bad = ~goes_left(lo) | goes_left(hi)
+        if bad.any():
+            # The bisection needs the true cut between lo and hi; without it the fused thresholds would be wrong
+            node = np.flatnonzero(split)[np.argmax(bad)]
+            tree = np.searchsorted(self.roots, node, side="right") - 1
+            raise ValueError(f"Could not bracket the raw threshold of tree {tree}, node {node - self.roots[tree]} "
+                             f"(scaled threshold {self.threshold[node]!r})")
+        while True:
+            open_ = np.nextafter(lo, hi) < hi
+            if not open_.any():
+                break
+            mid = np.where(open_, lo + (hi - lo) / 2, lo)
+            left = goes_left(mid)
+            lo = np.where(open_ & left, mid, lo)
+            hi = np.where(open_ & ~left, mid, hi)
+
+        threshold = self.threshold.copy()
+        threshold[split] = lo
+        return PackedForest(
+            feature=self.feature,
+            threshold=np.ascontiguousarray(threshold, dtype=np.float64),
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            classes=self.classes_,
+            max_depth=self.max_depth,
+            input_dtype=np.float64,
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def apply(self, X):
+        # Leaf index reached in every tree, shape (n_rows, n_trees)
+        # sklearn evaluates trees on float32 input, so do the same to land in the same leaves
+        X = np.asarray(X, dtype=self.input_dtype)
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            x = np.take_along_axis(X, self.feature[node], axis=1)
+            node = np.where(x <= self.threshold[node], self.left[node], self.right[node])
+        return node
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        proba = np.empty((len(X), len(self.classes_)), dtype=np.float64)
+        for start in range(0, len(X), BLOCK_ROWS):
+            leaves = self.apply(X[start:start + BLOCK_ROWS])
+            proba[start:start + BLOCK_ROWS] = self.leaf_proba(leaves)
+        return proba
+
+    def leaf_proba(self, leaves):
+        # Average the class distributions of a (rows, trees) block of leaf indices
+        return self.value[leaves].mean(axis=1)
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+class CompactForest(PackedForest):
+    """A PackedForest with redundant splits pruned and narrower node arrays.
+
+    Thresholds are float32, rounded down so float32 inputs take exactly the
+    branch sklearn would; features are uint8. Leaves hold an index into a
+    shared table of distinct class distributions (stored as float32) instead
+    of a float64 distribution per node. Only takes scaled input, like the
+    native engine.
+    """
+
+    def __init__(self, feature, threshold, left, right, leaf, table, roots, classes, max_depth):
+        super().__init__(feature, threshold, left, right, None, roots, classes, max_depth,
+                         input_dtype=np.float32)
+        self.leaf = leaf
+        self.table = table
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def leaf_proba(self, leaves):
+        return self.table[self.leaf[leaves]].mean(axis=1, dtype=np.float64)
+
+
+def latency_percentiles(fn, row, runs):
+    timings = np.empty(runs)
+    for i in range(runs):
+        start = time.perf_counter()
+        fn(row)
+        timings[i] = time.perf_counter() - start
+    return np.percentile(timings, 50) * 1e3, np.percentile(timings, 99) * 1e3
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare single-row latency of the sklearn forest and the packed engine."
+    )
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--model", default=inference.MODEL_PATH)
+    parser.add_argument("--scaler", default=inference.SCALER_PATH)
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore", category=UserWarning)
+    try:
+        model, scaler = inference.load_model_and_scaler(args.model, args.scaler)
+    except FileNotFoundError as e:
+        print(f"❌ Model files not found: {e}", file=sys.stderr)
+        return 1
+    packed = PackedForest.from_sklearn(model)
+
+    fused = packed.fold_scaler(scaler)
+
+    raw = np.array([[7.4, 0.7, 0.0, 1.9, 0.076, 11.0, 34.0, 0.9978, 3.51, 0.56, 9.4]])
+    row = scaler.transform(raw)
+    if not np.allclose(packed.predict_proba(row), model.predict_proba(row)):
+        print("❌ Packed engine disagrees with sklearn", file=sys.stderr)
+        return 1
+
+    # sklearn and native are timed on pre-scaled input; fused includes everything from raw values
+    print(f"{'engine':<10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, fn, x in (("sklearn", model.predict_proba, row),
+                        ("native", packed.predict_proba, row),
+                        ("fused", fused.predict_proba, raw)):
+        fn(x)
+        p50, p99 = latency_percentiles(fn, x, args.runs)
+        print(f"{name:<10}{p50:>10.3f}{p99:>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
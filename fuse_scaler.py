@@ -0,0 +1,59 @@
+import argparse
+import pickle
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import inference
+from forest_engine import PackedForest
+
+
+def fuse(model, scaler):
+    return PackedForest.from_sklearn(model).fold_scaler(scaler)
+
+
+def check_fused(model, scaler, fused, X):
+    # Compare against the original scaler + sklearn forest on raw feature rows
+    labels, proba = inference.predict_with_proba(model, scaler, X)
+    fused_labels, fused_proba = inference.predict_with_proba(fused, None, X)
+    mismatches = int(np.count_nonzero(labels != fused_labels))
+    max_diff = float(np.abs(proba - fused_proba).max())
+    return mismatches, max_diff
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fold scaler.pkl into the forest thresholds and write a raw-input model."
+    )
+    parser.add_argument("--model", default=inference.MODEL_PATH)
+    parser.add_argument("--scaler", default=inference.SCALER_PATH)
+    parser.add_argument("--data", default="WineQT.csv", help="CSV used to verify the fused model")
+    parser.add_argument("--output", default=inference.FUSED_MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore", category=UserWarning)
+    try:
+        model, scaler = inference.load_model_and_scaler(args.model, args.scaler)
+    except FileNotFoundError as e:
+        print(f"❌ Model files not found: {e}", file=sys.stderr)
+        return 1
+
+    fused = fuse(model, scaler)
+    X = pd.read_csv(args.data)[inference.FEATURE_NAMES].to_numpy(dtype="float64")
+    mismatches, max_diff = check_fused(model, scaler, fused, X)
+    if mismatches or max_diff > 1e-9:
+        print(f"❌ Fused model disagrees on {mismatches} of {len(X)} rows "
+              f"(max probability difference {max_diff:.2e}); not writing {args.output}",
+              file=sys.stderr)
+        return 1
+
+    with open(args.output, "wb") as f:
+        pickle.dump(fused, f)
+    print(f"✅ Fused model matches on all {len(X)} rows of {args.data}; saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
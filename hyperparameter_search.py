@@ -0,0 +1,165 @@
+import argparse
+import itertools
+import json
+import math
+import sys
+import time
+import warnings
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold
+
+import train_pipeline
+
+SEARCH_PATH = "search_results.json"
+
+SEARCH_SPACE = {
+    "n_estimators": [50, 100, 200, 400],
+    "max_depth": [None, 8, 12, 16, 24],
+    "min_samples_leaf": [1, 2, 4],
+    "max_features": ["sqrt", "log2", 0.5],
+}
+
+# Smallest row subset a rung may use; keeps every CV fold holding all six quality levels
+MIN_ROWS = 120
+
+
+def sample_candidates(n, space=SEARCH_SPACE, random_state=0):
+    grid = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    rng = np.random.default_rng(random_state)
+    return [grid[i] for i in rng.choice(len(grid), size=min(n, len(grid)), replace=False)]
+
+
+def rung_sizes(n_candidates, n_rows, factor):
+    # Each rung keeps 1/factor of the candidates and gives them factor times the rows, ending on all rows
+    n_rungs = max(1, min(math.ceil(math.log(n_candidates, factor)) + 1 if n_candidates > 1 else 1,
+                         int(math.log(n_rows / MIN_ROWS, factor)) + 1))
+    return [int(n_rows / factor ** (n_rungs - 1 - i)) for i in range(n_rungs)]
+
+
+def fit_fold(params, random_state, X, y, train, test, deadline, estimate=0.0):
+    # Skipped (None) when the budget is spent or this fit's estimated seconds won't fit in what's left.
+    # A fit can't be stopped once started, so this is what keeps a big rung from running long past it
+    if time.time() + estimate >= deadline:
+        return None
+    warnings.filterwarnings("ignore", category=UserWarning)
+    start = time.perf_counter()
+    model = RandomForestClassifier(random_state=random_state, n_jobs=1, **params).fit(X[train], y[train])
+    score = model.score(X[test], y[test])
+    return score, time.perf_counter() - start
+
+
+def successive_halving(X, y, candidates, budget_s, factor=3, cv=3, n_jobs=-1, random_state=40):
+    """Race candidates on growing row subsets, keeping the best 1/factor after each rung.
+
+    Every (candidate, fold) fit of a rung runs in parallel. A fit doesn't start once
+    budget_s has passed, nor when its estimate (its own fit time on the previous rung,
+    scaled by the growth in rows) would end past it. Fits already running are never
+    cut short, so the search can overrun by one fit, bounded by that estimate's error
+    (or a whole first-rung fit, which has no estimate). The winner is the best candidate
+    of the last rung every surviving candidate finished; rungs cut short by the budget
+    only appear in the trials. Returns a dict with the best params, its CV score and
+    one record per trial.
+    """
+    deadline = time.time() + budget_s
+    start = time.perf_counter()
+    X, y = np.asarray(X), np.asarray(y)
+    order = np.random.default_rng(random_state).permutation(len(X))
+    splitter = StratifiedKFold(cv, shuffle=True, random_state=random_state)
+
+    trials, alive = [], list(range(len(candidates)))
+    best = partial = None
+    # Seconds per fold of each candidate on the previous rung
+    fold_seconds = {}
+    sizes = rung_sizes(len(candidates), len(X), factor)
+    for rung, n_rows in enumerate(sizes):
+        rows = order[:n_rows]
+        folds = list(splitter.split(X[rows], y[rows]))
+        jobs = [(c, f) for c in alive for f in range(cv)]
+        growth = n_rows / sizes[rung - 1] if rung else 0.0
+        results = Parallel(n_jobs=n_jobs)(
+            delayed(fit_fold)(candidates[c], random_state, X[rows], y[rows], *folds[f], deadline,
+                              fold_seconds.get(c, 0.0) * growth)
+            for c, f in jobs
+        )
+
+        per_candidate = {}
+        for (c, f), result in zip(jobs, results):
+            if result is not None:
+                per_candidate.setdefault(c, []).append(result)
+        complete = {c: r for c, r in per_candidate.items() if len(r) == cv}
+        for c, r in per_candidate.items():
+            scores, seconds = zip(*r)
+            trials.append({
+                "rung": rung,
+                "n_rows": n_rows,
+                "params": candidates[c],
+                "folds": len(r),
+                "mean_score": float(np.mean(scores)),
+                "std_score": float(np.std(scores)),
+                "fit_seconds": float(np.sum(seconds)),
+            })
+        if not complete:
+            break
+
+        ranked = sorted(complete, key=lambda c: np.mean([s for s, _ in complete[c]]), reverse=True)
+        leader = (ranked[0], float(np.mean([s for s, _ in complete[ranked[0]]])), n_rows)
+        if len(complete) < len(alive):
+            # Cut short: the candidates that finished aren't a fair race. Only when no rung
+            # finished at all does the best of them stand in
+            partial = partial or leader
+            break
+        best = leader
+        fold_seconds = {c: float(np.mean([t for _, t in r])) for c, r in complete.items()}
+        alive = ranked[:max(1, math.ceil(len(ranked) / factor))]
+
+    best = best or partial
+    if best is None:
+        raise RuntimeError(f"No configuration finished a cross-validation round within {budget_s}s")
+    return {
+        "best_params": candidates[best[0]],
+        "best_score": best[1],
+        "best_n_rows": best[2],
+        "elapsed_s": round(time.perf_counter() - start, 3),
+        "budget_s": budget_s,
+        "budget_exhausted": time.time() >= deadline,
+        "trials": trials,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Tune the forest with successive halving on the cached training split."
+    )
+    parser.add_argument("--data", default="WineQT.csv")
+    parser.add_argument("--budget", type=float, default=300, help="wall-clock budget in seconds")
+    parser.add_argument("--candidates", type=int, default=24)
+    parser.add_argument("--factor", type=int, default=3)
+    parser.add_argument("--cv", type=int, default=3)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--output", default=SEARCH_PATH)
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore", category=UserWarning)
+    runner = train_pipeline.StageRunner()
+    x_train, _, y_train, _, _, _ = train_pipeline.prepare_data(
+        runner, args.data, train_pipeline.DEFAULT_PARAMS
+    )
+    result = successive_halving(x_train, y_train, sample_candidates(args.candidates), args.budget,
+                                args.factor, args.cv, args.n_jobs)
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print(f"{'rung':>4}{'rows':>7}{'cv acc':>9}{'fit s':>8}  params")
+    for t in result["trials"]:
+        print(f"{t['rung']:>4}{t['n_rows']:>7}{t['mean_score']:>9.4f}{t['fit_seconds']:>8.2f}  {t['params']}")
+    note = " (budget reached)" if result["budget_exhausted"] else ""
+    print(f"✅ Best {result['best_params']} with CV accuracy {result['best_score']:.4f} "
+          f"in {result['elapsed_s']:.1f}s{note}; trials written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+import argparse
+import copy
+import datetime
+import os
+import pickle
+import shutil
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.tree._tree import Tree
+
+import batch_score
+import compact_forest
+import fuse_scaler
+import inference
+import train_pipeline
+from model_registry import META_FILE, activate, pin_live, write_version
+
+
+def rebuild_tree(estimator, forest_classes, classes, old_scaler=None, new_scaler=None):
+    """Copy a fitted tree, widening its class columns and optionally moving its thresholds.
+
+    forest_classes are the labels the tree's value columns stand for; classes is the
+    (sorted, superset) label set of the updated forest. With both scalers given, split
+    points are rewritten from old_scaler's space into new_scaler's:
+    (x - m0) / s0 <= t  <=>  (x - m1) / s1 <= (t * s0 + m0 - m1) / s1.
+    """
+    state = estimator.tree_.__getstate__()
+    nodes = state["nodes"].copy()
+    if old_scaler is not None:
+        split = nodes["feature"] >= 0
+        f = nodes["feature"][split]
+        t = nodes["threshold"][split]
+        nodes["threshold"][split] = (t * old_scaler.scale_[f] + old_scaler.mean_[f]
+                                     - new_scaler.mean_[f]) / new_scaler.scale_[f]
+
+    values = np.zeros((state["node_count"], 1, len(classes)))
+    values[:, :, np.searchsorted(classes, forest_classes)] = state["values"]
+
+    tree = Tree(estimator.n_features_in_, np.array([len(classes)], dtype=np.intp), 1)
+    tree.__setstate__({**state, "nodes": nodes, "values": values})
+    rebuilt = copy.copy(estimator)
+    rebuilt.tree_ = tree
+    # Trees inside a forest are fitted on class indices, not the labels themselves
+    rebuilt.classes_ = np.arange(len(classes), dtype=np.float64)
+    rebuilt.n_classes_ = len(classes)
+    return rebuilt
+
+
+def update(model, scaler, x_new, y_new, n_new_trees, max_trees=None, random_state=None):
+    """Grow n_new_trees on a batch of new rows and retire the oldest trees beyond max_trees.
+
+    The scaler takes the batch in through partial_fit (running mean and variance) and the
+    kept trees are moved into its new scaled space, so no earlier data is needed and the
+    cost scales with the batch. Returns a new (model, scaler); the inputs are untouched.
+    """
+    max_trees = max_trees or len(model.estimators_)
+    new_scaler = copy.deepcopy(scaler).partial_fit(x_new)
+    classes = np.union1d(model.classes_, np.unique(y_new))
+
+    # Same hyperparameters as the current forest, fitted only on the new rows
+    grower = clone(model).set_params(n_estimators=n_new_trees, warm_start=False,
+                                     random_state=random_state, n_jobs=-1)
+    grower.fit(new_scaler.transform(x_new), y_new)
+
+    retire = max(0, len(model.estimators_) + n_new_trees - max_trees)
+    kept = [rebuild_tree(e, model.classes_, classes, scaler, new_scaler)
+            for e in model.estimators_[retire:]]
+    grown = [rebuild_tree(e, grower.classes_, classes) for e in grower.estimators_]
+
+    updated = copy.copy(model)
+    updated.estimators_ = (kept + grown)[-max_trees:]
+    updated.n_estimators = len(updated.estimators_)
+    updated.classes_ = classes
+    updated.n_classes_ = len(classes)
+    return updated, new_scaler
+
+
+def publish(version_path, model_path=inference.MODEL_PATH, scaler_path=inference.SCALER_PATH):
+    # Copy beside the target then rename over it; the apps reload when artifact_version() changes
+    # (apps on a model_registry pick the version up through activate() instead)
+    for name, target in ((inference.MODEL_PATH, model_path), (inference.SCALER_PATH, scaler_path)):
+        tmp_path = f"{target}.tmp"
+        shutil.copyfile(os.path.join(version_path, name), tmp_path)
+        os.replace(tmp_path, target)
+
+
+def refresh_derived(model, scaler, X, fused_path=inference.FUSED_MODEL_PATH,
+                    compact_path=inference.COMPACT_MODEL_PATH, data_path="WineQT.csv"):
+    """Rebuild the fused and compact forests that exist, so those engines serve the new model.
+
+    Each rebuild is checked on every row of data_path, read in float64 as
+    fuse_scaler.py and compact_forest.py do, plus the new raw rows X. One that fails
+    is deleted rather than left behind: a missing file is an error the engine
+    reports, a stale one serves the old forest.
+    Returns {path: True if rebuilt, False if deleted}.
+    """
+    reference = pd.read_csv(data_path)[inference.FEATURE_NAMES].to_numpy(dtype=np.float64)
+    X = np.vstack([reference, np.asarray(X, dtype=np.float64)])
+    labels, proba = inference.predict_with_proba(model, scaler, X)
+    results = {}
+    if os.path.exists(fused_path):
+        fused = fuse_scaler.fuse(model, scaler)
+        mismatches, max_diff = fuse_scaler.check_fused(model, scaler, fused, X)
+        results[fused_path] = _replace_derived(fused_path, fused, not mismatches and max_diff <= 1e-9)
+    if os.path.exists(compact_path):
+        compacted = compact_forest.compact(model)
+        _, compact_proba = inference.predict_with_proba(compacted, scaler, X)
+        results[compact_path] = _replace_derived(compact_path, compacted,
+                                                 np.abs(compact_proba - proba).max() <= 1e-6)
+    return results
+
+
+def _replace_derived(path, model, ok):
+    if not ok:
+        os.remove(path)
+        return False
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(model, f)
+    os.replace(tmp_path, path)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Update the forest and scaler with newly labelled wines without refitting."
+    )
+    parser.add_argument("new_data", help="CSV of new rows with the feature columns and quality")
+    parser.add_argument("--model", default=inference.MODEL_PATH)
+    parser.add_argument("--scaler", default=inference.SCALER_PATH)
+    parser.add_argument("--new-trees", type=int, default=10, help="trees grown on the new rows")
+    parser.add_argument("--max-trees", type=int, help="forest size cap (default: current size)")
+    parser.add_argument("--random-state", type=int)
+    parser.add_argument("--versions-dir", default=inference.VERSIONS_PATH)
+    parser.add_argument("--no-publish", action="store_true",
+                        help="only write the version directory, leave the live model alone")
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore", category=UserWarning)
+    try:
+        model, scaler = inference.load_model_and_scaler(args.model, args.scaler)
+    except FileNotFoundError as e:
+        print(f"❌ Model files not found: {e}", file=sys.stderr)
+        return 1
+
+    df = pd.read_csv(args.new_data)
+    try:
+        batch_score.check_columns(df.columns)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    if "quality" not in df.columns:
+        print("❌ New data needs a quality column", file=sys.stderr)
+        return 1
+    x_new, y_new = df[inference.FEATURE_NAMES], df["quality"].to_numpy()
+
+    # Score the batch before learning from it: an honest look at how the current model does on it
+    labels, _ = inference.predict_with_proba(model, scaler, x_new.to_numpy(dtype=np.float64))
+    accuracy_before = float(np.mean(labels == y_new))
+
+    start = time.perf_counter()
+    updated, new_scaler = update(model, scaler, x_new, y_new, args.new_trees, args.max_trees,
+                                 args.random_state)
+    seconds = time.perf_counter() - start
+    retired = len(model.estimators_) + args.new_trees - updated.n_estimators
+
+    if args.no_publish:
+        # Pinned before the version directory appears, so no registry poll sees it as the newest
+        pin_live(args.versions_dir)
+    version, path = write_version(updated, new_scaler, {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "parent_model_sha256": train_pipeline.file_digest(args.model),
+        "new_rows": len(df),
+        "trees_added": args.new_trees,
+        "trees_retired": retired,
+        "n_trees": updated.n_estimators,
+        "rows_seen": int(new_scaler.n_samples_seen_),
+        "batch_accuracy_before": accuracy_before,
+        "update_seconds": round(seconds, 4),
+    }, args.versions_dir)
+
+    print(f"Current model on the {len(df)} new rows: accuracy {accuracy_before:.4f}")
+    print(f"✅ Added {args.new_trees} trees, retired {retired}; {updated.n_estimators} trees "
+          f"in {seconds:.2f}s. Saved {version} to {path}")
+    if not args.no_publish:
+        publish(path, args.model, args.scaler)
+        activate(version, args.versions_dir)
+        print(f"✅ Published {version} to {args.model} and {args.scaler}")
+        if args.model == inference.MODEL_PATH:
+            # The fused and compact engines read their own files, derived from RF_model.pkl
+            for derived, rebuilt in refresh_derived(updated, new_scaler, x_new.to_numpy(dtype=np.float64)).items():
+                if rebuilt:
+                    print(f"✅ Rebuilt {derived}")
+                else:
+                    print(f"⚠️ The rebuilt {derived} failed its check and was removed; rerun its script",
+                          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
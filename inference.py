@@ -0,0 +1,145 @@
+import os
+import pickle
+import time
+import numpy as np
+
+import metrics
+
+# Column order used by the sliders in both apps and by WineQT.csv
+FEATURE_NAMES = [
+    "fixed acidity", "volatile acidity", "citric acid", "residual sugar",
+    "chlorides", "free sulfur dioxide", "total sulfur dioxide",
+    "density", "pH", "sulphates", "alcohol"
+]
+
+# (min, max, default, step) of each slider in the Streamlit apps, in FEATURE_NAMES order
+SLIDER_RANGES = {
+    "fixed acidity": (3.8, 15.9, 7.4, 0.1),
+    "volatile acidity": (0.08, 1.58, 0.52, 0.01),
+    "citric acid": (0.0, 1.0, 0.27, 0.01),
+    "residual sugar": (0.9, 15.5, 2.5, 0.1),
+    "chlorides": (0.01, 0.61, 0.08, 0.001),
+    "free sulfur dioxide": (1.0, 72.0, 15.0, 1.0),
+    "total sulfur dioxide": (6.0, 289.0, 46.0, 1.0),
+    "density": (0.99, 1.004, 0.996, 0.0001),
+    "pH": (2.7, 4.0, 3.3, 0.01),
+    "sulphates": (0.33, 2.0, 0.66, 0.01),
+    "alcohol": (8.4, 14.9, 10.4, 0.1),
+}
+
+MODEL_PATH = "RF_model.pkl"
+SCALER_PATH = "scaler.pkl"
+# Written by fuse_scaler.py: packed forest with the scaler folded into its thresholds
+FUSED_MODEL_PATH = "RF_model_fused.pkl"
+# Written by compact_forest.py: pruned forest with float32 thresholds and shared leaf tables
+COMPACT_MODEL_PATH = "RF_model_compact.pkl"
+# Written by incremental_train.py: one v0001, v0002, ... directory per model/scaler pair
+VERSIONS_PATH = "model_versions"
+# Written by `model_artifacts.py export`: memory-mappable arrays preferred by the native engine
+ARRAYS_PATH = "model_arrays"
+
+# "sklearn" runs the unpickled RandomForestClassifier, "native" the packed arrays in forest_engine,
+# "fused" the packed arrays that take raw (unscaled) inputs, "compact" the pruned packed arrays
+ENGINES = ("sklearn", "native", "fused", "compact")
+DEFAULT_ENGINE = "sklearn"
+
+
+def artifact_version():
+    # Size and mtime of every artifact on disk; changes whenever any of them is replaced
+    stamps = []
+    for path in (MODEL_PATH, SCALER_PATH, FUSED_MODEL_PATH, COMPACT_MODEL_PATH,
+                 os.path.join(ARRAYS_PATH, "meta.json")):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        stamps.append((path, st.st_size, st.st_mtime_ns))
+    return tuple(stamps)
+
+
+def load_model_and_scaler(model_path=MODEL_PATH, scaler_path=SCALER_PATH, engine=DEFAULT_ENGINE):
+    # Raises FileNotFoundError so each caller can report it its own way
+    try:
+        with metrics.timer("load"):
+            return _load_model_and_scaler(model_path, scaler_path, engine)
+    except Exception:
+        metrics.inc("load_errors")
+        raise
+
+
+def _load_model_and_scaler(model_path, scaler_path, engine):
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+
+    if engine == "fused":
+        # The scaler lives inside the thresholds, so there is no scaling stage to return
+        if model_path == MODEL_PATH:
+            model_path = FUSED_MODEL_PATH
+        with open(model_path, 'rb') as model_file:
+            return pickle.load(model_file), None
+
+    if engine == "native":
+        # Memory-mapped arrays load near-instantly and share pages across processes;
+        # the pickles stay the fallback when no up-to-date export exists
+        import model_artifacts
+        if model_artifacts.is_current(ARRAYS_PATH, model_path, scaler_path):
+            return model_artifacts.load_arrays(ARRAYS_PATH)
+
+    if engine == "compact" and model_path == MODEL_PATH:
+        model_path = COMPACT_MODEL_PATH
+
+    with open(model_path, 'rb') as model_file:
+        model = pickle.load(model_file)
+
+    with open(scaler_path, 'rb') as scaler_file:
+        scaler = pickle.load(scaler_file)
+
+    if engine == "native":
+        from forest_engine import PackedForest
+        model = PackedForest.from_sklearn(model)
+
+    return model, scaler
+
+
+def as_feature_matrix(features):
+    # Accept one row (11 values) or a 2-D batch; always hand back a 2-D float array
+    X = np.asarray(features, dtype=np.float64)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    if X.ndim != 2 or X.shape[1] != len(FEATURE_NAMES):
+        raise ValueError(
+            f"Expected {len(FEATURE_NAMES)} features per row, got shape {np.shape(features)}"
+        )
+    return X
+
+
+def predict_with_proba(model, scaler, features):
+    """Scale the input and walk the forest once.
+
+    Pass scaler=None for a fused model whose thresholds already expect raw values.
+    Returns (label, proba) for a single row, or (labels, proba) arrays for a batch.
+    The label is the argmax over model.classes_, exactly what model.predict would give.
+    """
+    single = np.ndim(features) == 1
+    try:
+        X = as_feature_matrix(features)
+
+        start = time.perf_counter()
+        if scaler is None:
+            X_scaled = X
+        else:
+            X_scaled = scaler.transform(X)
+            scaled = time.perf_counter()
+            metrics.observe("scale", scaled - start)
+            start = scaled
+        proba = model.predict_proba(X_scaled)
+        labels = model.classes_.take(np.argmax(proba, axis=1))
+        metrics.observe("forest", time.perf_counter() - start)
+    except Exception:
+        metrics.inc("prediction_errors")
+        raise
+    metrics.inc("rows_scored", len(X))
+
+    if single:
+        return labels[0], proba[0]
+    return labels, proba
@@ -0,0 +1,130 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("wine.metrics")
+
+# Upper bounds in seconds; wide enough for a 0.1 ms fused prediction and a multi-second batch
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Seconds between summary log lines from start_log_reporter(); 0 disables it
+LOG_INTERVAL = float(os.environ.get("WINE_METRICS_LOG_INTERVAL", "60"))
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation; good enough for a log line
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Registry:
+    """Per-stage latency histograms and event counters for the prediction path.
+
+    Each update is a bisect and a few additions under one lock, cheap enough
+    to leave on in the hot path.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            hist = self.histograms.get(stage)
+            if hist is None:
+                hist = self.histograms[stage] = Histogram(self.buckets)
+            hist.observe(seconds)
+
+    def inc(self, event, n=1):
+        with self._lock:
+            self.counters[event] = self.counters.get(event, 0) + n
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def render(self):
+        # Prometheus text exposition format
+        lines = [
+            "# HELP wine_stage_seconds Latency of each prediction stage.",
+            "# TYPE wine_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, hist in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, n in zip(hist.buckets, hist.counts):
+                    cumulative += n
+                    lines.append(f'wine_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'wine_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {hist.count}')
+                lines.append(f'wine_stage_seconds_sum{{stage="{stage}"}} {hist.sum}')
+                lines.append(f'wine_stage_seconds_count{{stage="{stage}"}} {hist.count}')
+            lines.append("# HELP wine_events_total Prediction path events (cache hits, errors, rows).")
+            lines.append("# TYPE wine_events_total counter")
+            for event, n in sorted(self.counters.items()):
+                lines.append(f'wine_events_total{{event="{event}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def summary_line(self):
+        with self._lock:
+            stages = " ".join(
+                f"{stage}=n:{h.count},mean_ms:{h.sum / h.count * 1e3:.3f},p99_ms<={h.quantile(0.99) * 1e3:g}"
+                for stage, h in sorted(self.histograms.items()) if h.count
+            )
+            events = " ".join(f"{event}={n}" for event, n in sorted(self.counters.items()))
+        return f"wine_metrics {stages} {events}".rstrip()
+
+
+REGISTRY = Registry()
+observe = REGISTRY.observe
+inc = REGISTRY.inc
+timer = REGISTRY.timer
+render = REGISTRY.render
+
+
+def start_log_reporter(interval=LOG_INTERVAL, registry=REGISTRY):
+    # Daemon thread that logs a summary line every interval seconds, for log-based monitoring
+    if interval <= 0:
+        return None
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    stop = threading.Event()
+
+    def report():
+        while not stop.wait(interval):
+            logger.info(registry.summary_line())
+
+    threading.Thread(target=report, name="metrics-reporter", daemon=True).start()
+    return stop
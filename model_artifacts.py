@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import warnings
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+import inference
+from forest_engine import PackedForest
+
+ARRAYS_PATH = inference.ARRAYS_PATH
+META_FILE = "meta.json"
+FORMAT_VERSION = 1
+
+FOREST_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots", "classes")
+
+
+def source_stamp(path):
+    # Cheap identity of a pickle an export came from, so a retrained model or refit scaler isn't shadowed
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def save_arrays(packed, scaler, path=ARRAYS_PATH, source_model=inference.MODEL_PATH,
+                source_scaler=inference.SCALER_PATH):
+    """Write the packed forest and scaler as plain .npy files plus a JSON header.
+
+    Every array is stored uncompressed and C-contiguous so load_arrays() can
+    memory-map it; processes loading the same directory share its pages.
+    """
+    os.makedirs(path, exist_ok=True)
+    for name in FOREST_ARRAYS:
+        array = packed.classes_ if name == "classes" else getattr(packed, name)
+        np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(array))
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "max_depth": packed.max_depth,
+        "input_dtype": np.dtype(packed.input_dtype).name,
+        "feature_names": inference.FEATURE_NAMES,
+        "scaler": {
+            "mean": scaler.mean_.tolist(),
+            "scale": scaler.scale_.tolist(),
+            "n_samples_seen": int(scaler.n_samples_seen_),
+        },
+        "source_model": source_stamp(source_model) if os.path.exists(source_model) else None,
+        "source_scaler": source_stamp(source_scaler) if os.path.exists(source_scaler) else None,
+    }
+    # Header last: a directory without meta.json is an unfinished export and is ignored
+    with open(os.path.join(path, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def read_meta(path=ARRAYS_PATH):
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported model array format {meta.get('format_version')!r} in {path}")
+    return meta
+
+
+def scaler_from_meta(meta):
+    sc = StandardScaler()
+    sc.mean_ = np.asarray(meta["scaler"]["mean"])
+    sc.scale_ = np.asarray(meta["scaler"]["scale"])
+    sc.var_ = sc.scale_ ** 2
+    sc.n_samples_seen_ = meta["scaler"]["n_samples_seen"]
+    sc.n_features_in_ = len(meta["feature_names"])
+    sc.feature_names_in_ = np.asarray(meta["feature_names"], dtype=object)
+    return sc
+
+
+def load_arrays(path=ARRAYS_PATH, mmap=True):
+    meta = read_meta(path)
+    mode = "r" if mmap else None
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+              for name in FOREST_ARRAYS}
+    packed = PackedForest(
+        feature=arrays["feature"],
+        threshold=arrays["threshold"],
+        left=arrays["left"],
+        right=arrays["right"],
+        value=arrays["value"],
+        roots=arrays["roots"],
+        # classes are tiny and end up in responses, so keep them as an ordinary array
+        classes=np.array(arrays["classes"]),
+        max_depth=meta["max_depth"],
+        input_dtype=np.dtype(meta["input_dtype"]),
+    )
+    return packed, scaler_from_meta(meta)
+
+
+def is_current(path=ARRAYS_PATH, source_model=inference.MODEL_PATH, source_scaler=inference.SCALER_PATH):
+    # Arrays are usable when exported from exactly the model and scaler pickles on disk. A pickle
+    # that exists but isn't the stamped one (or wasn't stamped at all) makes the export stale;
+    # one that's gone leaves the arrays as the only copy
+    try:
+        meta = read_meta(path)
+    except (FileNotFoundError, ValueError):
+        return False
+    for key, source in (("source_model", source_model), ("source_scaler", source_scaler)):
+        if os.path.exists(source) and meta.get(key) != source_stamp(source):
+            return False
+    return True
+
+
+# Run in a fresh interpreter per format so load time and RSS aren't polluted by the parent
+_BENCH_CHILD = r"""
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+import numpy as np
+
+def memory():
+    fields = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[1].isdigit():
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        import resource
+        return {"rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "anon_kb": None}
+    # Anonymous is heap that can't be shared; mmap'd array pages are file-backed and shareable
+    return {"rss_kb": fields.get("Rss", 0), "anon_kb": fields.get("Anonymous", 0)}
+
+import inference, model_artifacts
+fmt, path = sys.argv[1], sys.argv[2]
+before = memory()
+start = time.perf_counter()
+if fmt == "pickle":
+    model, scaler = inference.load_model_and_scaler(engine="sklearn")
+else:
+    model, scaler = model_artifacts.load_arrays(path)
+load_seconds = time.perf_counter() - start
+row = np.array([[7.4, 0.7, 0.0, 1.9, 0.076, 11.0, 34.0, 0.9978, 3.51, 0.56, 9.4]])
+inference.predict_with_proba(model, scaler, np.repeat(row, 2048, axis=0))
+after = memory()
+print(json.dumps({
+    "format": fmt,
+    "load_ms": load_seconds * 1e3,
+    "rss_delta_kb": after["rss_kb"] - before["rss_kb"],
+    "anon_delta_kb": None if after["anon_kb"] is None else after["anon_kb"] - before["anon_kb"],
+}))
+"""
+
+
+def benchmark(path=ARRAYS_PATH, repeats=3):
+    results = []
+    here = os.path.dirname(os.path.abspath(__file__))
+    for fmt in ("pickle", "mmap"):
+        runs = []
+        for _ in range(repeats):
+            out = subprocess.run([sys.executable, "-c", _BENCH_CHILD, fmt, path], cwd=here,
+                                 check=True, capture_output=True, text=True)
+            runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        # Best-of-n load time; memory is the same on every run
+        best = min(runs, key=lambda r: r["load_ms"])
+        results.append(best)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or benchmark the memory-mappable model format.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="convert RF_model.pkl + scaler.pkl to .npy arrays")
+    export.add_argument("--model", default=inference.MODEL_PATH)
+    export.add_argument("--scaler", default=inference.SCALER_PATH)
+    export.add_argument("--out", default=ARRAYS_PATH)
+    bench = sub.add_parser("bench", help="compare load time and RSS of pickle and mmap formats")
+    bench.add_argument("--path", default=ARRAYS_PATH)
+    bench.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        warnings.filterwarnings("ignore", category=UserWarning)
+        try:
+            model, scaler = inference.load_model_and_scaler(args.model, args.scaler)
+        except FileNotFoundError as e:
+            print(f"❌ Model files not found: {e}", file=sys.stderr)
+            return 1
+        save_arrays(PackedForest.from_sklearn(model), scaler, args.out, args.model, args.scaler)
+        print(f"✅ Exported {len(model.estimators_)} trees to {args.out}/")
+        return 0
+
+    print(f"{'format':<8}{'load ms':>10}{'RSS +KB':>10}{'heap +KB':>10}")
+    for r in benchmark(args.path, args.repeats):
+        anon = "n/a" if r["anon_delta_kb"] is None else r["anon_delta_kb"]
+        print(f"{r['format']:<8}{r['load_ms']:>10.2f}{r['rss_delta_kb']:>10}{anon:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
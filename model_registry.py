@@ -0,0 +1,324 @@
+import argparse
+import datetime
+import json
+import logging
+import os
+import pickle
+import re
+import shutil
+import sys
+import threading
+
+import numpy as np
+
+import inference
+import metrics
+
+logger = logging.getLogger("wine.registry")
+
+VERSION_PATTERN = re.compile(r"v(\d+)")
+META_FILE = "meta.json"
+# Which version is live and which was live before it; absent means "the newest version",
+# a null version means none is, until one is activated
+LIVE_FILE = "live.json"
+# Seconds between checks for a new version or a moved live pointer
+POLL_INTERVAL = 2.0
+# Version directories hold RF_model.pkl and scaler.pkl only, so the derived fused/compact forests aren't there
+REGISTRY_ENGINES = ("sklearn", "native")
+
+
+def list_versions(root=inference.VERSIONS_PATH):
+    # Complete versions, oldest first; write_version's .tmp directories never match
+    names = os.listdir(root) if os.path.isdir(root) else []
+    return sorted((name for name in names if VERSION_PATTERN.fullmatch(name)),
+                  key=lambda name: int(name[1:]))
+
+
+def next_version(root=inference.VERSIONS_PATH):
+    versions = list_versions(root)
+    return f"v{int(versions[-1][1:]) + 1 if versions else 1:04d}"
+
+
+def _write_version(root, meta, write_files):
+    # Fill a temporary directory and rename it into place, so a version is either complete or absent
+    version = next_version(root)
+    path = os.path.join(root, version)
+    tmp_path = f"{path}.tmp"
+    os.makedirs(tmp_path)
+    write_files(tmp_path)
+    with open(os.path.join(tmp_path, META_FILE), "w") as f:
+        json.dump({"version": version, **meta}, f, indent=2)
+    os.rename(tmp_path, path)
+    return version, path
+
+
+def write_version(model, scaler, meta, root=inference.VERSIONS_PATH):
+    def write_files(path):
+        with open(os.path.join(path, inference.MODEL_PATH), "wb") as f:
+            pickle.dump(model, f)
+        with open(os.path.join(path, inference.SCALER_PATH), "wb") as f:
+            pickle.dump(scaler, f)
+    return _write_version(root, meta, write_files)
+
+
+def register_files(model_path=inference.MODEL_PATH, scaler_path=inference.SCALER_PATH, meta=None,
+                   root=inference.VERSIONS_PATH):
+    # Snapshot already-pickled artifacts, byte for byte, as the next version
+    def write_files(path):
+        shutil.copyfile(model_path, os.path.join(path, inference.MODEL_PATH))
+        shutil.copyfile(scaler_path, os.path.join(path, inference.SCALER_PATH))
+    return _write_version(root, meta or {}, write_files)
+
+
+def read_live(root=inference.VERSIONS_PATH):
+    try:
+        with open(os.path.join(root, LIVE_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def live_version(root=inference.VERSIONS_PATH):
+    # The pointer when it names an existing version, otherwise the newest one; None for an empty
+    # registry or one pinned to no version
+    versions = list_versions(root)
+    live = read_live(root)
+    pinned = live.get("version")
+    if pinned in versions:
+        return pinned
+    if "version" in live and pinned is None:
+        return None
+    return versions[-1] if versions else None
+
+
+def _write_live(live, root):
+    os.makedirs(root, exist_ok=True)
+    tmp_path = os.path.join(root, f"{LIVE_FILE}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(live, f)
+    os.replace(tmp_path, os.path.join(root, LIVE_FILE))
+
+
+def activate(version, root=inference.VERSIONS_PATH):
+    # Point the registry at version; every watching process follows within one poll
+    if version not in list_versions(root):
+        raise ValueError(f"No version {version!r} in {root}")
+    current = live_version(root)
+    live = {"version": version, "previous": current if current != version else read_live(root).get("previous")}
+    _write_live(live, root)
+    return live
+
+
+def pin_live(root=inference.VERSIONS_PATH):
+    # Write down what is live now (None for an empty registry) before adding a version that
+    # mustn't go live: without a pointer the newest version is live the moment it appears
+    live = read_live(root)
+    version = live_version(root)
+    if "version" not in live or live["version"] != version:
+        _write_live({"version": version, "previous": live.get("previous")}, root)
+    return version
+
+
+class LoadedVersion:
+    """One version's model and scaler, loaded together and only ever swapped together.
+
+    extra is whatever the registry's prepare hook built from the pair (the app's
+    explainer, say), so it is ready before the version goes live.
+    """
+
+    def __init__(self, version, path, model, scaler, meta, extra=None):
+        self.version = version
+        self.path = path
+        self.model = model
+        self.scaler = scaler
+        self.meta = meta
+        self.extra = extra
+
+
+def load_version(version, root=inference.VERSIONS_PATH, engine=inference.DEFAULT_ENGINE, prepare=None):
+    path = os.path.join(root, version)
+    model, scaler = inference.load_model_and_scaler(
+        os.path.join(path, inference.MODEL_PATH), os.path.join(path, inference.SCALER_PATH), engine
+    )
+    try:
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        meta = {}
+    # One throwaway prediction pays the first-call costs here instead of on a live request
+    default_row = np.array([v[2] for v in inference.SLIDER_RANGES.values()])
+    inference.predict_with_proba(model, scaler, default_row)
+    extra = prepare(model, scaler) if prepare is not None else None
+    return LoadedVersion(version, path, model, scaler, meta, extra)
+
+
+class ModelRegistry:
+    """Serves the live version of a model_versions directory and follows it as it moves.
+
+    A background thread polls the directory; a new live version is loaded and warmed
+    on that thread, then swapped in with one attribute assignment. Callers take
+    current() once per request and use its model and scaler together, so they
+    never see a half-swapped pair. The version it replaced stays loaded as
+    previous(), which makes rollback() instant.
+    """
+
+    def __init__(self, root=inference.VERSIONS_PATH, engine=inference.DEFAULT_ENGINE,
+                 poll_interval=POLL_INTERVAL, prepare=None):
+        if engine not in REGISTRY_ENGINES:
+            raise ValueError(f"The registry serves the {' and '.join(REGISTRY_ENGINES)} engines, not {engine!r}")
+        self.root = root
+        self.engine = engine
+        self.poll_interval = poll_interval
+        self.prepare = prepare
+        self._active = None
+        self._previous = None
+        # Last version that failed to load; not retried until the live pointer moves on
+        self._failed = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current(self):
+        # None until a version exists in root
+        return self._active
+
+    def previous(self):
+        return self._previous
+
+    def _swap(self, loaded):
+        # Readers only ever look at _active, so this single assignment is the switch
+        self._previous, self._active = self._active, loaded
+        metrics.inc("model_swaps")
+        logger.info("Serving model %s (previous: %s)", loaded.version,
+                    self._previous.version if self._previous else None)
+
+    def refresh(self):
+        # One poll: returns True when a different version went live
+        with self._lock:
+            target = live_version(self.root)
+            active = self._active
+            if target is None or (active is not None and target == active.version):
+                return False
+            if self._previous is not None and target == self._previous.version:
+                self._swap(self._previous)
+                return True
+            if target == self._failed:
+                return False
+            try:
+                with metrics.timer("registry_load"):
+                    loaded = load_version(target, self.root, self.engine, self.prepare)
+            except Exception as e:
+                # Keep serving what we have; a broken version must not take the app down
+                self._failed = target
+                metrics.inc("registry_load_errors")
+                logger.warning("Could not load model %s, still serving %s: %s", target,
+                               active.version if active else None, e)
+                return False
+            self._failed = None
+            self._swap(loaded)
+            return True
+
+    def rollback(self):
+        # Back to the previous version right away, and move the pointer so the watchers agree
+        with self._lock:
+            if self._previous is None:
+                raise ValueError("No previous version loaded to roll back to")
+            activate(self._previous.version, self.root)
+            self._swap(self._previous)
+            return self._active.version
+
+    def start(self):
+        # The first load happens on the caller's thread, so current() is ready when start() returns
+        self.refresh()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="model-registry", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Model registry poll failed")
+
+    def status(self):
+        active, previous = self._active, self._previous
+        return {
+            "root": self.root,
+            "engine": self.engine,
+            "active": active.version if active else None,
+            "active_meta": active.meta if active else None,
+            "previous": previous.version if previous else None,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and move the live model version.")
+    parser.add_argument("--root", default=inference.VERSIONS_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="show versions and which one is live")
+    promote = sub.add_parser("promote", help="make a version live")
+    promote.add_argument("version")
+    sub.add_parser("rollback", help="make the previously live version live again")
+    register = sub.add_parser("register", help="snapshot a model and scaler as a new version")
+    register.add_argument("--model", default=inference.MODEL_PATH)
+    register.add_argument("--scaler", default=inference.SCALER_PATH)
+    register.add_argument("--no-activate", action="store_true", help="add the version without making it live")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        live = live_version(args.root)
+        versions = list_versions(args.root)
+        if not versions:
+            print(f"No versions in {args.root}")
+        for version in versions:
+            try:
+                with open(os.path.join(args.root, version, META_FILE)) as f:
+                    meta = json.load(f)
+            except FileNotFoundError:
+                meta = {}
+            marker = "*" if version == live else " "
+            print(f"{marker} {version}  {meta.get('created', '?'):<25}  {meta.get('n_trees', '?')} trees")
+        return 0
+
+    if args.command == "register":
+        try:
+            if args.no_activate:
+                pin_live(args.root)
+            version, path = register_files(args.model, args.scaler, {
+                "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                "source_model": os.path.abspath(args.model),
+            }, args.root)
+        except FileNotFoundError as e:
+            print(f"❌ Model files not found: {e}", file=sys.stderr)
+            return 1
+        if not args.no_activate:
+            activate(version, args.root)
+        print(f"✅ Registered {version} at {path}" + ("" if args.no_activate else " and made it live"))
+        return 0
+
+    try:
+        if args.command == "promote":
+            live = activate(args.version, args.root)
+        else:
+            previous = read_live(args.root).get("previous")
+            if previous is None:
+                raise ValueError("No previous version recorded to roll back to")
+            live = activate(previous, args.root)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    print(f"✅ {live['version']} is live (was {live['previous']}); "
+          f"watching apps switch within {POLL_INTERVAL:.0f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
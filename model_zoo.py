@@ -0,0 +1,125 @@
+import argparse
+import json
+import pickle
+import sys
+import time
+import warnings
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import ExtraTreesClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.metrics import accuracy_score
+
+import benchmark
+import train_pipeline
+
+REPORT_PATH = "model_zoo_report.json"
+
+# Candidate name -> estimator factory; the first entry is what the notebook ships today
+CANDIDATES = {
+    "rf_default": lambda: RandomForestClassifier(random_state=40),
+    "rf_50_trees": lambda: RandomForestClassifier(n_estimators=50, random_state=40),
+    "rf_depth_12": lambda: RandomForestClassifier(max_depth=12, random_state=40),
+    "rf_25_trees_depth_10": lambda: RandomForestClassifier(n_estimators=25, max_depth=10, random_state=40),
+    "extra_trees": lambda: ExtraTreesClassifier(random_state=40),
+    "hist_gradient_boosting": lambda: HistGradientBoostingClassifier(random_state=40),
+}
+
+BATCH_ROWS = 4096
+
+
+def fit_candidate(name, x_train, y_train):
+    warnings.filterwarnings("ignore", category=UserWarning)
+    start = time.perf_counter()
+    model = CANDIDATES[name]().fit(x_train, y_train)
+    return name, model, time.perf_counter() - start
+
+
+def measure(name, model, fit_seconds, x_test, y_test, batch, single_runs):
+    blob = pickle.dumps(model)
+    load = benchmark.time_call(lambda: pickle.loads(blob), 5, warmup=1)
+    single = benchmark.time_call(lambda: model.predict_proba(x_test[:1]), single_runs)
+    batched = benchmark.time_call(lambda: model.predict_proba(batch), 5, warmup=1)
+    return {
+        "name": name,
+        "accuracy": float(accuracy_score(y_test, model.predict(x_test))),
+        "fit_s": fit_seconds,
+        "single_p50_ms": float(np.percentile(single, 50) * 1e3),
+        "single_p99_ms": float(np.percentile(single, 99) * 1e3),
+        "batch_rows_per_s": float(len(batch) / np.median(batched)),
+        "size_kb": len(blob) / 1024,
+        "load_ms": float(np.median(load) * 1e3),
+    }
+
+
+def pareto_front(results):
+    # Keep candidates no other candidate beats on both accuracy and single-row latency
+    front = []
+    for r in results:
+        dominated = any(
+            o["accuracy"] >= r["accuracy"] and o["single_p50_ms"] <= r["single_p50_ms"]
+            and (o["accuracy"] > r["accuracy"] or o["single_p50_ms"] < r["single_p50_ms"])
+            for o in results
+        )
+        if not dominated:
+            front.append(r["name"])
+    return front
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare candidate models on accuracy and inference cost.")
+    parser.add_argument("--data", default="WineQT.csv")
+    parser.add_argument("--candidates", nargs="+", choices=list(CANDIDATES), default=list(CANDIDATES))
+    parser.add_argument("--latency-budget-ms", type=float,
+                        help="single-row p50 budget; picks the most accurate model within it")
+    parser.add_argument("--single-runs", type=int, default=100)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="candidates fitted in parallel")
+    parser.add_argument("--output", default=REPORT_PATH)
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore", category=UserWarning)
+    # Same cached SMOTE + scaled split as the training pipeline, so every candidate sees identical data
+    runner = train_pipeline.StageRunner()
+    x_train, x_test, y_train, y_test, scaler, _ = train_pipeline.prepare_data(
+        runner, args.data, train_pipeline.DEFAULT_PARAMS
+    )
+
+    fitted = Parallel(n_jobs=args.n_jobs)(
+        delayed(fit_candidate)(name, x_train, y_train) for name in args.candidates
+    )
+
+    # Latency is measured one candidate at a time so they don't compete for cores
+    batch = scaler.transform(benchmark.synthetic_rows(BATCH_ROWS, args.data))
+    results = [measure(name, model, fit_s, x_test, y_test, batch, args.single_runs)
+               for name, model, fit_s in fitted]
+    front = pareto_front(results)
+    for r in results:
+        r["pareto"] = r["name"] in front
+
+    choice = None
+    if args.latency_budget_ms is not None:
+        within = [r for r in results if r["single_p50_ms"] <= args.latency_budget_ms]
+        if within:
+            choice = max(within, key=lambda r: r["accuracy"])["name"]
+
+    with open(args.output, "w") as f:
+        json.dump({"environment": benchmark.environment(), "results": results,
+                   "pareto_front": front, "latency_budget_ms": args.latency_budget_ms,
+                   "choice": choice}, f, indent=2)
+
+    print(f"{'model':<24}{'acc':>7}{'1-row p50':>11}{'rows/s':>12}{'size KB':>10}{'load ms':>9}  pareto")
+    for r in sorted(results, key=lambda r: r["single_p50_ms"]):
+        print(f"{r['name']:<24}{r['accuracy']:>7.4f}{r['single_p50_ms']:>9.2f}ms"
+              f"{r['batch_rows_per_s']:>12,.0f}{r['size_kb']:>10,.0f}{r['load_ms']:>9.2f}  "
+              f"{'★' if r['pareto'] else ''}")
+    if args.latency_budget_ms is not None:
+        if choice:
+            print(f"✅ Most accurate within {args.latency_budget_ms} ms: {choice}")
+        else:
+            print(f"❌ No candidate meets a {args.latency_budget_ms} ms single-row budget")
+    print(f"✅ Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
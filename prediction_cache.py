@@ -0,0 +1,98 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import attributions
+import inference
+import metrics
+
+DEFAULT_MAXSIZE = 4096
+
+# Slider step per feature; every value a slider can emit is an integer multiple of it
+STEPS = np.array([inference.SLIDER_RANGES[name][3] for name in inference.FEATURE_NAMES])
+
+
+def quantize(row):
+    # Grid position of each feature, so 7.4 and 7.4000000000000004 share a key
+    return tuple(np.rint(np.asarray(row, dtype=np.float64) / STEPS).astype(np.int64).tolist())
+
+
+class PredictionCache:
+    """Bounded LRU of (label, proba) keyed on the quantized 11-feature vector.
+
+    Entries made by predict_explain() also carry the attributions, so a later
+    predict() for the same wine is a hit too. One instance is meant to be shared
+    by every session in the process. Passing a different version (see
+    inference.artifact_version) clears it, so results from a replaced model are
+    never served.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+    def _get(self, key, version, explained):
+        with self._lock:
+            self._check_version(version)
+            result = self._entries.get(key)
+            if result is not None and (not explained or len(result) == 3):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.inc("cache_hits")
+                return result
+            self.misses += 1
+        metrics.inc("cache_misses")
+        return None
+
+    def _put(self, key, version, result):
+        # Cached arrays are handed to every session, so nobody gets to mutate them
+        for array in result[1:]:
+            array.setflags(write=False)
+        with self._lock:
+            if version == self.version and len(self._entries.get(key, ())) <= len(result):
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+    def predict(self, model, scaler, row, version=None):
+        key = quantize(row)
+        result = self._get(key, version, explained=False)
+        if result is None:
+            result = inference.predict_with_proba(model, scaler, row)
+            self._put(key, version, result)
+        return result[:2]
+
+    def predict_explain(self, explainer, scaler, row, version=None):
+        # (label, proba, contributions) as from attributions.predict_explain
+        key = quantize(row)
+        result = self._get(key, version, explained=True)
+        if result is None:
+            result = attributions.predict_explain(explainer, scaler, row)
+            self._put(key, version, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
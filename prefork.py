@@ -0,0 +1,206 @@
+import argparse
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+from urllib.request import Request, urlopen
+
+import numpy as np
+
+logger = logging.getLogger("wine.prefork")
+
+DEFAULT_WORKER_COUNTS = (1, 2, 4, 8)
+
+
+def freeze():
+    """Call in the parent right before forking, after everything shared is loaded.
+
+    gc.freeze() moves every tracked object to a permanent generation the collector
+    never walks, so collections in the workers don't write to (and so copy) the
+    pages holding the parent's model objects. The forest's node arrays are plain
+    buffers and stay shared either way; it's the object headers around them that
+    a collection would otherwise dirty.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def serve_forever(server, start_worker, workers):
+    """Fork workers that all accept on server's listening socket, and supervise them.
+
+    start_worker runs in each child before it serves: anything holding threads
+    (the micro-batcher, registry watcher) has to be started there, since threads
+    don't survive fork. A worker that dies is replaced; SIGINT/SIGTERM stop them all.
+    """
+    freeze()
+    children = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            # Child: default signals so the parent can stop it, then serve until killed
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            gc.enable()
+            code = 0
+            try:
+                start_worker()
+                server.serve_forever()
+            except BaseException:
+                logger.exception("Worker %d failed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for _ in range(workers):
+        spawn()
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        logger.warning("Worker %d exited with status %d, starting a replacement", pid, status)
+        # Don't spin if workers die as soon as they start
+        if time.monotonic() - started < 1:
+            time.sleep(1)
+        spawn()
+    server.server_close()
+
+
+def process_memory(pid="self"):
+    # KB from smaps_rollup: Rss counts shared pages in full, Pss splits them between sharers,
+    # Private is what only this process holds (its USS)
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss_kb": fields.get("Rss", 0),
+        "pss_kb": fields.get("Pss", 0),
+        "private_kb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def child_pids(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def _client(url, body, seconds, queue):
+    # One load-generating process: sequential requests until the time is up
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        with urlopen(Request(url, data=body, method="POST")) as resp:
+            resp.read()
+        latencies.append(time.perf_counter() - start)
+    queue.put(latencies)
+
+
+def load_test(port, clients, seconds):
+    row = [7.4, 0.52, 0.27, 2.5, 0.08, 15.0, 46.0, 0.996, 3.3, 0.66, 10.4]
+    body = json.dumps({"features": row}).encode()
+    url = f"http://127.0.0.1:{port}/predict"
+    queue = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_client, args=(url, body, seconds, queue))
+             for _ in range(clients)]
+    for p in procs:
+        p.start()
+    latencies = np.concatenate([queue.get() for _ in procs])
+    for p in procs:
+        p.join()
+    return {
+        "requests": len(latencies),
+        "requests_per_s": len(latencies) / seconds,
+        "p50_ms": float(np.percentile(latencies, 50) * 1e3),
+        "p99_ms": float(np.percentile(latencies, 99) * 1e3),
+    }
+
+
+def bench(workers, clients, seconds, port, engine):
+    # Each worker count gets a fresh server process; memory is read after the load, when every
+    # worker has touched the model
+    server = subprocess.Popen(
+        [sys.executable, "app.py", "--workers", str(workers), "--port", str(port), "--engine", engine,
+         "--no-drift", "--no-similar"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                with urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                    break
+            except OSError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError(f"Server with {workers} workers didn't come up")
+                time.sleep(0.2)
+        result = {"workers": workers, "clients": clients, **load_test(port, clients, seconds)}
+        parent = process_memory(server.pid)
+        kids = [process_memory(pid) for pid in child_pids(server.pid)] if workers > 1 else [parent]
+        result.update({
+            "parent_rss_kb": parent["rss_kb"],
+            "worker_rss_kb": int(np.mean([k["rss_kb"] for k in kids])),
+            "worker_private_kb": int(np.mean([k["private_kb"] for k in kids])),
+            "total_pss_kb": sum(k["pss_kb"] for k in kids) + (parent["pss_kb"] if workers > 1 else 0),
+        })
+        return result
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Load-test app.py --workers N: throughput, latency and per-worker memory."
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=list(DEFAULT_WORKER_COUNTS))
+    parser.add_argument("--clients", type=int, default=16, help="concurrent load-generating processes")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--engine", default="sklearn")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print("❌ Needs Linux /proc for the memory figures", file=sys.stderr)
+        return 1
+    print(f"{os.cpu_count()} CPUs, {args.clients} clients, {args.seconds:.0f}s per run")
+    print(f"{'workers':>7}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'worker RSS MB':>15}"
+          f"{'private MB':>12}{'total PSS MB':>14}")
+    for workers in args.workers:
+        r = bench(workers, args.clients, args.seconds, args.port, args.engine)
+        print(f"{workers:>7}{r['requests_per_s']:>9.0f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+              f"{r['worker_rss_kb'] / 1024:>15.1f}{r['worker_private_kb'] / 1024:>12.1f}"
+              f"{r['total_pss_kb'] / 1024:>14.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+import inference
+
+
+def slider_grid(name):
+    # Every value the slider for this feature can take
+    low, high, _, step = inference.SLIDER_RANGES[name]
+    n = int(round((high - low) / step)) + 1
+    return np.round(low + step * np.arange(n), 10)
+
+
+def build_sweeps(base_row):
+    """Stack one sweep per feature into a single matrix.
+
+    Each sweep copies base_row and walks one feature over its slider grid.
+    Returns the matrix plus, for every row, the index of the swept feature.
+    """
+    base_row = inference.as_feature_matrix(base_row)[0]
+    blocks, swept = [], []
+    for i, name in enumerate(inference.FEATURE_NAMES):
+        grid = slider_grid(name)
+        block = np.repeat(base_row[None, :], len(grid), axis=0)
+        block[:, i] = grid
+        blocks.append(block)
+        swept.append(np.full(len(grid), i))
+    return np.vstack(blocks), np.concatenate(swept)
+
+
+def score_sweeps(model, scaler, base_row):
+    # All 11 sweeps go through one scaler + forest call
+    X, swept = build_sweeps(base_row)
+    labels, proba = inference.predict_with_proba(model, scaler, X)
+    out = pd.DataFrame({
+        "feature": np.asarray(inference.FEATURE_NAMES)[swept],
+        "value": X[np.arange(len(X)), swept],
+        "predicted_quality": labels,
+    })
+    for i, cls in enumerate(model.classes_):
+        out[f"Quality {cls}"] = proba[:, i]
+    return out
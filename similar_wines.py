@@ -0,0 +1,247 @@
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import dataset
+import inference
+import metrics
+
+# Sits beside scaler.pkl; rebuilt whenever the scaler or the reference CSV changes
+INDEX_PATH = "similar_wines.pkl"
+DEFAULT_K = 5
+# Points per KD-tree leaf: small enough that a query scans few rows, large enough to keep the tree shallow
+LEAF_SIZE = 40
+# Below this many reference rows one matrix product beats the tree's per-query overhead
+SCAN_ROWS = 10_000
+
+
+def scaler_key(scaler):
+    # Identifies the scaled space the tree was built in
+    return hashlib.sha256(np.concatenate([scaler.mean_, scaler.scale_]).tobytes()).hexdigest()
+
+
+class SimilarWines:
+    """KD-tree over the reference wines in the saved scaler's space.
+
+    query() scales raw rows, finds each one's k nearest reference wines (Euclidean
+    distance on standardized features, so every property weighs the same) and
+    returns their positions and distances. A tree query touches O(log n) nodes plus
+    a few leaves instead of every row; reference sets under SCAN_ROWS, like the
+    1,143 WineQT wines, are scanned with one matrix product instead, which is
+    cheaper than the tree's per-call overhead at that size.
+    """
+
+    def __init__(self, tree, labels, ids, scaler, source):
+        self.tree = tree
+        self.labels = labels
+        self.ids = ids
+        self.scaler = scaler
+        self.scaler_key = scaler_key(scaler)
+        self.source = source
+        # The tree keeps its points in input order, so the scan path reuses them without a copy
+        self.data = np.asarray(tree.get_arrays()[0])
+        self._norms = np.square(self.data).sum(axis=1) if len(self) < SCAN_ROWS else None
+
+    def __len__(self):
+        return len(self.labels)
+
+    def query(self, features, k=DEFAULT_K):
+        """Reference row positions and distances of the k nearest wines, nearest first.
+
+        Both are (k,) for one row or (rows, k) for a batch; index ids and labels
+        with the positions to get the neighbours' Ids and qualities.
+        """
+        single = np.ndim(features) == 1
+        X = inference.as_feature_matrix(features)
+        k = min(k, len(self))
+        with metrics.timer("similar"):
+            if self._norms is None:
+                distances, rows = self.tree.query(self.scale(X), k=k)
+            else:
+                distances, rows = self._scan(self.scale(X), k)
+        if single:
+            return rows[0], distances[0]
+        return rows, distances
+
+    def scale(self, X):
+        # StandardScaler.transform by hand: its input validation costs more than a whole tree query
+        return (X - self.scaler.mean_) / self.scaler.scale_
+
+    def _scan(self, X, k):
+        # |a - b|^2 = |a|^2 - 2ab + |b|^2; |a|^2 is the same for every candidate, so it only enters the distances
+        d = self._norms - 2 * X @ self.data.T
+        rows = np.argpartition(d, k - 1, axis=1)[:, :k]
+        d = np.take_along_axis(d, rows, axis=1)
+        order = np.argsort(d, axis=1)
+        rows = np.take_along_axis(rows, order, axis=1)
+        d = np.take_along_axis(d, order, axis=1) + np.square(X).sum(axis=1)[:, None]
+        return np.sqrt(np.maximum(d, 0)), rows
+
+    def frame(self, rows, distances):
+        # One row's neighbours for display: Id, quality, distance and their raw feature values
+        out = pd.DataFrame(self.scaler.inverse_transform(self.data[rows]), columns=inference.FEATURE_NAMES)
+        out.insert(0, "distance", distances)
+        out.insert(0, "quality", self.labels[rows])
+        out.insert(0, "Id", self.ids[rows])
+        return out
+
+
+def build(scaler, data_path="WineQT.csv", leaf_size=LEAF_SIZE):
+    data = dataset.load(data_path)
+    if data.labels is None:
+        raise ValueError(f"{data_path} has no quality column to show for neighbours")
+    columns = pd.read_csv(data_path, nrows=0).columns
+    if "Id" in columns:
+        ids = pd.read_csv(data_path, usecols=["Id"])["Id"].to_numpy()
+    else:
+        ids = np.arange(len(data))
+    # Imported here: sklearn.neighbors alone costs more to import than loading a saved index
+    from sklearn.neighbors import KDTree
+    # KDTree works in float64; the scaled copy is the only one kept
+    scaled = (np.asarray(data.features, dtype=np.float64) - scaler.mean_) / scaler.scale_
+    tree = KDTree(scaled, leaf_size=leaf_size)
+    return SimilarWines(tree, np.asarray(data.labels), ids, scaler,
+                        {"path": os.path.abspath(data_path), **dataset.source_stamp(data_path)})
+
+
+def save(index, path=INDEX_PATH):
+    # Plain parts rather than the object, so the file loads whichever module name built it
+    state = {"tree": index.tree, "labels": index.labels, "ids": index.ids,
+             "scaler_key": index.scaler_key, "source": index.source}
+    # A uniquely named temp file per writer: processes that build the index at the same time
+    # each replace the file whole instead of interleaving writes into one shared .tmp
+    tmp = tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(path)),
+                                      prefix=os.path.basename(path), suffix=".tmp", delete=False)
+    try:
+        with tmp:
+            pickle.dump(state, tmp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.remove(tmp.name)
+        raise
+
+
+def is_current(state, scaler, data_path):
+    if state["scaler_key"] != scaler_key(scaler):
+        return False
+    try:
+        return state["source"] == {"path": os.path.abspath(data_path), **dataset.source_stamp(data_path)}
+    except FileNotFoundError:
+        # Reference CSV gone: the saved index is all there is
+        return True
+
+
+def load_index(scaler=None, path=INDEX_PATH, data_path="WineQT.csv"):
+    # A saved index wins while it matches the scaler and CSV; otherwise build and save a fresh one.
+    # scaler=None reads scaler.pkl, for fused-engine callers that have no scaler of their own
+    if scaler is None:
+        with open(inference.SCALER_PATH, "rb") as f:
+            scaler = pickle.load(f)
+    with metrics.timer("similar_load"):
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+            if is_current(state, scaler, data_path):
+                return SimilarWines(state["tree"], state["labels"], state["ids"], scaler, state["source"])
+        index = build(scaler, data_path)
+        save(index, path)
+        return index
+
+
+class LazyIndex:
+    # Loads on the first get(), so processes that never ask for neighbours don't pay for the tree
+    def __init__(self, scaler=None, path=INDEX_PATH, data_path="WineQT.csv"):
+        self.scaler = scaler
+        self.path = path
+        self.data_path = data_path
+        self._index = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = load_index(self.scaler, self.path, self.data_path)
+        return self._index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build the similar-wines index and time queries against a brute-force scan."
+    )
+    parser.add_argument("--data", default="WineQT.csv")
+    parser.add_argument("--scaler", default=inference.SCALER_PATH)
+    parser.add_argument("--output", default=INDEX_PATH)
+    parser.add_argument("-k", type=int, default=DEFAULT_K)
+    parser.add_argument("--synthetic-rows", type=int, default=0,
+                        help="also time an index over this many jittered copies of the reference rows")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.scaler, "rb") as f:
+            scaler = pickle.load(f)
+    except FileNotFoundError as e:
+        print(f"❌ Scaler not found: {e}", file=sys.stderr)
+        return 1
+
+    import benchmark
+    warnings.filterwarnings("ignore", category=UserWarning)
+    start = time.perf_counter()
+    index = build(scaler, args.data)
+    save(index, args.output)
+    print(f"✅ Indexed {len(index):,} wines in {(time.perf_counter() - start) * 1e3:.0f} ms "
+          f"-> {args.output} ({os.path.getsize(args.output):,} bytes)")
+    start = time.perf_counter()
+    load_index(scaler, args.output, args.data)
+    print(f"Reloaded in {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    references = [("reference", index)]
+    if args.synthetic_rows:
+        # Reference rows plus small Gaussian noise in scaled space, like a larger cellar of similar wines
+        rng = np.random.default_rng(0)
+        base = index.data
+        picks = rng.integers(len(base), size=args.synthetic_rows)
+        scaled = base[picks] + rng.normal(scale=0.05, size=(args.synthetic_rows, base.shape[1]))
+        from sklearn.neighbors import KDTree
+        start = time.perf_counter()
+        tree = KDTree(scaled, leaf_size=LEAF_SIZE)
+        print(f"Indexed {args.synthetic_rows:,} synthetic wines in {time.perf_counter() - start:.2f}s")
+        references.append(("synthetic", SimilarWines(tree, index.labels[picks], np.arange(len(picks)),
+                                                     scaler, index.source)))
+
+    rows = benchmark.synthetic_rows(4096)
+    print(f"{'reference':>10}{'rows':>11}{'batch':>7}{'tree us/row':>13}{'scan us/row':>13}")
+    for name, ref in references:
+        data = ref.data
+        norms = np.square(data).sum(axis=1)
+        for batch in (1, 64, 4096):
+            X = rows[0] if batch == 1 else rows[:batch]
+            repeats = 200 if batch < 4096 else 3
+            scaled = ref.scale(inference.as_feature_matrix(X))
+            tree_s = np.median(benchmark.time_call(lambda: ref.tree.query(scaled, k=args.k), repeats))
+
+            def scan():
+                # Distances to every reference row, in blocks of 16 queries to bound memory
+                for lo in range(0, len(scaled), 16):
+                    d = norms - 2 * scaled[lo:lo + 16] @ data.T
+                    np.argpartition(d, args.k, axis=1)
+            if len(data) * batch > 1e8:
+                scan_us = "-"
+            else:
+                scan_s = np.median(benchmark.time_call(scan, 3 if len(data) * batch > 1e7 else repeats))
+                scan_us = f"{scan_s / batch * 1e6:.1f}"
+            print(f"{name:>10}{len(ref):>11,}{batch:>7}{tree_s / batch * 1e6:>13.1f}{scan_us:>13}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
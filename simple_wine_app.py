@@ -1,114 +1,47 @@
 import streamlit as st
-import pandas as pd
-import pickle
 import numpy as np
-import streamlit as st
-import base64
-def add_bg_from_local(image_file):
-    with open(image_file, "rb") as image:
-        encoded = base64.b64encode(image.read()).decode()
-    st.markdown(
-         f"""
-         <style>
-         .stApp {{
-             background-image: url("data:image/jpg;base64,{encoded}");
-             background-size: cover;
-             background-position: top right;
-             background-repeat: no-repeat;
-         }}
-         </style>
-         """,
-         unsafe_allow_html=True
-     )
+import time
 
-# Put this near the top of your main()
-add_bg_from_local(r'C:\Users\chaud\OneDrive\Desktop\model1\wine-stains-vintage-linen-watercolour-backgrou-art-background-paint-watercolor-gradient_1020697-705638.avif')
+import assets
+import cold_start
+import inference
+import metrics
+from app_resources import (current_model, get_explainer, get_model_registry, get_prediction_cache,
+                           get_similar_wines, start_metrics_reporter)
 
 
-# Load the trained model and scaler
-@st.cache_resource
-def load_model_and_scaler():
-    try:
-        with open('RF_model.pkl', 'rb') as model_file:
-            model = pickle.load(model_file)
+# Sliders sit in a form so moving one does nothing until submit, and submitting
+# reruns only this fragment rather than the whole page. The explainer is built on the
+# first submit, so the first page doesn't wait for it
+@st.fragment
+def prediction_panel(engine, prediction_cache):
+    # Read on every fragment rerun, so a model the registry swapped in is used from the next submit
+    model, scaler, version = current_model(engine)
+    with st.form("wine_inputs", border=False):
+        # Create input fields
+        col1, col2 = st.columns(2)
         
-        with open('scaler.pkl', 'rb') as scaler_file:
-            scaler = pickle.load(scaler_file)
+        with col1:
+            st.subheader("Wine Properties")
+            fixed_acidity = st.slider("Fixed Acidity", 3.8, 15.9, 7.4, 0.1)
+            volatile_acidity = st.slider("Volatile Acidity", 0.08, 1.58, 0.52, 0.01)
+            citric_acid = st.slider("Citric Acid", 0.0, 1.0, 0.27, 0.01)
+            residual_sugar = st.slider("Residual Sugar", 0.9, 15.5, 2.5, 0.1)
+            chlorides = st.slider("Chlorides", 0.01, 0.61, 0.08, 0.001)
         
-        return model, scaler
-    except FileNotFoundError:
-        st.error("Model files not found. Please ensure RF_model.pkl and scaler.pkl are in the current directory.")
-        return None, None
-
-def main():
-    st.set_page_config(
-        page_title="Wine Quality Predictor",
-        page_icon="🍷",
-        layout="wide"
-    )
-
-    # Simple wine-themed styling
-    st.markdown(
-        """
-        <style>
-        .main-header {
-            background: linear-gradient(90deg, #8b0000, #b22222);
-            padding: 20px;
-            border-radius: 10px;
-            text-align: center;
-            color: white;
-            margin-bottom: 20px;
-        }
-        .prediction-card {
-            background: rgba(255, 255, 255, 0.9);
-            padding: 20px;
-            border-radius: 10px;
-            border: 2px solid #8b0000;
-            margin: 10px 0;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
+        with col2:
+            st.subheader("More Properties")
+            free_sulfur_dioxide = st.slider("Free Sulfur Dioxide", 1.0, 72.0, 15.0, 1.0)
+            total_sulfur_dioxide = st.slider("Total Sulfur Dioxide", 6.0, 289.0, 46.0, 1.0)
+            density = st.slider("Density", 0.99, 1.004, 0.996, 0.0001)
+            ph = st.slider("pH", 2.7, 4.0, 3.3, 0.01)
+            sulphates = st.slider("Sulphates", 0.33, 2.0, 0.66, 0.01)
+            alcohol = st.slider("Alcohol", 8.4, 14.9, 10.4, 0.1)
+        
+        # Prediction button
+        submitted = st.form_submit_button("🔮 Predict Wine Quality", use_container_width=True)
 
-    st.markdown(
-        """
-        <div class="main-header">
-            <h1>🍷 Wine Quality Prediction System</h1>
-            <p>Predict wine quality based on physicochemical properties</p>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-    
-    # Load model and scaler
-    model, scaler = load_model_and_scaler()
-    
-    if model is None or scaler is None:
-        return
-    
-    # Create input fields
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Wine Properties")
-        fixed_acidity = st.slider("Fixed Acidity", 3.8, 15.9, 7.4, 0.1)
-        volatile_acidity = st.slider("Volatile Acidity", 0.08, 1.58, 0.52, 0.01)
-        citric_acid = st.slider("Citric Acid", 0.0, 1.0, 0.27, 0.01)
-        residual_sugar = st.slider("Residual Sugar", 0.9, 15.5, 2.5, 0.1)
-        chlorides = st.slider("Chlorides", 0.01, 0.61, 0.08, 0.001)
-    
-    with col2:
-        st.subheader("More Properties")
-        free_sulfur_dioxide = st.slider("Free Sulfur Dioxide", 1.0, 72.0, 15.0, 1.0)
-        total_sulfur_dioxide = st.slider("Total Sulfur Dioxide", 6.0, 289.0, 46.0, 1.0)
-        density = st.slider("Density", 0.99, 1.004, 0.996, 0.0001)
-        ph = st.slider("pH", 2.7, 4.0, 3.3, 0.01)
-        sulphates = st.slider("Sulphates", 0.33, 2.0, 0.66, 0.01)
-        alcohol = st.slider("Alcohol", 8.4, 14.9, 10.4, 0.1)
-    
-    # Prediction button
-    if st.button("🔮 Predict Wine Quality", use_container_width=True):
+    if submitted:
         # Prepare input data
         input_data = np.array([
             [
@@ -119,11 +52,18 @@ def main():
         ])
         
         try:
-            input_scaled = scaler.transform(input_data)
-            prediction = model.predict(input_scaled)[0]
-            prediction_proba = model.predict_proba(input_scaled)[0]
+            explainer = get_explainer(model, engine, version)
+            contributions = None
+            if explainer is not None:
+                prediction, prediction_proba, contributions = prediction_cache.predict_explain(
+                    explainer, scaler, input_data[0], version)
+            else:
+                prediction, prediction_proba = prediction_cache.predict(model, scaler, input_data[0], version)
+            stats = prediction_cache.stats()
+            st.caption(f"Prediction cache: {stats['hits']} hits, {stats['misses']} misses, {stats['size']} entries")
 
             # Display result
+            render_start = time.perf_counter()
             if prediction >= 7:
                 quality_text = "Excellent 🍾"
                 color = "#228B22"
@@ -153,16 +93,77 @@ def main():
                 unsafe_allow_html=True
             )
 
-            # Show confidence
+            # Show confidence as one chart rather than a write/progress pair per class
             st.subheader("Confidence Distribution")
-            classes = model.classes_
-            for i, (cls, prob) in enumerate(zip(classes, prediction_proba)):
-                st.write(f"Quality {cls}: {prob:.2%}")
-                st.progress(prob)
+            # Not needed until there is a result to chart
+            import pandas as pd
+            prob_df = pd.DataFrame({
+                "Quality": [str(cls) for cls in model.classes_],
+                "Confidence": prediction_proba
+            }).set_index("Quality")
+            st.bar_chart(prob_df, color="#8b0000")
+
+            # Per-feature pushes toward the predicted score, from the trees' decision paths
+            if contributions is not None:
+                st.subheader("🔍 Why this score?")
+                column = int(np.searchsorted(model.classes_, prediction))
+                contrib_df = pd.DataFrame({
+                    "Property": inference.FEATURE_NAMES,
+                    "Contribution": contributions
+                }).set_index("Property")
+                st.bar_chart(contrib_df, color="#8b0000", horizontal=True)
+                st.caption(f"Starting from the {explainer.bias[column]:.1%} average confidence in quality {prediction}, each bar is how far that property moved it.")
+
+            # Closest known wines and what they were actually rated
+            similar = get_similar_wines(scaler, version)
+            if similar is not None:
+                st.subheader("🍇 Most Similar Known Wines")
+                st.dataframe(similar.frame(*similar.query(input_data[0])), hide_index=True)
+            metrics.observe("render", time.perf_counter() - render_start)
 
         except Exception as e:
             st.error(f"Error during prediction: {e}")
 
+def main():
+    st.set_page_config(
+        page_title="Wine Quality Predictor",
+        page_icon="🍷",
+        layout="wide"
+    )
+
+    # Simple wine-themed styling and background (static/simple_wine_app.css, read once per process)
+    st.markdown(assets.style_tag("simple_wine_app.css"), unsafe_allow_html=True)
+
+    st.markdown(
+        """
+        <div class="main-header">
+            <h1>🍷 Wine Quality Prediction System</h1>
+            <p>Predict wine quality based on physicochemical properties</p>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+    
+    # Load model and scaler
+    engine = st.sidebar.selectbox(
+        "Inference engine", inference.ENGINES,
+        help="sklearn runs the pickled forest; native evaluates the same trees from packed NumPy arrays; fused also skips scaling (run fuse_scaler.py first); compact is a pruned, smaller forest (run compact_forest.py first)"
+    )
+    start_metrics_reporter()
+    # A version from model_versions when there is one; the registry swaps in new ones in the
+    # background and each run takes the live model and scaler as one pair
+    registry = get_model_registry(engine)
+    model, scaler, version = current_model(engine)
+    if registry is not None and registry.current() is not None:
+        previous = registry.previous()
+        st.sidebar.caption(f"Model {version}" + (f" (previous {previous.version} kept warm)" if previous else ""))
+    prediction_cache = get_prediction_cache(engine)
+    
+    if model is None:
+        return
+    
+    prediction_panel(engine, prediction_cache)
+
     # Information
     with st.expander("ℹ️ About This Model"):
         st.markdown("""
@@ -177,6 +178,7 @@ def main():
         - 6: Good quality
         - 7-8: Excellent quality
         """)
+    cold_start.rendered()
 
 if __name__ == "__main__":
     main()
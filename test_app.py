@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import numpy as np
+import pytest
+
+import app
+import attributions
+import drift_monitor
+import inference
+import similar_wines
+
+
+def test_batcher_matches_direct_prediction(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    batcher = app.MicroBatcher(model, scaler, max_batch_size=16, max_wait_ms=5)
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()[:50]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(batcher.predict, X))
+    labels, proba = inference.predict_with_proba(model, scaler, X)
+    assert [label for label, _ in results] == list(labels)
+    assert np.allclose(np.stack([p for _, p in results]), proba)
+
+
+def test_batcher_feeds_drift_monitor(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    monitor = drift_monitor.DriftMonitor(drift_monitor.load_snapshot())
+    batcher = app.MicroBatcher(model, scaler, monitor=monitor)
+    for row in wine_df[inference.FEATURE_NAMES].to_numpy()[:5]:
+        batcher.predict(row)
+    deadline = time.monotonic() + 5
+    while monitor.count < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert monitor.count == 5
+
+
+def test_batcher_explains_only_on_request(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    batcher = app.MicroBatcher(model, scaler, explainer=attributions.PathExplainer(model))
+    row = wine_df[inference.FEATURE_NAMES].to_numpy()[0]
+    label, proba = batcher.predict(row)
+    explained_label, explained_proba, contributions = batcher.predict(row, explain=True)
+    assert explained_label == label and np.allclose(explained_proba, proba)
+    body = app.format_prediction(model.classes_, label, proba, contributions, batcher.explainer.bias)
+    assert body["baseline"] + sum(body["contributions"].values()) == pytest.approx(
+        body["probabilities"][str(label)], abs=1e-5)
+
+    with pytest.raises(ValueError):
+        app.MicroBatcher(model, scaler).submit(row, explain=True)
+
+
+def test_batcher_rejects_bad_row(model_and_scaler):
+    model, scaler = model_and_scaler
+    batcher = app.MicroBatcher(model, scaler)
+    with pytest.raises(ValueError):
+        batcher.submit([1.0, 2.0])
+
+
+def test_batcher_survives_a_failing_batch(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    batcher = app.MicroBatcher(model, scaler)
+    row = wine_df[inference.FEATURE_NAMES].to_numpy()[0]
+    for bad in (np.inf, np.nan):
+        with pytest.raises(ValueError):
+            batcher.submit(np.where(np.arange(len(row)) == 0, bad, row))
+    batcher.model = None
+    with pytest.raises(Exception):
+        batcher.predict(row, timeout=5)
+    batcher.model = model
+    assert batcher.predict(row, timeout=5)[0] == inference.predict_with_proba(model, scaler, row)[0]
+
+
+def test_predict_endpoint(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    server = app.make_server(app.MicroBatcher(model, scaler), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        row = wine_df[inference.FEATURE_NAMES].iloc[0]
+        body = json.dumps({"features": row.tolist()}).encode()
+        url = f"http://127.0.0.1:{server.server_address[1]}/predict"
+        with urlopen(Request(url, data=body, method="POST")) as resp:
+            result = json.load(resp)
+        label, proba = inference.predict_with_proba(model, scaler, row.to_numpy())
+        assert result["quality"] == label
+        assert result["probabilities"] == pytest.approx(
+            {str(c): p for c, p in zip(model.classes_, proba)}
+        )
+
+        # json.dumps writes Infinity, which json.loads reads back
+        bad = json.dumps({"features": [float("inf")] + row.tolist()[1:]}).encode()
+        with pytest.raises(HTTPError) as err:
+            urlopen(Request(url, data=bad, method="POST"))
+        assert err.value.code == 400
+
+        with urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as resp:
+            assert 'wine_stage_seconds_count{stage="forest"}' in resp.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_similar_endpoint(model_and_scaler, wine_df, tmp_path):
+    model, scaler = model_and_scaler
+    lazy = similar_wines.LazyIndex(scaler, tmp_path / "index.pkl")
+    server = app.make_server(app.MicroBatcher(model, scaler), port=0, similar=lazy)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        row = wine_df[inference.FEATURE_NAMES].iloc[3]
+        body = json.dumps({"features": row.tolist(), "k": 2}).encode()
+        url = f"http://127.0.0.1:{server.server_address[1]}/similar"
+        with urlopen(Request(url, data=body, method="POST")) as resp:
+            result = json.load(resp)["similar"]
+        assert len(result) == 2
+        assert result[0]["id"] == wine_df["Id"].iloc[3]
+        assert result[0]["quality"] == wine_df["quality"].iloc[3]
+    finally:
+        server.shutdown()
+        server.server_close()
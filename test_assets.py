@@ -0,0 +1,19 @@
+import assets
+
+
+def test_minify_css_keeps_rules():
+    css = """
+    /* comment */
+    .stApp {
+        background-image: url("app/static/wine_background.webp");
+        color: #fff;
+    }
+    """
+    assert assets.minify_css(css) == '.stApp{background-image:url("app/static/wine_background.webp");color:#fff;}'
+
+
+def test_style_tags_reference_static_background():
+    for name in ("simple_wine_app.css", "wine_quality_ui.css"):
+        tag = assets.style_tag(name)
+        assert tag.startswith("<style>") and "base64" not in tag
+        assert "app/static/wine_background.webp" in tag
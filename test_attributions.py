@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+import attributions
+import compact_forest
+import inference
+from forest_engine import PackedForest
+
+
+@pytest.fixture(scope="module")
+def explainer(model_and_scaler):
+    return attributions.PathExplainer(model_and_scaler[0])
+
+
+def test_contributions_add_up_to_proba(model_and_scaler, explainer, wine_df):
+    model, scaler = model_and_scaler
+    X = scaler.transform(wine_df[inference.FEATURE_NAMES].to_numpy()[:300])
+    total = explainer.bias + explainer.contributions(X).sum(axis=1)
+    assert np.allclose(total, model.predict_proba(X), atol=1e-5)
+
+
+def test_predict_explain_matches_prediction(model_and_scaler, explainer, wine_df):
+    model, scaler = model_and_scaler
+    # Both sides of SKLEARN_APPLY_ROWS: the packed walk and sklearn's apply()
+    for n in (1, 5, 300):
+        X = wine_df[inference.FEATURE_NAMES].to_numpy()[:n]
+        labels, proba, contributions = attributions.predict_explain(explainer, scaler, X)
+        expected_labels, expected_proba = inference.predict_with_proba(model, scaler, X)
+        assert np.array_equal(labels, expected_labels)
+        assert np.allclose(proba, expected_proba)
+        picked = proba[np.arange(n), np.searchsorted(model.classes_, labels)]
+        base = explainer.bias[np.searchsorted(model.classes_, labels)]
+        assert np.allclose(base + contributions.sum(axis=1), picked, atol=1e-5)
+
+
+def test_packed_forest_explains_like_sklearn(model_and_scaler, explainer, wine_df):
+    model, scaler = model_and_scaler
+    X = scaler.transform(wine_df[inference.FEATURE_NAMES].to_numpy()[:20])
+    packed = attributions.PathExplainer(PackedForest.from_sklearn(model))
+    assert np.allclose(packed.contributions(X), explainer.contributions(X))
+
+
+def test_compact_forest_rejected(model_and_scaler):
+    compact = compact_forest.compact(model_and_scaler[0])
+    with pytest.raises(ValueError):
+        attributions.PathExplainer(compact)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import attributions
+import batch_score
+import inference
+import similar_wines
+
+
+def test_chunked_output_matches_single_pass(model_and_scaler, wine_df, tmp_path):
+    model, scaler = model_and_scaler
+    out = tmp_path / "scored.csv"
+    rows = batch_score.score_csv(model, scaler, "WineQT.csv", out, chunksize=100)
+    assert rows == len(wine_df)
+
+    scored = pd.read_csv(out)
+    labels, proba = inference.predict_with_proba(model, scaler, wine_df[inference.FEATURE_NAMES])
+    assert np.array_equal(scored["Id"], wine_df["Id"])
+    assert np.array_equal(scored["predicted_quality"], labels)
+    assert np.allclose(scored[[f"proba_{c}" for c in model.classes_]], proba)
+
+
+def test_missing_columns_rejected(model_and_scaler, wine_df, tmp_path):
+    model, scaler = model_and_scaler
+    src = tmp_path / "bad.csv"
+    wine_df.drop(columns=["alcohol"]).to_csv(src, index=False)
+    with pytest.raises(ValueError):
+        batch_score.score_csv(model, scaler, src, tmp_path / "out.csv")
+
+
+def test_explained_output_has_contribution_columns(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    explainer = attributions.PathExplainer(model)
+    frame = wine_df.head(50)
+    scored = batch_score.score_frame(model, scaler, frame, explainer=explainer)
+    plain = batch_score.score_frame(model, scaler, frame)
+    assert np.array_equal(scored["predicted_quality"], plain["predicted_quality"])
+    assert list(scored.columns[-len(batch_score.CONTRIBUTION_COLUMNS):]) == batch_score.CONTRIBUTION_COLUMNS
+
+
+def test_similar_columns(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    index = similar_wines.build(scaler)
+    scored = batch_score.score_frame(model, scaler, wine_df.head(20), similar=index, similar_k=2)
+    assert np.array_equal(scored["similar_1_quality"], wine_df["quality"].head(20))
+    assert {"similar_2_id", "similar_2_distance"} <= set(scored.columns)
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+import benchmark
+import inference
+
+
+def test_synthetic_rows_stay_in_observed_range():
+    x = pd.read_csv("WineQT.csv")[inference.FEATURE_NAMES].to_numpy()
+    rows = benchmark.synthetic_rows(5000)
+    assert rows.shape == (5000, len(inference.FEATURE_NAMES))
+    assert (rows >= x.min(axis=0)).all() and (rows <= x.max(axis=0)).all()
+    assert np.array_equal(rows, benchmark.synthetic_rows(5000))
+
+
+def test_compare_flags_p50_regressions():
+    timings = np.array([0.001, 0.001, 0.002])
+    fast = benchmark.summarize("predict_proba", "sklearn", 64, timings)
+    slow = benchmark.summarize("predict_proba", "sklearn", 64, timings * 2)
+    baseline = {"results": [fast]}
+    assert benchmark.compare(baseline, {"results": [slow]}, 0.2) == [(slow, fast)]
+    assert benchmark.compare(baseline, {"results": [fast]}, 0.2) == []
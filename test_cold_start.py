@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+import pytest
+
+import cold_start
+
+
+def test_parse_importtime_charges_imports_to_phase_and_step():
+    lines = [
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 | early",
+        "cold_start: page",
+        "import time:       200 |        300 |   nested",
+        "import time:       100 |        400 | numpy",
+        "cold_start: step model",
+        "import time:       100 |       2000 | sklearn.ensemble._forest",
+        "cold_start: end",
+        "cold_start: predict",
+        "import time:       100 |        500 | altair",
+    ]
+    out = cold_start.parse_importtime(lines)
+    assert out["page_imports"] == {"numpy": 0.0004}
+    assert out["step_imports"] == {"model": 0.002}
+    assert out["predict_imports"] == {"altair": 0.0005}
+
+
+def test_step_keeps_first_duration_only():
+    with cold_start.step("test step"):
+        pass
+    first = cold_start.steps()["test step"]
+    with cold_start.step("test step"):
+        pass
+    assert cold_start.steps()["test step"] == first
+
+
+@pytest.mark.parametrize("app", cold_start.APPS)
+def test_apps_defer_heavy_imports(app):
+    # sklearn, pandas and the similar-wines index load with the first model or result, not on import
+    heavy = ("sklearn", "pandas", "altair", "similar_wines", "batch_score")
+    code = f"import sys, {app[:-3]}; print([n for n in {heavy!r} if n in sys.modules])"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "[]"
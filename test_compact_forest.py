@@ -0,0 +1,33 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+import compact_forest
+import inference
+
+
+def test_compact_forest_matches_sklearn(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    compacted = compact_forest.compact(model)
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()
+    labels, proba = inference.predict_with_proba(compacted, scaler, X)
+    expected_labels, expected_proba = inference.predict_with_proba(model, scaler, X)
+    assert np.array_equal(labels, expected_labels)
+    assert np.abs(proba - expected_proba).max() < 1e-6
+    assert compacted.threshold.dtype == np.float32
+
+
+def test_prune_drops_splits_with_identical_sides(model_and_scaler, wine_df):
+    _, scaler = model_and_scaler
+    X = scaler.transform(wine_df[inference.FEATURE_NAMES].to_numpy())
+    model = RandomForestClassifier(n_estimators=10, min_samples_leaf=5, random_state=0)
+    model.fit(X, wine_df["quality"])
+    compacted = compact_forest.compact(model)
+    assert compacted.n_nodes < sum(e.tree_.node_count for e in model.estimators_)
+    assert np.abs(compacted.predict_proba(X) - model.predict_proba(X)).max() < 1e-6
+
+
+def test_round_down_float32_keeps_branch_decisions():
+    t = np.array([0.1, -0.3, 1 / 3])
+    t32 = compact_forest.round_down_float32(t)
+    assert (t32 <= t).all()
+    assert (np.nextafter(t32, np.float32(np.inf)) > t).all()
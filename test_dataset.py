@@ -0,0 +1,37 @@
+import os
+
+import numpy as np
+import pytest
+
+import dataset
+import inference
+
+
+def test_load_matches_csv_and_maps_columns(wine_df, tmp_path):
+    data = dataset.load("WineQT.csv", cache_dir=tmp_path, verify=True)
+    assert data.features.dtype == np.float32 and data.labels.dtype == np.int8
+    assert isinstance(data.features.base, np.memmap)
+    assert data.features.flags["F_CONTIGUOUS"]
+    assert np.allclose(data.features, wine_df[inference.FEATURE_NAMES].to_numpy())
+    assert np.array_equal(data.labels, wine_df["quality"].to_numpy())
+    assert list(data.frame().columns) == inference.FEATURE_NAMES
+
+
+def test_load_rebuilds_when_csv_changes(wine_df, tmp_path):
+    csv_path = tmp_path / "wine.csv"
+    wine_df.head(10).to_csv(csv_path, index=False)
+    assert len(dataset.load(csv_path, cache_dir=tmp_path)) == 10
+    wine_df.drop(columns="quality").head(20).to_csv(csv_path, index=False)
+    os.utime(csv_path, ns=(0, 0))
+    data = dataset.load(csv_path, cache_dir=tmp_path)
+    assert len(data) == 20 and data.labels is None
+
+
+def test_checksum_catches_corruption(tmp_path):
+    data = dataset.load("WineQT.csv", cache_dir=tmp_path)
+    header = dataset.read_header(data.path)
+    with open(data.path, "r+b") as f:
+        f.seek(header["features_offset"])
+        f.write(b"\xff\xff\xff\xff")
+    with pytest.raises(ValueError, match="Checksum"):
+        dataset.open_file(data.path, verify=True)
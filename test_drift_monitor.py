@@ -0,0 +1,59 @@
+import numpy as np
+
+import dataset
+import drift_monitor
+import inference
+
+
+def training_monitor(**kwargs):
+    return drift_monitor.DriftMonitor(drift_monitor.build_snapshot(dataset.load().features), **kwargs)
+
+
+def test_training_data_does_not_drift(wine_df):
+    monitor = training_monitor()
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()
+    assert not monitor.update(X).any()
+    report = monitor.report()
+    assert report["count"] == len(X)
+    assert max(f["psi"] for f in report["features"].values()) < 0.01
+    # float64 originals of the float32 snapshot land in regular bins, not the overflow ones
+    assert monitor.counts[:, [0, -1]].sum() == 0
+
+
+def test_shifted_feature_alerts_once(wine_df):
+    monitor = training_monitor(check_every=10)
+    X = wine_df[inference.FEATURE_NAMES].to_numpy().copy()
+    X[:, inference.FEATURE_NAMES.index("alcohol")] += 2.0
+    # Shuffled: the CSV's own row order isn't a random sample of it
+    X = X[np.random.default_rng(0).permutation(len(X))]
+    alerts = np.array([monitor.update(row) for row in X[:400]])
+    assert alerts.sum() == alerts[:, inference.FEATURE_NAMES.index("alcohol")].sum() == 1
+    assert monitor.report()["features"]["alcohol"]["drifted"]
+
+
+def test_batch_and_row_updates_agree(wine_df):
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()[:300]
+    by_row, by_batch = training_monitor(), training_monitor()
+    for row in X:
+        by_row.update(row)
+    by_batch.update(X[:100])
+    by_batch.update(X[100:])
+    assert np.array_equal(by_row.counts, by_batch.counts)
+    assert np.allclose(by_row.mean, X.mean(axis=0))
+    assert np.allclose(by_batch.m2 / len(X), X.var(axis=0))
+
+
+def test_non_finite_rows_are_skipped(wine_df):
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()[:100]
+    clean, dirty = training_monitor(), training_monitor()
+    clean.update(X)
+    bad = X[:3].copy()
+    bad[0, 0], bad[1, 4], bad[2, 10] = np.nan, np.inf, -np.inf
+    assert not dirty.update(bad[0]).any()
+    dirty.update(np.vstack([X[:50], bad]))
+    dirty.update(bad)
+    dirty.update(X[50:])
+    assert dirty.count == clean.count == len(X)
+    assert np.isfinite(dirty.mean).all() and np.isfinite(dirty.m2).all()
+    assert np.array_equal(dirty.counts, clean.counts)
+    assert np.allclose(dirty.m2, clean.m2)
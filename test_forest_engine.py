@@ -0,0 +1,43 @@
+import copy
+
+import numpy as np
+import pytest
+
+import inference
+from forest_engine import PackedForest
+
+
+def test_packed_forest_matches_sklearn(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    packed = PackedForest.from_sklearn(model)
+    X = scaler.transform(wine_df[inference.FEATURE_NAMES].to_numpy())
+    assert np.allclose(packed.predict_proba(X), model.predict_proba(X))
+    assert np.array_equal(packed.predict(X), model.predict(X))
+
+
+def test_packed_forest_through_predict_with_proba(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    packed = PackedForest.from_sklearn(model)
+    row = wine_df[inference.FEATURE_NAMES].to_numpy()[3]
+    label, proba = inference.predict_with_proba(packed, scaler, row)
+    expected_label, expected_proba = inference.predict_with_proba(model, scaler, row)
+    assert label == expected_label
+    assert np.allclose(proba, expected_proba)
+
+
+def test_folded_scaler_takes_raw_inputs(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    fused = PackedForest.from_sklearn(model).fold_scaler(scaler)
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()
+    labels, proba = inference.predict_with_proba(fused, None, X)
+    expected_labels, expected_proba = inference.predict_with_proba(model, scaler, X)
+    assert np.array_equal(labels, expected_labels)
+    assert np.allclose(proba, expected_proba)
+
+
+def test_fold_scaler_rejects_unbracketed_thresholds(model_and_scaler):
+    model, scaler = model_and_scaler
+    broken = copy.deepcopy(scaler)
+    broken.mean_ = np.full_like(scaler.mean_, np.nan)
+    with pytest.raises(ValueError, match="tree 0, node 0"):
+        PackedForest.from_sklearn(model).fold_scaler(broken)
@@ -0,0 +1,56 @@
+import pytest
+
+import hyperparameter_search
+import inference
+
+SMALL_SPACE = {
+    "n_estimators": [5, 10],
+    "max_depth": [4, None],
+    "min_samples_leaf": [1, 4],
+    "max_features": ["sqrt"],
+}
+
+
+def test_rung_sizes_end_on_all_rows():
+    assert hyperparameter_search.rung_sizes(9, 900, 3) == [300, 900]
+    assert hyperparameter_search.rung_sizes(24, 2318, 3) == [257, 772, 2318]
+    assert hyperparameter_search.rung_sizes(1, 2318, 3) == [2318]
+
+
+def test_successive_halving_records_trials(wine_df):
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()
+    y = wine_df["quality"].to_numpy()
+    candidates = hyperparameter_search.sample_candidates(6, SMALL_SPACE)
+    result = hyperparameter_search.successive_halving(X, y, candidates, budget_s=60, n_jobs=1)
+    assert result["best_params"] in candidates
+    assert result["best_n_rows"] == len(X)
+    rungs = [t["rung"] for t in result["trials"]]
+    assert rungs.count(0) == 6 and rungs.count(max(rungs)) < 6
+    assert all(t["fit_seconds"] > 0 for t in result["trials"])
+
+
+def test_successive_halving_respects_budget(wine_df):
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()
+    candidates = hyperparameter_search.sample_candidates(2, SMALL_SPACE)
+    with pytest.raises(RuntimeError):
+        hyperparameter_search.successive_halving(X, wine_df["quality"].to_numpy(), candidates,
+                                                 budget_s=0, n_jobs=1)
+
+
+def test_budget_cut_rung_does_not_pick_winner(wine_df, monkeypatch):
+    # Rung 1 is cut short after candidate 1 finished but before candidate 0 did; the
+    # winner must still come from rung 0, the last one every candidate completed
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()
+    sizes = hyperparameter_search.rung_sizes(4, len(X), 2)
+
+    def fake_fit(params, random_state, X, y, train, test, deadline, estimate=0.0):
+        if len(X) == sizes[0]:
+            return {0: 0.9, 1: 0.8}.get(params["id"], 0.5), 0.01
+        return None if params["id"] == 0 else (1.0, 0.01)
+
+    monkeypatch.setattr(hyperparameter_search, "fit_fold", fake_fit)
+    candidates = [{"id": i} for i in range(4)]
+    result = hyperparameter_search.successive_halving(X, wine_df["quality"].to_numpy(), candidates,
+                                                      budget_s=60, factor=2, n_jobs=1)
+    assert result["best_params"] == {"id": 0}
+    assert result["best_n_rows"] == sizes[0]
@@ -0,0 +1,86 @@
+import copy
+import json
+import os
+
+import numpy as np
+
+import fuse_scaler
+import incremental_train
+import inference
+
+
+def test_update_appends_trees_and_retires_oldest(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    batch = wine_df[wine_df["quality"].isin([5, 6])].head(150)
+    x_new = batch[inference.FEATURE_NAMES]
+    updated, new_scaler = incremental_train.update(model, scaler, x_new, batch["quality"], 5,
+                                                   random_state=0)
+    assert updated.n_estimators == len(model.estimators_)
+    assert updated.estimators_[0].tree_.node_count == model.estimators_[5].tree_.node_count
+    assert np.array_equal(updated.classes_, model.classes_)
+
+    n0 = scaler.n_samples_seen_
+    expected_mean = (n0 * scaler.mean_ + x_new.to_numpy().sum(axis=0)) / (n0 + len(x_new))
+    assert np.allclose(new_scaler.mean_, expected_mean)
+
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()
+    labels, proba = inference.predict_with_proba(updated, new_scaler, X)
+    assert proba.shape == (len(X), len(model.classes_))
+    assert np.allclose(proba.sum(axis=1), 1)
+
+
+def test_update_widens_forest_for_unseen_class(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    batch = wine_df.head(50).copy()
+    batch.loc[batch.index[0], "quality"] = 9
+    updated, new_scaler = incremental_train.update(model, scaler, batch[inference.FEATURE_NAMES],
+                                                   batch["quality"], 3, max_trees=10, random_state=0)
+    assert list(updated.classes_) == sorted(set(model.classes_) | {9})
+    assert updated.n_estimators == 10
+    proba = updated.predict_proba(new_scaler.transform(batch[inference.FEATURE_NAMES]))
+    assert proba.shape == (50, len(updated.classes_))
+
+
+def test_write_version_numbers_directories(model_and_scaler, tmp_path):
+    model, scaler = model_and_scaler
+    first, _ = incremental_train.write_version(model, scaler, {}, tmp_path)
+    second, path = incremental_train.write_version(model, scaler, {"new_rows": 3}, tmp_path)
+    assert (first, second) == ("v0001", "v0002")
+    assert sorted(os.listdir(path)) == sorted([inference.MODEL_PATH, inference.SCALER_PATH,
+                                               incremental_train.META_FILE])
+    with open(os.path.join(path, incremental_train.META_FILE)) as f:
+        assert json.load(f) == {"version": "v0002", "new_rows": 3}
+
+
+def test_refresh_derived_rebuilds_existing_artifacts_only(model_and_scaler, wine_df, tmp_path):
+    model, scaler = model_and_scaler
+    fused_path, compact_path = tmp_path / "fused.pkl", tmp_path / "compact.pkl"
+    fused_path.write_bytes(b"stale")
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()
+    results = incremental_train.refresh_derived(model, scaler, X, fused_path, compact_path)
+    assert results == {fused_path: True}
+    assert not compact_path.exists()
+    fused, _ = inference.load_model_and_scaler(fused_path, engine="fused")
+    assert np.array_equal(inference.predict_with_proba(fused, None, X)[0],
+                          inference.predict_with_proba(model, scaler, X)[0])
+
+
+def test_refresh_derived_checks_on_the_reference_data(model_and_scaler, wine_df, tmp_path, monkeypatch):
+    model, scaler = model_and_scaler
+    # A fused forest folded with a slightly wrong alcohol mean: right on some rows, wrong on others
+    off = copy.deepcopy(scaler)
+    off.mean_ = off.mean_.copy()
+    alcohol = inference.FEATURE_NAMES.index("alcohol")
+    off.mean_[alcohol] += 0.05 * off.scale_[alcohol]
+    bad = fuse_scaler.fuse(model, off)
+    monkeypatch.setattr(fuse_scaler, "fuse", lambda model, scaler: bad)
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()
+    agree = [i for i in range(len(X)) if fuse_scaler.check_fused(model, scaler, bad, X[i:i + 1]) == (0, 0.0)]
+    assert 2 <= len(agree) < len(X)
+
+    # A two-row batch the bad forest gets right must not let it replace the fused file
+    fused_path = tmp_path / "fused.pkl"
+    fused_path.write_bytes(b"stale")
+    results = incremental_train.refresh_derived(model, scaler, X[agree[:2]], fused_path, tmp_path / "compact.pkl")
+    assert results == {fused_path: False}
+    assert not fused_path.exists()
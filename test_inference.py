@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+import inference
+
+
+def test_single_row_matches_sklearn(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    row = wine_df[inference.FEATURE_NAMES].to_numpy()[0]
+    label, proba = inference.predict_with_proba(model, scaler, row)
+    scaled = scaler.transform(row.reshape(1, -1))
+    assert label == model.predict(scaled)[0]
+    assert np.allclose(proba, model.predict_proba(scaled)[0])
+
+
+def test_batch_matches_sklearn(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()
+    labels, proba = inference.predict_with_proba(model, scaler, X)
+    assert proba.shape == (len(X), len(model.classes_))
+    assert np.array_equal(labels, model.predict(scaler.transform(X)))
+
+
+def test_rejects_wrong_width(model_and_scaler):
+    model, scaler = model_and_scaler
+    with pytest.raises(ValueError):
+        inference.predict_with_proba(model, scaler, [1.0, 2.0, 3.0])
@@ -0,0 +1,22 @@
+import metrics
+
+
+def test_histogram_buckets_and_render():
+    registry = metrics.Registry(buckets=(0.001, 0.01))
+    registry.observe("forest", 0.0005)
+    registry.observe("forest", 0.005)
+    registry.observe("forest", 1.0)
+    registry.inc("cache_hits", 2)
+    text = registry.render()
+    assert 'wine_stage_seconds_bucket{stage="forest",le="0.001"} 1' in text
+    assert 'wine_stage_seconds_bucket{stage="forest",le="0.01"} 2' in text
+    assert 'wine_stage_seconds_bucket{stage="forest",le="+Inf"} 3' in text
+    assert 'wine_events_total{event="cache_hits"} 2' in text
+
+
+def test_timer_and_summary_line():
+    registry = metrics.Registry()
+    with registry.timer("scale"):
+        pass
+    line = registry.summary_line()
+    assert line.startswith("wine_metrics scale=n:1,")
@@ -0,0 +1,57 @@
+import os
+import pickle
+
+import numpy as np
+
+import inference
+import model_artifacts
+from forest_engine import PackedForest
+
+
+def test_arrays_round_trip_memory_mapped(model_and_scaler, wine_df, tmp_path):
+    model, scaler = model_and_scaler
+    path = tmp_path / "arrays"
+    model_artifacts.save_arrays(PackedForest.from_sklearn(model), scaler, path, tmp_path / "none.pkl",
+                                tmp_path / "none_scaler.pkl")
+
+    packed, loaded_scaler = model_artifacts.load_arrays(path)
+    assert isinstance(packed.threshold, np.memmap)
+    assert np.allclose(loaded_scaler.mean_, scaler.mean_)
+
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()
+    labels, proba = inference.predict_with_proba(packed, loaded_scaler, X)
+    expected_labels, expected_proba = inference.predict_with_proba(model, scaler, X)
+    assert np.array_equal(labels, expected_labels)
+    assert np.allclose(proba, expected_proba)
+
+
+def test_stale_export_is_not_current(model_and_scaler, tmp_path):
+    model, scaler = model_and_scaler
+    source = tmp_path / "RF_model.pkl"
+    with open(source, "wb") as f:
+        pickle.dump(model, f)
+    source_scaler = tmp_path / "scaler.pkl"
+    with open(source_scaler, "wb") as f:
+        pickle.dump(scaler, f)
+    path = tmp_path / "arrays"
+    model_artifacts.save_arrays(PackedForest.from_sklearn(model), scaler, path, source, source_scaler)
+    assert model_artifacts.is_current(path, source, source_scaler)
+
+    os.utime(source_scaler, ns=(0, 0))
+    assert not model_artifacts.is_current(path, source, source_scaler)
+    model_artifacts.save_arrays(PackedForest.from_sklearn(model), scaler, path, source, source_scaler)
+    os.utime(source, ns=(0, 0))
+    assert not model_artifacts.is_current(path, source, source_scaler)
+    assert not model_artifacts.is_current(tmp_path / "missing", source, source_scaler)
+
+
+def test_unstamped_export_is_not_current(model_and_scaler, tmp_path):
+    model, scaler = model_and_scaler
+    path = tmp_path / "arrays"
+    # Exported while neither pickle existed, so nothing was stamped
+    model_artifacts.save_arrays(PackedForest.from_sklearn(model), scaler, path, tmp_path / "RF_model.pkl",
+                                tmp_path / "scaler.pkl")
+    assert model_artifacts.is_current(path, tmp_path / "RF_model.pkl", tmp_path / "scaler.pkl")
+    with open(tmp_path / "scaler.pkl", "wb") as f:
+        pickle.dump(scaler, f)
+    assert not model_artifacts.is_current(path, tmp_path / "RF_model.pkl", tmp_path / "scaler.pkl")
@@ -0,0 +1,154 @@
+import copy
+import os
+import threading
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+import app
+import incremental_train
+import inference
+import model_registry
+
+
+@pytest.fixture
+def versions(model_and_scaler, wine_df, tmp_path):
+    # Two versions with different forests and scalers, so a model paired with the other
+    # version's scaler gives different answers
+    model, scaler = model_and_scaler
+    shifted = copy.deepcopy(scaler)
+    shifted.mean_ = shifted.mean_ + shifted.scale_
+    X = shifted.transform(wine_df[inference.FEATURE_NAMES].to_numpy())
+    small = RandomForestClassifier(n_estimators=3, random_state=1).fit(X, wine_df["quality"])
+    model_registry.write_version(model, scaler, {"n_trees": 20}, tmp_path)
+    model_registry.write_version(small, shifted, {"n_trees": 3}, tmp_path)
+    return tmp_path
+
+
+def test_live_pointer_defaults_to_newest(versions):
+    assert model_registry.list_versions(versions) == ["v0001", "v0002"]
+    assert model_registry.live_version(versions) == "v0002"
+    live = model_registry.activate("v0001", versions)
+    assert live == {"version": "v0001", "previous": "v0002"}
+    assert model_registry.live_version(versions) == "v0001"
+    with pytest.raises(ValueError):
+        model_registry.activate("v0009", versions)
+
+
+def test_registry_follows_pointer_and_rolls_back_warm(versions):
+    model_registry.activate("v0001", versions)
+    registry = model_registry.ModelRegistry(versions).start()
+    try:
+        first = registry.current()
+        assert first.version == "v0001" and first.meta["n_trees"] == 20
+
+        model_registry.activate("v0002", versions)
+        assert registry.refresh()
+        assert registry.current().version == "v0002"
+        assert registry.previous() is first
+
+        # Rollback swaps the already-loaded objects back and moves the pointer
+        assert registry.rollback() == "v0001"
+        assert registry.current() is first
+        assert model_registry.live_version(versions) == "v0001"
+        assert not registry.refresh()
+    finally:
+        registry.stop()
+
+
+def test_broken_version_keeps_serving_the_last_good_one(versions):
+    registry = model_registry.ModelRegistry(versions).start()
+    try:
+        os.makedirs(versions / "v0003")
+        (versions / "v0003" / inference.MODEL_PATH).write_bytes(b"not a pickle")
+        (versions / "v0003" / inference.SCALER_PATH).write_bytes(b"not a pickle")
+        assert not registry.refresh()
+        assert registry.current().version == "v0002"
+    finally:
+        registry.stop()
+
+
+def test_requests_never_see_a_mixed_pair(versions, wine_df):
+    registry = model_registry.ModelRegistry(versions, prepare=app.build_explainer).start()
+    registry.stop()
+    batcher = app.MicroBatcher(None, None, max_wait_ms=0.5, registry=registry)
+    loaded = [model_registry.load_version(v, versions) for v in ("v0001", "v0002")]
+    pairs = [(v.model, v.scaler) for v in loaded]
+    mixed = [(loaded[0].model, loaded[1].scaler), (loaded[1].model, loaded[0].scaler)]
+    # Only rows where all four model/scaler combinations answer differently, so a reply
+    # identifies the pair that produced it
+    rows = wine_df[inference.FEATURE_NAMES].to_numpy()[:300]
+    probas = [inference.predict_with_proba(model, scaler, rows)[1] for model, scaler in pairs + mixed]
+    distinct = np.ones(len(rows), dtype=bool)
+    for i in range(len(probas)):
+        for j in range(i + 1, len(probas)):
+            distinct &= ~np.isclose(probas[i], probas[j]).all(axis=1)
+    rows = rows[distinct][:200]
+    assert len(rows) >= 100
+    # Load the other version too, so each flip is a quick swap between two warm versions
+    model_registry.activate("v0001", versions)
+    registry.refresh()
+    stop = threading.Event()
+
+    def flip():
+        i = 0
+        while not stop.is_set():
+            model_registry.activate("v0001" if i % 2 else "v0002", versions)
+            registry.refresh()
+            i += 1
+
+    flipper = threading.Thread(target=flip)
+    flipper.start()
+    served = set()
+    try:
+        # Small waves, so swaps land between and during batches rather than after them all
+        for start in range(0, len(rows), 10):
+            wave = rows[start:start + 10]
+            futures = [batcher.submit(row, explain=True) for row in wave]
+            for row, future in zip(wave, futures):
+                label, proba, contributions = future.result(timeout=10)
+                # The reply must be exactly one version's model with that same version's scaler
+                matches = [i for i, (model, scaler) in enumerate(pairs)
+                           if np.allclose(proba, inference.predict_with_proba(model, scaler, row)[1])]
+                assert len(matches) == 1
+                model, scaler = pairs[matches[0]]
+                assert label == inference.predict_with_proba(model, scaler, row)[0]
+                assert len(future.model.estimators_) == len(model.estimators_)
+                assert future.explainer.forest.n_trees == len(future.model.estimators_)
+                served.add(matches[0])
+    finally:
+        stop.set()
+        flipper.join()
+    assert served == {0, 1}
+
+
+@pytest.mark.parametrize("populated", [False, True])
+def test_unpublished_versions_never_go_live(populated, versions, wine_df, tmp_path, monkeypatch):
+    root = versions if populated else tmp_path / "empty"
+    new_data = tmp_path / "new.csv"
+    wine_df.head(30).to_csv(new_data, index=False)
+    registry = model_registry.ModelRegistry(root).start()
+    registry.stop()
+    before = registry.current()
+    assert (before.version if before else None) == ("v0002" if populated else None)
+
+    # A registry poll right after each version directory is renamed into place
+    served = []
+
+    def polled(write):
+        def wrapper(*args, **kwargs):
+            result = write(*args, **kwargs)
+            registry.refresh()
+            served.append(registry.current())
+            return result
+        return wrapper
+    monkeypatch.setattr(incremental_train, "write_version", polled(incremental_train.write_version))
+    monkeypatch.setattr(model_registry, "register_files", polled(model_registry.register_files))
+
+    assert incremental_train.main([str(new_data), "--versions-dir", str(root), "--new-trees", "2",
+                                   "--random-state", "0", "--no-publish"]) == 0
+    assert model_registry.main(["--root", str(root), "register", "--no-activate"]) == 0
+    assert len(model_registry.list_versions(root)) == (4 if populated else 2)
+    assert not registry.refresh()
+    assert served == [before, before] and registry.current() is before
@@ -0,0 +1,11 @@
+import model_zoo
+
+
+def test_pareto_front_drops_dominated_candidates():
+    results = [
+        {"name": "fast", "accuracy": 0.80, "single_p50_ms": 1.0},
+        {"name": "accurate", "accuracy": 0.90, "single_p50_ms": 10.0},
+        {"name": "slow_and_worse", "accuracy": 0.85, "single_p50_ms": 12.0},
+        {"name": "tie", "accuracy": 0.80, "single_p50_ms": 1.0},
+    ]
+    assert model_zoo.pareto_front(results) == ["fast", "accurate", "tie"]
@@ -0,0 +1,53 @@
+import numpy as np
+
+import attributions
+import inference
+from prediction_cache import PredictionCache, quantize
+
+
+def test_quantize_ignores_float_noise():
+    row = [7.4, 0.52, 0.27, 2.5, 0.08, 15.0, 46.0, 0.996, 3.3, 0.66, 10.4]
+    noisy = [v + 1e-12 for v in row]
+    assert quantize(row) == quantize(noisy)
+    assert quantize(row) != quantize([7.5] + row[1:])
+
+
+def test_hits_skip_the_forest(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    cache = PredictionCache(maxsize=2)
+    rows = wine_df[inference.FEATURE_NAMES].to_numpy()[:3]
+
+    label, proba = cache.predict(model, scaler, rows[0], version=1)
+    expected_label, expected_proba = inference.predict_with_proba(model, scaler, rows[0])
+    assert label == expected_label and np.allclose(proba, expected_proba)
+
+    assert cache.predict(model, scaler, rows[0], version=1)[1] is proba
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    # LRU eviction keeps the size bounded
+    cache.predict(model, scaler, rows[1], version=1)
+    cache.predict(model, scaler, rows[2], version=1)
+    assert cache.stats()["size"] == 2
+
+
+def test_new_version_invalidates(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    cache = PredictionCache()
+    row = wine_df[inference.FEATURE_NAMES].to_numpy()[0]
+    cache.predict(model, scaler, row, version="a")
+    cache.predict(model, scaler, row, version="b")
+    assert cache.stats()["misses"] == 2 and cache.stats()["size"] == 1
+
+
+def test_explained_entries_serve_plain_predictions(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    explainer = attributions.PathExplainer(model)
+    cache = PredictionCache()
+    row = wine_df[inference.FEATURE_NAMES].to_numpy()[0]
+
+    # A plain entry has no contributions yet, so explaining the same row is a miss that upgrades it
+    cache.predict(model, scaler, row)
+    label, proba, contributions = cache.predict_explain(explainer, scaler, row)
+    assert contributions.shape == (len(inference.FEATURE_NAMES),)
+    assert cache.predict(model, scaler, row)[1] is proba
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
@@ -0,0 +1,49 @@
+import json
+import multiprocessing
+import os
+import signal
+import time
+from urllib.request import Request, urlopen
+
+import pytest
+
+import app
+import inference
+import prefork
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork") or not os.path.exists("/proc/self/smaps_rollup"),
+                                reason="pre-fork serving needs fork and Linux /proc")
+
+
+def test_process_memory_reports_private_pages():
+    memory = prefork.process_memory()
+    assert 0 < memory["private_kb"] <= memory["rss_kb"]
+
+
+def test_workers_share_one_listening_socket(model_and_scaler, wine_df):
+    model, scaler = model_and_scaler
+    server = app.make_server(None, port=0)
+    port = server.server_address[1]
+
+    def start_worker():
+        server.RequestHandlerClass.batcher = app.MicroBatcher(model, scaler)
+
+    parent = multiprocessing.get_context("fork").Process(
+        target=prefork.serve_forever, args=(server, start_worker, 2))
+    parent.start()
+    try:
+        row = wine_df[inference.FEATURE_NAMES].iloc[0].tolist()
+        body = json.dumps({"features": row}).encode()
+        label, _ = inference.predict_with_proba(model, scaler, row)
+        for _ in range(20):
+            with urlopen(Request(f"http://127.0.0.1:{port}/predict", data=body, method="POST")) as resp:
+                assert json.load(resp)["quality"] == label
+        deadline = time.monotonic() + 5
+        while len(prefork.child_pids(parent.pid)) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert len(prefork.child_pids(parent.pid)) == 2
+    finally:
+        os.kill(parent.pid, signal.SIGTERM)
+        parent.join(timeout=10)
+        server.server_close()
+    assert parent.exitcode == 0
@@ -0,0 +1,27 @@
+import numpy as np
+
+import inference
+import sensitivity
+
+
+def test_sweeps_cover_every_slider_position():
+    base = [v[2] for v in inference.SLIDER_RANGES.values()]
+    X, swept = sensitivity.build_sweeps(base)
+    alcohol = inference.FEATURE_NAMES.index("alcohol")
+    rows = X[swept == alcohol]
+    assert rows[0, alcohol] == 8.4 and rows[-1, alcohol] == 14.9
+    assert len(rows) == 66
+    # Only the swept feature moves
+    others = np.delete(rows, alcohol, axis=1)
+    assert (others == np.delete(np.asarray(base), alcohol)).all()
+
+
+def test_batched_sweep_matches_single_rows(model_and_scaler):
+    model, scaler = model_and_scaler
+    base = [v[2] for v in inference.SLIDER_RANGES.values()]
+    result = sensitivity.score_sweeps(model, scaler, base)
+    assert set(result["feature"]) == set(inference.FEATURE_NAMES)
+    X, _ = sensitivity.build_sweeps(base)
+    for i in (0, len(X) // 2, len(X) - 1):
+        label, _ = inference.predict_with_proba(model, scaler, X[i])
+        assert result["predicted_quality"].iloc[i] == label
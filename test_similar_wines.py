@@ -0,0 +1,68 @@
+import copy
+import threading
+
+import numpy as np
+import pytest
+
+import inference
+import similar_wines
+
+
+@pytest.fixture(scope="module")
+def scaler(model_and_scaler):
+    return model_and_scaler[1]
+
+
+def brute_force(index, X, k):
+    d = np.sqrt(np.square(index.scale(X)[:, None, :] - index.data[None, :, :]).sum(axis=2))
+    return np.sort(d, axis=1)[:, :k]
+
+
+@pytest.mark.parametrize("scan_rows", [similar_wines.SCAN_ROWS, 0])
+def test_query_matches_brute_force(scaler, wine_df, monkeypatch, scan_rows):
+    # Both the matrix-product scan and the KD-tree path
+    monkeypatch.setattr(similar_wines, "SCAN_ROWS", scan_rows)
+    index = similar_wines.build(scaler)
+    X = wine_df[inference.FEATURE_NAMES].to_numpy()[:40] * 1.05
+    rows, distances = index.query(X, k=4)
+    assert rows.shape == distances.shape == (40, 4)
+    assert np.allclose(distances, brute_force(index, X, 4))
+    assert np.all(np.diff(distances, axis=1) >= 0)
+
+    row, distance = index.query(X[0], k=4)
+    assert np.array_equal(row, rows[0]) and np.allclose(distance, distances[0])
+
+
+def test_reference_wine_finds_itself(scaler, wine_df):
+    index = similar_wines.build(scaler)
+    row = wine_df[inference.FEATURE_NAMES].to_numpy()[10]
+    frame = index.frame(*index.query(row, k=3))
+    assert frame["distance"].iloc[0] == pytest.approx(0, abs=1e-5)
+    assert frame["quality"].iloc[0] == wine_df["quality"].iloc[10]
+    assert list(frame.columns[:3]) == ["Id", "quality", "distance"]
+
+
+def test_saved_index_is_reused_until_the_scaler_changes(scaler, tmp_path):
+    path = tmp_path / "index.pkl"
+    similar_wines.load_index(scaler, path)
+    saved = path.stat().st_mtime_ns
+    assert len(similar_wines.load_index(scaler, path)) == 1143
+    assert path.stat().st_mtime_ns == saved
+
+    changed = copy.deepcopy(scaler)
+    changed.mean_ = changed.mean_ + 1
+    index = similar_wines.load_index(changed, path)
+    assert index.scaler_key == similar_wines.scaler_key(changed)
+    assert path.stat().st_mtime_ns != saved
+
+
+def test_concurrent_saves_leave_one_whole_file(scaler, tmp_path):
+    path = tmp_path / "index.pkl"
+    index = similar_wines.load_index(scaler, path)
+    threads = [threading.Thread(target=similar_wines.save, args=(index, path)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [p.name for p in tmp_path.iterdir()] == ["index.pkl"]
+    assert len(similar_wines.load_index(scaler, path)) == 1143
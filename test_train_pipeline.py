@@ -0,0 +1,31 @@
+import copy
+
+import train_pipeline
+
+
+def small_params(n_estimators):
+    params = copy.deepcopy(train_pipeline.DEFAULT_PARAMS)
+    params["forest"]["n_estimators"] = n_estimators
+    return params
+
+
+def test_forest_change_reuses_cached_stages(tmp_path):
+    first = train_pipeline.StageRunner(tmp_path)
+    model, _, accuracy = train_pipeline.run_pipeline("WineQT.csv", small_params(5), first)
+    assert len(model.estimators_) == 5
+    assert 0.0 < accuracy <= 1.0
+    assert not any(t["cached"] for t in first.timings.values())
+
+    second = train_pipeline.StageRunner(tmp_path)
+    model, _, _ = train_pipeline.run_pipeline("WineQT.csv", small_params(7), second)
+    assert len(model.estimators_) == 7
+    assert second.timings["resample"]["cached"]
+    assert second.timings["scale"]["cached"]
+    assert not second.timings["forest"]["cached"]
+
+
+def test_same_params_reuse_forest(tmp_path):
+    train_pipeline.run_pipeline("WineQT.csv", small_params(5), train_pipeline.StageRunner(tmp_path))
+    runner = train_pipeline.StageRunner(tmp_path)
+    train_pipeline.run_pipeline("WineQT.csv", small_params(5), runner)
+    assert runner.timings["forest"]["cached"]
@@ -0,0 +1,50 @@
+import os
+import tempfile
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import wine_quality_ui
+
+
+@pytest.fixture
+def app_test():
+    at = AppTest.from_file(os.path.join(os.path.dirname(__file__), "wine_quality_ui.py"), default_timeout=120)
+    return at.run()
+
+
+def score_upload(at, data):
+    at.file_uploader[0].upload("wines.csv", data, "text/csv").run()
+    next(b for b in at.button if b.label == "Score file").click().run()
+    return at
+
+
+def test_bulk_scoring_counts_rows_and_offers_download(app_test):
+    with open("WineQT.csv", "rb") as f:
+        data = b"".join(f.readlines()[:21])
+    at = score_upload(app_test, data)
+    assert not at.exception
+    assert [s.value for s in at.success] == ["Scored 20 wines"]
+    assert len(at.get("download_button")) == 1
+    # The scored file sits in the per-process directory, not loose in the temp dir
+    scored = at.session_state["scored_upload"]
+    scored_dir = os.path.dirname(scored["path"])
+    assert os.path.basename(scored_dir).startswith("wine_scored_")
+    assert os.path.dirname(scored_dir) == tempfile.gettempdir()
+    assert scored["rows"] == 20
+
+
+@pytest.mark.parametrize("data", [b"a,b\n1,2\n", "fixed acidity;caf\xe9\n1;2\n".encode("latin-1")])
+def test_bulk_scoring_reports_bad_files(app_test, data):
+    at = score_upload(app_test, data)
+    assert not at.exception
+    assert at.error[0].value.startswith("Could not score file")
+
+
+def test_sweep_removes_only_expired_files(tmp_path):
+    old, new = tmp_path / "old.csv", tmp_path / "new.csv"
+    old.write_text("x")
+    new.write_text("x")
+    os.utime(old, (0, 0))
+    wine_quality_ui.sweep_scored(tmp_path)
+    assert not old.exists() and new.exists()
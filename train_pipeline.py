@@ -0,0 +1,208 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+
+from imblearn.over_sampling import SMOTE
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+import dataset
+import inference
+
+CACHE_DIR = ".pipeline_cache"
+TIMINGS_PATH = "pipeline_timings.json"
+
+# Same steps as main.ipynb; SMOTE gets a fixed seed so cached results are reproducible
+DEFAULT_PARAMS = {
+    "smote_random_state": 40,
+    "test_size": 0.2,
+    "split_random_state": 40,
+    "forest": {
+        "n_estimators": 100,
+        "max_depth": None,
+        "min_samples_leaf": 1,
+        "max_features": "sqrt",
+        "random_state": 40,
+    },
+}
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def stage_key(name, upstream, params):
+    # A stage's key covers its own params and its upstream key, so any upstream change invalidates it
+    payload = json.dumps({"stage": name, "upstream": upstream, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class StageRunner:
+    # Runs pipeline stages, reusing pickled outputs from cache_dir when the key matches
+
+    def __init__(self, cache_dir=CACHE_DIR, use_cache=True):
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        self.timings = {}
+        if use_cache:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def run(self, name, key, fn):
+        path = os.path.join(self.cache_dir, f"{name}-{key}.pkl")
+        start = time.perf_counter()
+        if self.use_cache and os.path.exists(path):
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+            cached = True
+        else:
+            result = fn()
+            if self.use_cache:
+                # Write then rename so an interrupted run never leaves a truncated cache entry
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(result, f)
+                os.replace(tmp_path, path)
+            cached = False
+        self.timings[name] = {
+            "seconds": round(time.perf_counter() - start, 4),
+            "cached": cached,
+            "key": key,
+        }
+        return result
+
+
+def load_dataset(data_path):
+    # Memory-mapped float32 columns from the dataset cache instead of re-parsing the CSV
+    data = dataset.load(data_path)
+    return data.frame(), data.label_series()
+
+
+def prepare_data(runner, data_path, params):
+    # Returns (x_train, x_test, y_train, y_test, scaler, scaled_key) with x_* already scaled
+    data_key = file_digest(data_path)
+
+    resample_params = {"random_state": params["smote_random_state"], "dtype": dataset.FEATURE_DTYPE.name}
+    resample_key = stage_key("resample", data_key, resample_params)
+
+    def resample():
+        x, y = load_dataset(data_path)
+        return SMOTE(random_state=params["smote_random_state"]).fit_resample(x, y)
+
+    x, y = runner.run("resample", resample_key, resample)
+
+    scale_params = {"test_size": params["test_size"], "random_state": params["split_random_state"]}
+    scale_key = stage_key("scale", resample_key, scale_params)
+
+    def scale():
+        x_train, x_test, y_train, y_test = train_test_split(
+            x, y, test_size=params["test_size"], random_state=params["split_random_state"]
+        )
+        sc = StandardScaler()
+        x_train = sc.fit_transform(x_train)
+        x_test = sc.transform(x_test)
+        return x_train, x_test, y_train, y_test, sc
+
+    x_train, x_test, y_train, y_test, sc = runner.run("scale", scale_key, scale)
+    return x_train, x_test, y_train, y_test, sc, scale_key
+
+
+def run_pipeline(data_path="WineQT.csv", params=None, runner=None):
+    params = params or DEFAULT_PARAMS
+    runner = runner or StageRunner()
+
+    x_train, x_test, y_train, y_test, sc, scale_key = prepare_data(runner, data_path, params)
+
+    forest_key = stage_key("forest", scale_key, params["forest"])
+
+    def fit_forest():
+        # n_jobs=-1 spreads tree fitting over every core
+        return RandomForestClassifier(n_jobs=-1, **params["forest"]).fit(x_train, y_train)
+
+    model = runner.run("forest", forest_key, fit_forest)
+
+    start = time.perf_counter()
+    accuracy = accuracy_score(y_test, model.predict(x_test))
+    runner.timings["evaluate"] = {"seconds": round(time.perf_counter() - start, 4), "cached": False}
+
+    return model, sc, accuracy
+
+
+def parse_max_features(value):
+    if value in ("sqrt", "log2"):
+        return value
+    return float(value) if "." in value else int(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the wine quality forest with cached stages.")
+    parser.add_argument("--data", default="WineQT.csv")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="recompute every stage")
+    parser.add_argument("--n-estimators", type=int, default=DEFAULT_PARAMS["forest"]["n_estimators"])
+    parser.add_argument("--max-depth", type=int, default=DEFAULT_PARAMS["forest"]["max_depth"])
+    parser.add_argument("--min-samples-leaf", type=int,
+                        default=DEFAULT_PARAMS["forest"]["min_samples_leaf"])
+    parser.add_argument("--max-features", type=parse_max_features,
+                        default=DEFAULT_PARAMS["forest"]["max_features"])
+    parser.add_argument("--random-state", type=int, default=DEFAULT_PARAMS["forest"]["random_state"])
+    parser.add_argument("--search", action="store_true",
+                        help="tune the forest with successive halving before the final fit")
+    parser.add_argument("--search-budget", type=float, default=300, help="search budget in seconds")
+    parser.add_argument("--search-candidates", type=int, default=24)
+    parser.add_argument("--model-out", default=inference.MODEL_PATH)
+    parser.add_argument("--scaler-out", default=inference.SCALER_PATH)
+    parser.add_argument("--timings-out", default=TIMINGS_PATH)
+    args = parser.parse_args(argv)
+
+    params = dict(DEFAULT_PARAMS)
+    params["forest"] = {
+        "n_estimators": args.n_estimators,
+        "max_depth": args.max_depth,
+        "min_samples_leaf": args.min_samples_leaf,
+        "max_features": args.max_features,
+        "random_state": args.random_state,
+    }
+
+    runner = StageRunner(args.cache_dir, use_cache=not args.no_cache)
+    if args.search:
+        # Imported here: hyperparameter_search builds on this module
+        import hyperparameter_search
+        x_train, _, y_train, _, _, _ = prepare_data(runner, args.data, params)
+        search = hyperparameter_search.successive_halving(
+            x_train, y_train, hyperparameter_search.sample_candidates(args.search_candidates),
+            args.search_budget, random_state=args.random_state,
+        )
+        params["forest"].update(search["best_params"])
+        runner.timings["search"] = {"seconds": search["elapsed_s"], "cached": False}
+        with open(hyperparameter_search.SEARCH_PATH, "w") as f:
+            json.dump(search, f, indent=2)
+        print(f"Search picked {search['best_params']} (CV accuracy {search['best_score']:.4f})")
+
+    model, sc, accuracy = run_pipeline(args.data, params, runner)
+
+    with open(args.model_out, "wb") as file:
+        pickle.dump(model, file)
+    with open(args.scaler_out, "wb") as f:
+        pickle.dump(sc, f)
+    with open(args.timings_out, "w") as f:
+        json.dump({"accuracy": accuracy, "stages": runner.timings}, f, indent=2)
+
+    for name, timing in runner.timings.items():
+        source = "cache" if timing["cached"] else "computed"
+        print(f"{name:<10}{timing['seconds']:>9.3f}s  ({source})")
+    print(f"✅ Accuracy {accuracy:.4f}; model saved to {args.model_out}, scaler to {args.scaler_out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,38 +1,330 @@
 import streamlit as st
-import pandas as pd
-import pickle
 import numpy as np
 import random
-import base64
-
-# Helper to encode local image as base64 for CSS background
 import os
+import tempfile
+import time
+import atexit
+import functools
+import shutil
 
-def get_base64_bg(file):
-    if not os.path.exists(file):
-        st.warning(f"Image file not found: {file}")
-        return ""
-    with open(file, "rb") as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
-
-bg_base64 = get_base64_bg("https://www.google.com/url?sa=i&url=https%3A%2F%2Fwww.freepik.com%2Fpremium-ai-image%2Fwine-stains-vintage-linen-watercolour-backgrou-art-background-paint-watercolor-gradient_314973628.htm&psig=AOvVaw29V56sfs6swF-x2Hp_NGSK&ust=1754762563501000&source=images&cd=vfe&opi=89978449&ved=0CBUQjRxqFwoTCLCs34vm-44DFQAAAAAdAAAAABAV")
+import assets
+import cold_start
+import inference
+import metrics
+from app_resources import (current_model, get_explainer, get_model_registry, get_prediction_cache,
+                           get_similar_wines, start_metrics_reporter)
 
 
-# Load the trained model and scaler
+# Input drift is tracked across every session in this process, from the first prediction on
 @st.cache_resource
-def load_model_and_scaler():
-    try:
-        with open('RF_model.pkl', 'rb') as model_file:
-            model = pickle.load(model_file)
-        
-        with open('scaler.pkl', 'rb') as scaler_file:
-            scaler = pickle.load(scaler_file)
+def get_drift_monitor():
+    import drift_monitor
+    with cold_start.step("drift_snapshot"):
+        return drift_monitor.DriftMonitor(drift_monitor.load_snapshot())
+
+# engine, version and base_row are the cache key; the model itself isn't hashable
+@st.cache_data(max_entries=256)
+def score_sweeps(_model, _scaler, engine, version, base_row):
+    import sensitivity
+    return sensitivity.score_sweeps(_model, _scaler, list(base_row))
+
+# Inputs, results and sweeps rerun on their own: sliders sit in a form so moving one
+# does nothing until submit, and submitting reruns only this fragment, not the page CSS,
+# header and expanders around it. The explainer and drift monitor load on the first submit,
+# so the first page doesn't wait for them
+@st.fragment
+def prediction_panel(engine, prediction_cache):
+    # Read on every fragment rerun, so a model the registry swapped in is used from the next submit
+    model, scaler, version = current_model(engine)
+    with st.form("wine_inputs", border=False):
+        # Create two columns for input fields
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            st.subheader("Acidity & pH Properties")
+            fixed_acidity = st.slider(
+                "Fixed Acidity", 
+                min_value=3.8, max_value=15.9, value=7.4, step=0.1,
+                help="Non-volatile acids that don't evaporate readily"
+            )
+        
+            volatile_acidity = st.slider(
+                "Volatile Acidity", 
+                min_value=0.08, max_value=1.58, value=0.52, step=0.01,
+                help="Amount of acetic acid in wine (high levels lead to unpleasant vinegar taste)"
+            )
+        
+            citric_acid = st.slider(
+                "Citric Acid", 
+                min_value=0.0, max_value=1.0, value=0.27, step=0.01,
+                help="Adds freshness and flavor to wines"
+            )
+        
+            ph = st.slider(
+                "pH", 
+                min_value=2.7, max_value=4.0, value=3.3, step=0.01,
+                help="Describes how acidic or basic a wine is (0-14 scale)"
+            )
+        
+            st.subheader("Sulfur Content")
+            free_sulfur_dioxide = st.slider(
+                "Free Sulfur Dioxide", 
+                min_value=1.0, max_value=72.0, value=15.0, step=1.0,
+                help="Prevents microbial growth and oxidation of wine"
+            )
+        
+            total_sulfur_dioxide = st.slider(
+                "Total Sulfur Dioxide", 
+                min_value=6.0, max_value=289.0, value=46.0, step=1.0,
+                help="Amount of free and bound forms of SO2"
+            )
+    
+        with col2:
+            st.subheader("Chemical Properties")
+            residual_sugar = st.slider(
+                "Residual Sugar", 
+                min_value=0.9, max_value=15.5, value=2.5, step=0.1,
+                help="Amount of sugar remaining after fermentation"
+            )
+        
+            chlorides = st.slider(
+                "Chlorides", 
+                min_value=0.01, max_value=0.61, value=0.08, step=0.001,
+                help="Amount of salt in the wine"
+            )
+        
+            density = st.slider(
+                "Density", 
+                min_value=0.99, max_value=1.004, value=0.996, step=0.0001,
+                help="Density of wine (depends on alcohol and sugar content)"
+            )
+        
+            sulphates = st.slider(
+                "Sulphates", 
+                min_value=0.33, max_value=2.0, value=0.66, step=0.01,
+                help="Wine additive that contributes to SO2 levels"
+            )
+        
+            alcohol = st.slider(
+                "Alcohol", 
+                min_value=8.4, max_value=14.9, value=10.4, step=0.1,
+                help="Alcohol percentage by volume"
+            )
+    
+        st.markdown("---")
         
-        return model, scaler
-    except FileNotFoundError:
-        st.error("Model files not found. Please ensure RF_model.pkl and scaler.pkl are in the current directory.")
-        return None, None
+        # Prediction section
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            submitted = st.form_submit_button("🔮 Predict Wine Quality", use_container_width=True)
+
+    if submitted:
+        st.session_state["wine_row"] = (
+            fixed_acidity, volatile_acidity, citric_acid, residual_sugar,
+            chlorides, free_sulfur_dioxide, total_sulfur_dioxide,
+            density, ph, sulphates, alcohol
+        )
+    # Last submitted wine; sweeps start from the slider defaults until the first submit
+    current_row = st.session_state.get(
+        "wine_row", tuple(v[2] for v in inference.SLIDER_RANGES.values())
+    )
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col2:
+        if "wine_row" in st.session_state:
+            # Prepare input data
+            input_data = np.array([current_row])
+            drift = get_drift_monitor()
+            explainer = get_explainer(model, engine, version)
+            contributions = None
+            if explainer is not None:
+                prediction, prediction_proba, contributions = prediction_cache.predict_explain(
+                    explainer, scaler, input_data[0], version)
+            else:
+                prediction, prediction_proba = prediction_cache.predict(model, scaler, input_data[0], version)
+            stats = prediction_cache.stats()
+            st.caption(f"Prediction cache: {stats['hits']} hits, {stats['misses']} misses, {stats['size']} entries")
+            if submitted:
+                drift.update(input_data)
+            drifted = [name for name, f in drift.report()["features"].items() if f["drifted"]]
+            if drifted:
+                st.warning(f"⚠️ Recent inputs have drifted away from the training data on: {', '.join(drifted)}")
+
+            # --- Animated Results ---
+            render_start = time.perf_counter()
+            if prediction >= 7:
+                color = "#228B22"
+                quality_text = "Excellent 🍾"
+                if submitted:
+                    st.balloons()
+                icon = "🥇"
+            elif prediction >= 6:
+                color = "#1E90FF"
+                quality_text = "Good 👍"
+                icon = "🍷"
+            elif prediction >= 5:
+                color = "#FFA500"
+                quality_text = "Average 😐"
+                icon = "🍇"
+            else:
+                color = "#B22222"
+                quality_text = "Below Average 😬"
+                if submitted:
+                    st.snow()
+                icon = "🍂"
+
+            st.markdown(f"""
+            <div class="prediction-result" style='text-align: center; padding: 24px; border-radius: 16px; 
+                        background: #fff8f5; border: 2px solid {color}; box-shadow: 0 2px 12px 0 {color}22;'>
+                <h2 style='color: {color}; margin: 0;'>{icon} Quality Score: {prediction}</h2>
+                <h3 style='color: {color}; margin: 10px 0;'>{quality_text}</h3>
+            </div>
+            """, unsafe_allow_html=True)
+
+            # --- One bar chart instead of a write/progress pair per class ---
+            st.markdown("### 📊 Confidence Distribution")
+            # pandas loads here, on the first result, rather than before the first page
+            import pandas as pd
+            prob_df = pd.DataFrame({
+                'Quality Level': [str(cls) for cls in model.classes_],
+                'Confidence': prediction_proba
+            }).set_index('Quality Level')
+            st.bar_chart(prob_df, color="#8b0000")
+
+            # Per-feature pushes toward the predicted score, from the trees' decision paths
+            if contributions is not None:
+                st.markdown("### 🔍 Why this score?")
+                column = int(np.searchsorted(model.classes_, prediction))
+                contrib_df = pd.DataFrame({
+                    "Property": inference.FEATURE_NAMES,
+                    "Contribution": contributions
+                }).set_index("Property")
+                st.bar_chart(contrib_df, color="#8b0000", horizontal=True)
+                st.caption(f"Starting from the {explainer.bias[column]:.1%} average confidence in quality {prediction}, each bar is how far that property moved it.")
+
+            # Closest known wines from WineQT.csv and what they were actually rated
+            similar = get_similar_wines(scaler, version)
+            if similar is not None:
+                st.markdown("### 🍇 Most Similar Known Wines")
+                st.dataframe(similar.frame(*similar.query(input_data[0])), hide_index=True)
+            metrics.observe("render", time.perf_counter() - render_start)
+    
+    st.markdown("---")
+
+    # What-if sweeps: every slider position of all 11 properties scored in one batched call
+    with st.expander("📈 What-if Sensitivity"):
+        st.markdown("See how the prediction changes as one property moves across its whole slider range, with the others held at the last predicted wine.")
+        sweep_feature = st.selectbox(
+            "Property to sweep", inference.FEATURE_NAMES,
+            index=inference.FEATURE_NAMES.index("alcohol")
+        )
+        if st.checkbox("Show sensitivity curves"):
+            sweeps = score_sweeps(model, scaler, engine, version, current_row)
+            curve = sweeps[sweeps["feature"] == sweep_feature].set_index("value")
+            st.markdown("**Confidence per quality level**")
+            st.line_chart(curve.drop(columns=["feature", "predicted_quality"]))
+            st.markdown("**Predicted quality**")
+            st.line_chart(curve["predicted_quality"])
+
+# Rows per vectorised scoring call; keeps memory flat however large the upload is
+UPLOAD_CHUNKSIZE = 20_000
+# Scored files untouched this long are deleted, so sessions that never come back don't fill the disk
+SCORED_TTL_SECONDS = 6 * 3600
+# Streamlit holds a download in memory while serving it; bigger results are left to batch_score.py
+DOWNLOAD_LIMIT_BYTES = 200 * 2**20
+
+# Scored uploads of every session in this process live here, and go when the process exits
+@st.cache_resource
+def get_scored_dir():
+    path = tempfile.mkdtemp(prefix="wine_scored_")
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+def sweep_scored(directory, ttl=SCORED_TTL_SECONDS):
+    cutoff = time.time() - ttl
+    for entry in os.scandir(directory):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+def read_scored(path):
+    # Called by st.download_button on click, so reruns don't read the file into memory
+    with open(path, "rb") as f:
+        return f.read()
+
+# File scoring reruns on its own so uploads and downloads don't rebuild the whole page
+@st.fragment
+def bulk_scoring_panel(engine):
+    model, scaler, version = current_model(engine)
+    uploaded = st.file_uploader(
+        "CSV in the WineQT.csv column layout", type="csv",
+        help="Needs the 11 physicochemical columns; an Id column is copied into the output"
+    )
+    if uploaded is None:
+        return
+    import pandas as pd
+    import batch_score
+    import similar_wines
+    drift = get_drift_monitor()
+    explainer = get_explainer(model, engine, version)
+    explain = explainer is not None and st.checkbox(
+        "Include per-property contributions", help="Adds a contrib_ column per property, toward each row's predicted quality"
+    )
+    similar = st.checkbox(
+        f"Include the {similar_wines.DEFAULT_K} most similar known wines",
+        help="Adds the Id, quality and distance of each row's nearest wines in WineQT.csv"
+    ) and get_similar_wines(scaler, version)
+
+    scored = st.session_state.get("scored_upload")
+    if scored is not None and not os.path.exists(scored["path"]):
+        # Swept after SCORED_TTL_SECONDS; score again
+        scored = None
+    if scored is None or scored["file_id"] != uploaded.file_id or scored.get("explain") != explain or scored.get("similar") != bool(similar):
+        if not st.button("Score file"):
+            return
+        # Predictions stream to a file chunk by chunk instead of piling up in memory
+        progress = st.progress(0.0, text="Scoring...")
+        uploaded.seek(0)
+        scored_dir = get_scored_dir()
+        sweep_scored(scored_dir)
+        out = tempfile.NamedTemporaryFile("w", suffix=".csv", dir=scored_dir, delete=False)
+        rows = 0
+        try:
+            with out:
+                for i, chunk in enumerate(batch_score.iter_scored_chunks(model, scaler, uploaded, UPLOAD_CHUNKSIZE, drift, explainer if explain else None, similar or None)):
+                    chunk.to_csv(out, header=(i == 0), index=False)
+                    rows += len(chunk)
+                    progress.progress(min(uploaded.tell() / max(uploaded.size, 1), 1.0),
+                                      text=f"Scored {rows:,} rows")
+                    # Give other sessions' threads a turn between chunks
+                    time.sleep(0)
+        # Undecodable bytes, missing columns and non-numeric values are the uploader's to fix
+        except (ValueError, UnicodeDecodeError, KeyError, pd.errors.ParserError) as e:
+            os.remove(out.name)
+            metrics.inc("upload_errors")
+            st.error(f"Could not score file: {e}")
+            return
+        progress.progress(1.0, text=f"Scored {rows:,} rows")
+        if scored is not None and os.path.exists(scored["path"]):
+            os.remove(scored["path"])
+        scored = {"file_id": uploaded.file_id, "path": out.name, "rows": rows, "explain": explain, "similar": bool(similar)}
+        st.session_state["scored_upload"] = scored
+
+    st.success(f"Scored {scored['rows']:,} wines")
+    size = os.path.getsize(scored["path"])
+    if size > DOWNLOAD_LIMIT_BYTES:
+        st.warning(f"⚠️ The scored file is {size / 2**20:,.0f} MB; downloads over {DOWNLOAD_LIMIT_BYTES / 2**20:.0f} MB "
+                   "are held in memory by Streamlit, so score files this large with batch_score.py instead")
+        return
+    st.download_button(
+        "⬇️ Download predictions", functools.partial(read_scored, scored["path"]),
+        file_name="wine_predictions.csv", mime="text/csv"
+    )
+    st.caption(f"{size / 2**20:,.1f} MB; read into memory only when downloaded")
 
 def main():
     st.set_page_config(
@@ -41,268 +333,10 @@ def main():
         layout="wide"
     )
 
-    # Enhanced wine-themed CSS with animations
+    # Enhanced wine-themed CSS with animations (static/wine_quality_ui.css, read once per process)
+    st.markdown(assets.style_tag("wine_quality_ui.css"), unsafe_allow_html=True)
     st.markdown(
-        f"""
-        <style>
-        @import url('https://fonts.googleapis.com/css2?family=Playfair+Display:wght@400;700&family=Montserrat:wght@300;400;600;700&display=swap');
-        
-        .stApp {{
-            background-image: url("data:image/jpeg;base64,{bg_base64}");
-            background-size: cover;
-            background-position: center;
-            background-repeat: no-repeat;
-            background-attachment: fixed;
-            position: relative;
-            overflow-x: hidden;
-        }}
-        
-        /* Wine bottle floating animation */
-        .wine-bottle {{
-            position: fixed;
-            width: 60px;
-            height: 120px;
-            background: linear-gradient(45deg, #8b0000, #b22222);
-            border-radius: 8px 8px 20px 20px;
-            box-shadow: 0 4px 15px rgba(139, 0, 0, 0.3);
-            animation: float 6s ease-in-out infinite;
-            z-index: 1;
-        }}
-        
-        .wine-bottle::before {{
-            content: '';
-            position: absolute;
-            top: -10px;
-            left: 50%;
-            transform: translateX(-50%);
-            width: 20px;
-            height: 30px;
-            background: linear-gradient(45deg, #8b0000, #b22222);
-            border-radius: 10px 10px 0 0;
-        }}
-        
-        .wine-bottle::after {{
-            content: '🍷';
-            position: absolute;
-            top: -25px;
-            left: 50%;
-            transform: translateX(-50%);
-            font-size: 20px;
-        }}
-        
-        .wine-bottle:nth-child(1) {{
-            left: 10%;
-            animation-delay: 0s;
-        }}
-        
-        .wine-bottle:nth-child(2) {{
-            left: 85%;
-            animation-delay: 2s;
-        }}
-        
-        .wine-bottle:nth-child(3) {{
-            left: 20%;
-            top: 60%;
-            animation-delay: 4s;
-        }}
-        
-        @keyframes float {{
-            0%, 100% {{ transform: translateY(0px) rotate(0deg); }}
-            50% {{ transform: translateY(-20px) rotate(5deg); }}
-        }}
-        
-        /* Grape cluster animation */
-        .grape-cluster {{
-            position: fixed;
-            font-size: 24px;
-            animation: grapeFloat 8s ease-in-out infinite;
-            z-index: 1;
-        }}
-        
-        .grape-cluster:nth-child(4) {{
-            left: 75%;
-            top: 20%;
-            animation-delay: 1s;
-        }}
-        
-        .grape-cluster:nth-child(5) {{
-            left: 15%;
-            top: 70%;
-            animation-delay: 3s;
-        }}
-        
-        .grape-cluster:nth-child(6) {{
-            left: 80%;
-            top: 80%;
-            animation-delay: 5s;
-        }}
-        
-        @keyframes grapeFloat {{
-            0%, 100% {{ transform: translateY(0px) scale(1); }}
-            50% {{ transform: translateY(-15px) scale(1.1); }}
-        }}
-        
-        /* Sparkle animation */
-        .sparkle {{
-            position: fixed;
-            width: 4px;
-            height: 4px;
-            background: #fff;
-            border-radius: 50%;
-            animation: sparkle 3s linear infinite;
-            z-index: 1;
-        }}
-        
-        .sparkle:nth-child(7) {{ left: 25%; top: 30%; animation-delay: 0s; }}
-        .sparkle:nth-child(8) {{ left: 70%; top: 40%; animation-delay: 1s; }}
-        .sparkle:nth-child(9) {{ left: 40%; top: 70%; animation-delay: 2s; }}
-        .sparkle:nth-child(10) {{ left: 90%; top: 60%; animation-delay: 0.5s; }}
-        .sparkle:nth-child(11) {{ left: 60%; top: 20%; animation-delay: 1.5s; }}
-        
-        @keyframes sparkle {{
-            0%, 100% {{ opacity: 0; transform: scale(0); }}
-            50% {{ opacity: 1; transform: scale(1); }}
-        }}
-        
-        body {{
-            background: transparent !important;
-        }}
-        
-        html, body, [class*="css"]  {{
-            font-family: 'Montserrat', sans-serif !important;
-            color: #fff !important;
-        }}
-        
-        .main-card {{
-            background: rgba(30, 0, 30, 0.35);
-            border-radius: 24px;
-            box-shadow: 0 8px 32px 0 rgba(44,0,22,0.25);
-            backdrop-filter: blur(12px);
-            -webkit-backdrop-filter: blur(12px);
-            border: 1.5px solid rgba(120,0,40,0.18);
-            margin: 2rem auto 2rem auto;
-            padding: 2.5rem 2.5rem 1.5rem 2.5rem;
-            max-width: 900px;
-            color: #fff !important;
-            position: relative;
-            z-index: 10;
-            animation: cardGlow 4s ease-in-out infinite;
-        }}
-        
-        @keyframes cardGlow {{
-            0%, 100% {{ box-shadow: 0 8px 32px 0 rgba(44,0,22,0.25); }}
-            50% {{ box-shadow: 0 8px 32px 0 rgba(139,0,0,0.3); }}
-        }}
-        
-        h1, h2, h3, h4, h5, h6, .wine-title, .wine-subtitle {{
-            color: #fff !important;
-            text-shadow: 0 2px 8px #40001a99;
-        }}
-        
-        label, .stSlider {{
-            color: #fff !important;
-        }}
-        
-        .stButton>button {{
-            background: linear-gradient(90deg, #8b0000 0%, #b22222 100%);
-            color: #fff;
-            border-radius: 10px;
-            font-weight: 600;
-            font-size: 1.15rem;
-            padding: 0.6em 2.2em;
-            border: none;
-            box-shadow: 0 2px 12px 0 rgba(120,0,40,0.13);
-            transition: 0.2s;
-            animation: buttonPulse 2s ease-in-out infinite;
-        }}
-        
-        @keyframes buttonPulse {{
-            0%, 100% {{ transform: scale(1); }}
-            50% {{ transform: scale(1.02); }}
-        }}
-        
-        .stButton>button:hover {{
-            background: linear-gradient(90deg, #b22222 0%, #8b0000 100%);
-            color: #fff;
-            transform: scale(1.05);
-        }}
-        
-        .stProgress>div>div>div>div {{
-            background-image: linear-gradient(90deg, #8b0000, #b22222);
-        }}
-        
-        .st-cb {{
-            border-radius: 14px !important;
-        }}
-        
-        .wine-header {{
-            text-align: center;
-            margin-bottom: 0.5rem;
-            animation: headerGlow 3s ease-in-out infinite;
-        }}
-        
-        @keyframes headerGlow {{
-            0%, 100% {{ text-shadow: 0 2px 8px #40001a99; }}
-            50% {{ text-shadow: 0 2px 15px #8b0000; }}
-        }}
-        
-        .wine-logo {{
-            width: 70px;
-            margin-bottom: 0.5rem;
-            animation: logoSpin 10s linear infinite;
-        }}
-        
-        @keyframes logoSpin {{
-            0% {{ transform: rotate(0deg); }}
-            100% {{ transform: rotate(360deg); }}
-        }}
-        
-        .wine-title {{
-            font-family: 'Playfair Display', serif;
-            font-size: 2.7rem;
-            color: #8b0000;
-            margin-bottom: 0.2rem;
-            font-weight: 700;
-        }}
-        
-        .wine-subtitle {{
-            font-size: 1.2rem;
-            color: #4b2e2b;
-            margin-bottom: 1.2rem;
-            font-weight: 600;
-        }}
-        
-        .wine-footer {{
-            text-align: center;
-            color: #fff;
-            font-size: 1.05rem;
-            margin-top: 2.5rem;
-            margin-bottom: 0.5rem;
-            opacity: 0.85;
-            letter-spacing: 0.5px;
-        }}
-        
-        /* Remove default Streamlit backgrounds */
-        .stApp, .block-container, .main, .css-18e3th9, .css-1d391kg {{
-            background-color: rgba(0,0,0,0) !important;
-        }}
-        
-        /* Enhanced slider styling */
-        .stSlider > div > div > div > div {{
-            background: linear-gradient(90deg, #8b0000, #b22222) !important;
-        }}
-        
-        /* Prediction result animation */
-        .prediction-result {{
-            animation: resultGlow 2s ease-in-out infinite;
-        }}
-        
-        @keyframes resultGlow {{
-            0%, 100% {{ box-shadow: 0 2px 12px 0 rgba(139,0,0,0.2); }}
-            50% {{ box-shadow: 0 2px 20px 0 rgba(139,0,0,0.4); }}
-        }}
-        </style>
-        
+        """
         <!-- Animated wine elements -->
         <div class="wine-bottle"></div>
         <div class="wine-bottle"></div>
@@ -344,9 +378,21 @@ def main():
     st.markdown("---")
     
     # Load model and scaler
-    model, scaler = load_model_and_scaler()
+    engine = st.sidebar.selectbox(
+        "Inference engine", inference.ENGINES,
+        help="sklearn runs the pickled forest; native evaluates the same trees from packed NumPy arrays; fused also skips scaling (run fuse_scaler.py first); compact is a pruned, smaller forest (run compact_forest.py first)"
+    )
+    start_metrics_reporter()
+    # A version from model_versions when there is one; the registry swaps in new ones in the
+    # background and each run takes the live model and scaler as one pair
+    registry = get_model_registry(engine)
+    model, scaler, version = current_model(engine)
+    if registry is not None and registry.current() is not None:
+        previous = registry.previous()
+        st.sidebar.caption(f"Model {version}" + (f" (previous {previous.version} kept warm)" if previous else ""))
+    prediction_cache = get_prediction_cache(engine)
     
-    if model is None or scaler is None:
+    if model is None:
         return
     
     st.markdown("""
@@ -356,143 +402,12 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    # Create two columns for input fields
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Acidity & pH Properties")
-        fixed_acidity = st.slider(
-            "Fixed Acidity", 
-            min_value=3.8, max_value=15.9, value=7.4, step=0.1,
-            help="Non-volatile acids that don't evaporate readily"
-        )
-        
-        volatile_acidity = st.slider(
-            "Volatile Acidity", 
-            min_value=0.08, max_value=1.58, value=0.52, step=0.01,
-            help="Amount of acetic acid in wine (high levels lead to unpleasant vinegar taste)"
-        )
-        
-        citric_acid = st.slider(
-            "Citric Acid", 
-            min_value=0.0, max_value=1.0, value=0.27, step=0.01,
-            help="Adds freshness and flavor to wines"
-        )
-        
-        ph = st.slider(
-            "pH", 
-            min_value=2.7, max_value=4.0, value=3.3, step=0.01,
-            help="Describes how acidic or basic a wine is (0-14 scale)"
-        )
-        
-        st.subheader("Sulfur Content")
-        free_sulfur_dioxide = st.slider(
-            "Free Sulfur Dioxide", 
-            min_value=1.0, max_value=72.0, value=15.0, step=1.0,
-            help="Prevents microbial growth and oxidation of wine"
-        )
-        
-        total_sulfur_dioxide = st.slider(
-            "Total Sulfur Dioxide", 
-            min_value=6.0, max_value=289.0, value=46.0, step=1.0,
-            help="Amount of free and bound forms of SO2"
-        )
-    
-    with col2:
-        st.subheader("Chemical Properties")
-        residual_sugar = st.slider(
-            "Residual Sugar", 
-            min_value=0.9, max_value=15.5, value=2.5, step=0.1,
-            help="Amount of sugar remaining after fermentation"
-        )
-        
-        chlorides = st.slider(
-            "Chlorides", 
-            min_value=0.01, max_value=0.61, value=0.08, step=0.001,
-            help="Amount of salt in the wine"
-        )
-        
-        density = st.slider(
-            "Density", 
-            min_value=0.99, max_value=1.004, value=0.996, step=0.0001,
-            help="Density of wine (depends on alcohol and sugar content)"
-        )
-        
-        sulphates = st.slider(
-            "Sulphates", 
-            min_value=0.33, max_value=2.0, value=0.66, step=0.01,
-            help="Wine additive that contributes to SO2 levels"
-        )
-        
-        alcohol = st.slider(
-            "Alcohol", 
-            min_value=8.4, max_value=14.9, value=10.4, step=0.1,
-            help="Alcohol percentage by volume"
-        )
-    
-    st.markdown("---")
-    
-    # Prediction section
-    col1, col2, col3 = st.columns([1, 2, 1])
-    
-    with col2:
-        if st.button("🔮 Predict Wine Quality", use_container_width=True):
-            # Prepare input data
-            input_data = np.array([
-                [
-                    fixed_acidity, volatile_acidity, citric_acid, residual_sugar,
-                    chlorides, free_sulfur_dioxide, total_sulfur_dioxide,
-                    density, ph, sulphates, alcohol
-                ]
-            ])
-            input_scaled = scaler.transform(input_data)
-            prediction = model.predict(input_scaled)[0]
-            prediction_proba = model.predict_proba(input_scaled)[0]
-
-            # --- Animated Results ---
-            if prediction >= 7:
-                color = "#228B22"
-                quality_text = "Excellent 🍾"
-                st.balloons()
-                icon = "🥇"
-            elif prediction >= 6:
-                color = "#1E90FF"
-                quality_text = "Good 👍"
-                icon = "🍷"
-            elif prediction >= 5:
-                color = "#FFA500"
-                quality_text = "Average 😐"
-                icon = "🍇"
-            else:
-                color = "#B22222"
-                quality_text = "Below Average 😬"
-                st.snow()
-                icon = "🍂"
+    prediction_panel(engine, prediction_cache)
 
-            st.markdown(f"""
-            <div class="prediction-result" style='text-align: center; padding: 24px; border-radius: 16px; 
-                        background: #fff8f5; border: 2px solid {color}; box-shadow: 0 2px 12px 0 {color}22;'>
-                <h2 style='color: {color}; margin: 0;'>{icon} Quality Score: {prediction}</h2>
-                <h3 style='color: {color}; margin: 10px 0;'>{quality_text}</h3>
-            </div>
-            """, unsafe_allow_html=True)
+    # Bulk scoring for QA: whole files instead of one wine at a time
+    with st.expander("📂 Score a CSV File"):
+        bulk_scoring_panel(engine)
 
-            # --- Progress Bars with Icons ---
-            st.markdown("### 📊 Confidence Distribution")
-            classes = model.classes_
-            probabilities = prediction_proba
-            prob_df = pd.DataFrame({
-                'Quality Level': classes,
-                'Confidence': probabilities
-            }).sort_values('Quality Level')
-            for _, row in prob_df.iterrows():
-                bar_icon = "🍷" if row['Quality Level'] >= 7 else ("🍇" if row['Quality Level'] >= 5 else "🍂")
-                st.write(f"{bar_icon} Quality {int(row['Quality Level'])}")
-                st.progress(row['Confidence'])
-                st.write(f"{row['Confidence']:.2%}")
-    
-    st.markdown("---")
-    
     # Additional information
     with st.expander("ℹ️ About This Model"):
         st.markdown("""
@@ -565,6 +480,7 @@ def main():
         """,
         unsafe_allow_html=True
     )
+    cold_start.rendered()
 
 if __name__ == "__main__":
     main()